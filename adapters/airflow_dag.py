@@ -1,17 +1,10 @@
-import logging
 from datetime import datetime, timedelta
 
 from airflow import DAG
-from airflow.operators.python import PythonOperator
-from core.controller import SlotController
+from adapters.airflow_deferrable import SlotControlOperator
 
 CONFIG_PATH = "reservation_slot_config.json"
 
-def dag_task(**kwargs):
-    controller = SlotController.from_file(CONFIG_PATH)
-    execution_date = kwargs.get("execution_date")
-    controller.run(execution_date)
-
 default_args = {
     "owner": "airflow",
     "depends_on_past": False,
@@ -29,9 +22,10 @@ dag = DAG(
     tags=["bigquery", "slots", "autoscale"],
 )
 
-adjust_task = PythonOperator(
+# defers to the triggerer while the metrics query runs; needs a running triggerer
+adjust_task = SlotControlOperator(
     task_id="adjust_bigquery_slots",
-    python_callable=dag_task,
-    provide_context=True,
+    config_path=CONFIG_PATH,
+    trigger_timeout=timedelta(minutes=4),
     dag=dag,
 )
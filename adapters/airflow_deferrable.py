@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import pendulum
+from airflow.exceptions import AirflowException
+from airflow.models import BaseOperator
+from airflow.triggers.base import BaseTrigger, TriggerEvent
+
+from core.config import ConfigLoader
+from core.controller import SlotController
+from core.decision_engine import DecisionEngine, metrics_query
+from core.metrics import AsyncBigQueryJobMetricsCollector, MetricsCollectionError, SlotUtilizationCollector
+
+# incremental state and job-level batches need a long-lived collector; a trigger runs the aggregate query once
+DEFERRABLE_METRICS_MODES = ("aggregate",)
+
+
+class SlotMetricsTrigger(BaseTrigger):
+    """
+    Runs the SLA metrics query in the triggerer's event loop with
+    AsyncBigQueryJobMetricsCollector and fires one event with the metrics,
+    or with the error when the query failed or timed out.
+    """
+
+    def __init__(self, config_path: str, since: str, poll_interval_seconds: float = 2.0):
+        super().__init__()
+        self.config_path = config_path
+        # ISO 8601, so the trigger serializes as plain JSON
+        self.since = since
+        self.poll_interval_seconds = poll_interval_seconds
+
+    def serialize(self) -> Tuple[str, Dict[str, Any]]:
+        return (
+            "adapters.airflow_deferrable.SlotMetricsTrigger",
+            {
+                "config_path": self.config_path,
+                "since": self.since,
+                "poll_interval_seconds": self.poll_interval_seconds,
+            },
+        )
+
+    def _collector(self) -> AsyncBigQueryJobMetricsCollector:
+        """Load the config and build the collector; blocking (file reads, credential discovery)."""
+        config = ConfigLoader(self.config_path).current.config
+        metadata = config["metadata"]
+        sql_path, segment_by = metrics_query(config)
+        return AsyncBigQueryJobMetricsCollector(
+            project_id=metadata["project_id"],
+            location=metadata.get("location", "US"),
+            sql_path=sql_path,
+            timeout_seconds=config.get("call_timeout_seconds", 60),
+            poll_interval_seconds=self.poll_interval_seconds,
+            segment_by=segment_by,
+        )
+
+    async def run(self) -> AsyncIterator[TriggerEvent]:
+        # keep the blocking setup off the triggerer's event loop
+        collector = await asyncio.to_thread(self._collector)
+        try:
+            metrics = await collector.collect(pendulum.parse(self.since))
+        except MetricsCollectionError as exc:
+            yield TriggerEvent({"status": "error", "since": self.since, "message": str(exc)})
+            return
+        yield TriggerEvent({"status": "success", "since": self.since, "metrics": metrics})
+
+
+class TriggerEventMetrics:
+    """Collector returning the metrics a SlotMetricsTrigger event carried."""
+
+    def __init__(self, event: Dict[str, Any]):
+        self.event = event
+
+    def collect(self, since: Any) -> Dict[str, Any]:
+        if self.event.get("status") != "success":
+            raise MetricsCollectionError(self.event.get("message", "metrics trigger failed"))
+        return self.event["metrics"]
+
+
+class SlotControlOperator(BaseOperator):
+    """
+    Deferrable slot control task.
+
+    execute() only computes the monitoring window and defers to
+    SlotMetricsTrigger, which waits on the metrics query in the triggerer.
+    The worker picks the task up again in execute_complete() for the
+    decision and the reservation update, through the usual SlotController
+    cycle (store, cost accounting and metrics export included).
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        poll_interval_seconds: float = 2.0,
+        trigger_timeout: Optional[timedelta] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.config_path = config_path
+        self.poll_interval_seconds = poll_interval_seconds
+        self.trigger_timeout = trigger_timeout
+
+    def execute(self, context: Dict[str, Any]) -> None:
+        config = ConfigLoader(self.config_path).current.config
+        metrics_mode = config.get("metrics_mode", "aggregate")
+        if metrics_mode not in DEFERRABLE_METRICS_MODES:
+            raise AirflowException(
+                f"metrics_mode {metrics_mode!r} is not supported by SlotControlOperator; "
+                f"use one of {DEFERRABLE_METRICS_MODES} or the serve mode"
+            )
+        execution_time = self._execution_time(context)
+        # every task instance is a fresh engine, so its window is the full check interval
+        since = execution_time.subtract(minutes=config.get("check_interval_minutes", 5))
+        self.defer(
+            trigger=SlotMetricsTrigger(self.config_path, since.isoformat(), self.poll_interval_seconds),
+            method_name="execute_complete",
+            timeout=self.trigger_timeout,
+        )
+
+    def execute_complete(self, context: Dict[str, Any], event: Optional[Dict[str, Any]] = None) -> Optional[bool]:
+        if event is None:
+            raise AirflowException("Slot metrics trigger fired without an event")
+        if event["status"] != "success":
+            logging.error(f"Slot metrics collection failed in the triggerer: {event.get('message')}")
+
+        config = ConfigLoader(self.config_path).current.config
+        engine = DecisionEngine(
+            config,
+            collector=TriggerEventMetrics(event),
+            utilization_collector=SlotUtilizationCollector.from_config(config),
+        )
+        result = SlotController(config, engine=engine).run(self._execution_time(context))
+        return None if result is None else result.healthy
+
+    @staticmethod
+    def _execution_time(context: Dict[str, Any]) -> pendulum.DateTime:
+        execution_time = context.get("logical_date") or context.get("execution_date") or pendulum.now("Asia/Jakarta")
+        if not isinstance(execution_time, pendulum.DateTime):
+            execution_time = pendulum.instance(execution_time, tz="Asia/Jakarta")
+        return execution_time
@@ -0,0 +1,74 @@
+"""
+One cold start, meant to run in a fresh interpreter:
+
+    python -m benchmarks.cold_start --config configs/reservation_slot_configs.json
+
+Times importing the controller, then loading the config and running the
+first decision cycle against the in-process fakes. The first cycle includes
+importing the google-cloud client libraries, as it would with real clients.
+Prints {"import_s": ..., "first_cycle_s": ...} as JSON.
+"""
+import time
+
+started = time.perf_counter()
+
+from core.controller import SlotController  # noqa: E402
+
+imported = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from typing import List, Optional  # noqa: E402
+
+DEFAULT_CONFIG_PATH = "configs/reservation_slot_configs.json"
+
+
+def first_cycle(config_path: str) -> None:
+    import pendulum
+
+    from benchmarks.fakes import FakeBigQueryClient, FakeReservationClient
+    from core.config import ConfigLoader
+    from core.decision_engine import DecisionEngine, ReservationManager
+    from core.metrics import BigQueryJobMetricsCollector
+
+    config = ConfigLoader(config_path).current.config
+    metadata = config["metadata"]
+    row = {
+        "count_job_submitted": 100,
+        "count_job_pending": 2,
+        "count_job_error": 0,
+        "queueing_time_p99": 5,
+        "max_running_time": 120,
+    }
+    engine = DecisionEngine(
+        config,
+        collector=BigQueryJobMetricsCollector(
+            project_id=metadata["project_id"],
+            location=metadata.get("location", "US"),
+            sql_path=config.get("sql_path", "queries/jobs_sla_metrics.sql"),
+            client=FakeBigQueryClient([row]),
+        ),
+        reservation_mgr=ReservationManager(
+            project_id=metadata["project_id"],
+            reservation_id=metadata["reservation_id"],
+            location=metadata.get("location", "US"),
+            client=FakeReservationClient(1000),
+        ),
+    )
+    SlotController(config, engine=engine).run(pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH)
+    args = parser.parse_args(argv)
+
+    first_cycle(args.config)
+    done = time.perf_counter()
+    print(json.dumps({"import_s": imported - started, "first_cycle_s": done - imported}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
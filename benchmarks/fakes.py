@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from core.reservation import reservation_types
+
+
+class CallCounter:
+    """Thread-safe count of calls per RPC name, shared by the fakes of one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def hit(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+class FakeRowIterator(list):
+    """List of rows with the total_rows attribute of a BigQuery RowIterator."""
+
+    @property
+    def total_rows(self) -> int:
+        return len(self)
+
+
+class FakeQueryJob:
+    def __init__(self, rows: List[Dict[str, Any]], latency_seconds: float, error: Optional[Exception]):
+        self.rows = rows
+        self.latency_seconds = latency_seconds
+        self.error = error
+
+    def done(self) -> bool:
+        return True
+
+    def result(self, timeout=None) -> FakeRowIterator:
+        time.sleep(self.latency_seconds)
+        if self.error is not None:
+            raise self.error
+        return FakeRowIterator(self.rows)
+
+    def cancel(self) -> None:
+        pass
+
+
+class FakeBigQueryClient:
+    """
+    Stands in for bigquery.Client. Every query returns the configured rows
+    (or raises the configured error) after latency_seconds.
+    """
+
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        latency_seconds: float = 0.0,
+        error: Optional[Exception] = None,
+        calls: Optional[CallCounter] = None,
+    ):
+        self.rows = rows
+        self.latency_seconds = latency_seconds
+        self.error = error
+        self.calls = calls or CallCounter()
+
+    def query(self, query: str, job_config=None) -> FakeQueryJob:
+        self.calls.hit("bigquery.query")
+        return FakeQueryJob(self.rows, self.latency_seconds, self.error)
+
+
+class FakeReservationClient:
+    """
+    Stands in for ReservationServiceClient: one reservation held in memory,
+    Get/Update answered after latency_seconds.
+    """
+
+    def __init__(
+        self,
+        max_slots: int,
+        current_slots: int = 0,
+        latency_seconds: float = 0.0,
+        calls: Optional[CallCounter] = None,
+    ):
+        self.latency_seconds = latency_seconds
+        self.calls = calls or CallCounter()
+        self.reservation = reservation_types.Reservation(
+            name="",
+            ignore_idle_slots=True,
+            autoscale=reservation_types.Reservation.Autoscale(
+                current_slots=current_slots, max_slots=max_slots
+            ),
+        )
+
+    @staticmethod
+    def reservation_path(project: str, location: str, reservation: str) -> str:
+        return f"projects/{project}/locations/{location}/reservations/{reservation}"
+
+    def set_max_slots(self, max_slots: int) -> None:
+        self.reservation.autoscale.max_slots = max_slots
+
+    def get_reservation(self, request=None, **kwargs):
+        self.calls.hit("reservation.get")
+        time.sleep(self.latency_seconds)
+        reservation = reservation_types.Reservation(self.reservation)
+        reservation.name = request.name
+        return reservation
+
+    def update_reservation(self, request=None, **kwargs):
+        self.calls.hit("reservation.update")
+        time.sleep(self.latency_seconds)
+        update = request.reservation
+        self.reservation.ignore_idle_slots = update.ignore_idle_slots
+        self.reservation.autoscale.max_slots = update.autoscale.max_slots
+        response = reservation_types.Reservation(self.reservation)
+        response.name = update.name
+        response.update_time = datetime.now(timezone.utc)
+        return response
@@ -0,0 +1,230 @@
+"""
+Decision-cycle benchmarks against in-process fakes.
+
+    python -m benchmarks.run --iterations 200 --query-latency-ms 5 --rpc-latency-ms 2 --output bench.json
+
+Reports p50/p99 cycle time of DecisionEngine.run and SlotController.run,
+the Reservation and BigQuery calls one cycle makes on each decision path,
+config-load time, import time and cold start (import plus first cycle in
+a fresh interpreter), as JSON.
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pendulum
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fakes import CallCounter, FakeBigQueryClient, FakeReservationClient
+from core.config import ConfigLoader
+from core.controller import SlotController
+from core.decision_engine import DecisionEngine, ReservationManager
+from core.metrics import BigQueryJobMetricsCollector
+from core.schedule import CompiledSchedule
+
+DEFAULT_CONFIG_PATH = "configs/reservation_slot_configs.json"
+# Monday 09:05 Jakarta: inside a mapped window, away from the :00/:30 reset
+EXECUTION_TIME = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta")
+SLA_THRESHOLDS = {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600}
+
+HEALTHY_ROW = {
+    "count_job_submitted": 100,
+    "count_job_pending": 2,
+    "count_job_done": 90,
+    "count_job_running": 8,
+    "count_job_error": 0,
+    "queueing_time_p99": 5,
+    "max_running_time": 120,
+}
+BREACH_ROW = {**HEALTHY_ROW, "count_job_pending": 60, "queueing_time_p99": 300}
+
+# decision path -> (rows returned by the metrics query, query error)
+PATHS = {
+    "healthy": ([HEALTHY_ROW], None),
+    "breach": ([BREACH_ROW], None),
+    "collection_failure": ([], RuntimeError("simulated BigQuery failure")),
+}
+
+
+def percentiles(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def timed(fn: Callable[[], Any], iterations: int, before: Callable[[], None]) -> List[float]:
+    out = []
+    for _ in range(iterations):
+        before()
+        start = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - start)
+    return out
+
+
+def bench_path(
+    config: Dict[str, Any],
+    path: str,
+    iterations: int,
+    query_latency: float,
+    rpc_latency: float,
+) -> Dict[str, Any]:
+    rows, error = PATHS[path]
+    metadata = config["metadata"]
+    calls = CallCounter()
+    bigquery_client = FakeBigQueryClient(rows, query_latency, error, calls)
+
+    schedule = CompiledSchedule.from_config(config)
+    initial_slots = schedule.resolve(EXECUTION_TIME)["min"]
+    reservation_client = FakeReservationClient(initial_slots, latency_seconds=rpc_latency, calls=calls)
+
+    engine = DecisionEngine(
+        config,
+        collector=BigQueryJobMetricsCollector(
+            project_id=metadata["project_id"],
+            location=metadata.get("location", "US"),
+            sql_path=config.get("sql_path", "queries/jobs_sla_metrics.sql"),
+            client=bigquery_client,
+        ),
+        reservation_mgr=ReservationManager(
+            project_id=metadata["project_id"],
+            reservation_id=metadata["reservation_id"],
+            location=metadata.get("location", "US"),
+            client=reservation_client,
+        ),
+    )
+    controller = SlotController(config, engine=engine)
+
+    def reset() -> None:
+        # every cycle starts from the same reservation and engine state
+        reservation_client.set_max_slots(initial_slots)
+        engine.previous_run_time = None
+        engine.scaling.reset()
+
+    # one warm-up cycle, then count the calls of a single cycle
+    reset()
+    engine.run(EXECUTION_TIME)
+    reset()
+    calls.reset()
+    engine.run(EXECUTION_TIME)
+    rpcs = calls.snapshot()
+
+    engine_times = timed(lambda: engine.run(EXECUTION_TIME), iterations, reset)
+    controller_times = timed(lambda: controller.run(EXECUTION_TIME), iterations, reset)
+
+    return {
+        "rpcs_per_cycle": rpcs,
+        "engine_run": percentiles(engine_times),
+        "controller_run": percentiles(controller_times),
+    }
+
+
+def bench_config_load(path: str, iterations: int) -> Dict[str, float]:
+    """Parse, validate and freeze the config file, as SlotController.from_file does."""
+    return percentiles(timed(lambda: ConfigLoader(path), iterations, lambda: None))
+
+
+def bench_import(module: str, runs: int) -> Dict[str, float]:
+    """Wall time of importing module in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    seconds = [
+        float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+        for _ in range(runs)
+    ]
+    return percentiles(seconds)
+
+
+def bench_cold_start(config_path: str, runs: int) -> Dict[str, Dict[str, float]]:
+    """Import plus config load and first cycle, each run in a fresh interpreter (benchmarks.cold_start)."""
+    samples = [
+        json.loads(subprocess.run(
+            [sys.executable, "-m", "benchmarks.cold_start", "--config", config_path],
+            capture_output=True, text=True, check=True,
+        ).stdout)
+        for _ in range(runs)
+    ]
+    return {
+        "import": percentiles([s["import_s"] for s in samples]),
+        "first_cycle": percentiles([s["first_cycle_s"] for s in samples]),
+        "total": percentiles([s["import_s"] + s["first_cycle_s"] for s in samples]),
+    }
+
+
+def run_benchmarks(
+    config_path: str = DEFAULT_CONFIG_PATH,
+    iterations: int = 200,
+    query_latency_ms: float = 0.0,
+    rpc_latency_ms: float = 0.0,
+    import_runs: int = 5,
+) -> Dict[str, Any]:
+    with open(config_path) as f:
+        config = json.load(f)
+    config["sla_thresholds"] = SLA_THRESHOLDS
+
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "query_latency_ms": query_latency_ms,
+        "rpc_latency_ms": rpc_latency_ms,
+        "paths": {
+            path: bench_path(config, path, iterations, query_latency_ms / 1000, rpc_latency_ms / 1000)
+            for path in PATHS
+        },
+        "config_load": bench_config_load(config_path, iterations),
+    }
+    if import_runs:
+        results["import"] = {
+            module: bench_import(module, import_runs)
+            for module in ("core.controller", "core.cli")
+        }
+        results["cold_start"] = bench_cold_start(config_path, import_runs)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark the decision cycle against in-process fakes.",
+    )
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--query-latency-ms", type=float, default=0.0)
+    parser.add_argument("--rpc-latency-ms", type=float, default=0.0)
+    parser.add_argument("--import-runs", type=int, default=5, help="0 skips the import benchmark.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument(
+        "--log-level",
+        default="CRITICAL",
+        help="Controller log level during the run (default CRITICAL keeps log I/O out of the timings).",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    results = run_benchmarks(
+        config_path=args.config,
+        iterations=args.iterations,
+        query_latency_ms=args.query_latency_ms,
+        rpc_latency_ms=args.rpc_latency_ms,
+        import_runs=args.import_runs,
+    )
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import argparse
+import logging
+from typing import List, Optional
+
+DEFAULT_CONFIG_PATH = "configs/reservation_slot_configs.json"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="BigQuery dynamic slot reservation controller.",
+    )
+    parser.add_argument(
+        "--config",
+        default=DEFAULT_CONFIG_PATH,
+        help=f"Path to the reservation slot config (default: {DEFAULT_CONFIG_PATH})",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single decision cycle and exit instead of serving.",
+    )
+    parser.add_argument(
+        "--interval-seconds",
+        type=float,
+        default=None,
+        help="Cycle cadence in serve mode (default: check_interval_minutes from config).",
+    )
+    parser.add_argument(
+        "--fleet",
+        action="store_true",
+        help="Treat the config as a fleet config and manage all its reservations.",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Python logging level (default: INFO).",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    # imported after argument parsing so --help and usage errors stay fast
+    if args.fleet:
+        from core.fleet import FleetController
+        controller = FleetController.from_file(args.config)
+    else:
+        from core.controller import SlotController
+        controller = SlotController.from_file(args.config)
+
+    if args.once:
+        controller.run()
+        return 0
+
+    controller.install_signal_handlers()
+    controller.serve(interval_seconds=args.interval_seconds)
+    return 0
@@ -0,0 +1,381 @@
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional
+
+from core.cost import DEFAULT_EDITION, EDITION_SLOT_HOUR_PRICES
+from core.degraded import DEGRADED_DEFAULTS, DEGRADED_POLICIES
+from core.metrics import segment_expression
+from core.scaling import build_scaling_strategy
+from core.schedule import CompiledSchedule, ScheduleCompileError
+from core.sla_policy import RULES, RULES_BY_METRIC
+
+
+METRICS_MODES = ("aggregate", "incremental", "jobs")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only deep copy: mappings become MappingProxyType, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _reservation_errors(config: Mapping[str, Any]) -> List[str]:
+    errors: List[str] = []
+
+    metadata = config.get("metadata")
+    if not isinstance(metadata, Mapping):
+        errors.append("metadata must be an object")
+    else:
+        for key in ("project_id", "reservation_id"):
+            if not isinstance(metadata.get(key), str) or not metadata.get(key):
+                errors.append(f"metadata.{key} must be a non-empty string")
+
+    interval = config.get("check_interval_minutes", 5)
+    if not _is_number(interval) or interval <= 0:
+        errors.append(f"check_interval_minutes must be a positive number, got {interval!r}")
+    lookback = config.get("min_lookback_minutes", 1)
+    if not _is_number(lookback) or lookback <= 0:
+        errors.append(f"min_lookback_minutes must be a positive number, got {lookback!r}")
+
+    adjustment = config.get("default_adjustment_slots", 50)
+    if not isinstance(adjustment, int) or isinstance(adjustment, bool) or adjustment <= 0 or adjustment % 50:
+        errors.append(f"default_adjustment_slots must be a positive multiple of 50, got {adjustment!r}")
+
+    thresholds = config.get("sla_thresholds", {})
+    errors.extend(_threshold_errors(thresholds, "sla_thresholds"))
+    if isinstance(thresholds, Mapping):
+        for rule in RULES:
+            if rule.required and rule.metric not in thresholds:
+                errors.append(f"Missing required SLA threshold {rule.metric!r}")
+
+    errors.extend(_metrics_mode_errors(config))
+    errors.extend(_segmentation_errors(config))
+    errors.extend(_prewarm_errors(config))
+    errors.extend(_stabilization_errors(config))
+    errors.extend(_cost_errors(config))
+    errors.extend(_degraded_errors(config))
+
+    try:
+        build_scaling_strategy(config)
+    except (ValueError, TypeError, AttributeError) as exc:
+        errors.append(str(exc))
+
+    try:
+        CompiledSchedule.from_config(config)
+    except ScheduleCompileError as exc:
+        errors.append(str(exc))
+    except (ValueError, TypeError, AttributeError, KeyError) as exc:
+        errors.append(f"Malformed schedule: {exc!r}")
+
+    return errors
+
+
+def _threshold_errors(thresholds: Any, where: str) -> List[str]:
+    if not isinstance(thresholds, Mapping):
+        return [f"{where} must be an object"]
+    errors = []
+    for metric, value in thresholds.items():
+        if metric not in RULES_BY_METRIC:
+            errors.append(f"Unknown SLA threshold {metric!r} in {where} (known: {sorted(RULES_BY_METRIC)})")
+        elif not _is_number(value) or value < 0:
+            errors.append(f"SLA threshold {metric!r} in {where} must be a non-negative number, got {value!r}")
+    return errors
+
+
+def _segmentation_errors(config: Mapping[str, Any]) -> List[str]:
+    segmentation = config.get("segmentation")
+    if not segmentation:
+        return []
+    if not isinstance(segmentation, Mapping):
+        return ["segmentation must be an object"]
+
+    errors = []
+    try:
+        segment_expression(str(segmentation.get("by")))
+    except ValueError as exc:
+        errors.append(str(exc))
+    if config.get("metrics_mode") in ("incremental", "jobs"):
+        errors.append(f"segmentation is not supported with metrics_mode {config['metrics_mode']}")
+    default_weight = segmentation.get("default_weight", 1.0)
+    if not _is_number(default_weight) or default_weight < 0:
+        errors.append(f"segmentation.default_weight must be a non-negative number, got {default_weight!r}")
+    breach_weight = segmentation.get("breach_weight", 1.0)
+    if not _is_number(breach_weight) or breach_weight <= 0:
+        errors.append(f"segmentation.breach_weight must be a positive number, got {breach_weight!r}")
+
+    segments = segmentation.get("segments", {})
+    if not isinstance(segments, Mapping):
+        return errors + ["segmentation.segments must be an object"]
+    for name, segment in segments.items():
+        if not isinstance(segment, Mapping):
+            errors.append(f"segmentation.segments.{name} must be an object")
+            continue
+        weight = segment.get("weight", 1.0)
+        if not _is_number(weight) or weight < 0:
+            errors.append(f"segmentation.segments.{name}.weight must be a non-negative number, got {weight!r}")
+        errors.extend(_threshold_errors(segment.get("sla_thresholds", {}), f"segmentation.segments.{name}"))
+    return errors
+
+
+def _metrics_mode_errors(config: Mapping[str, Any]) -> List[str]:
+    mode = config.get("metrics_mode", "aggregate")
+    if mode not in METRICS_MODES:
+        return [f"Unknown metrics_mode {mode!r} (known: {list(METRICS_MODES)})"]
+    if mode != "jobs":
+        return []
+    errors = []
+    if importlib.util.find_spec("pyarrow") is None:
+        errors.append("metrics_mode jobs needs pyarrow installed")
+    job_metrics = config.get("job_metrics", {})
+    if not isinstance(job_metrics, Mapping):
+        return errors + ["job_metrics must be an object"]
+    max_queue_seconds = job_metrics.get("max_queue_seconds", 86400)
+    if not isinstance(max_queue_seconds, int) or isinstance(max_queue_seconds, bool) or max_queue_seconds < 1:
+        errors.append(f"job_metrics.max_queue_seconds must be a positive integer, got {max_queue_seconds!r}")
+    return errors
+
+
+def _prewarm_errors(config: Mapping[str, Any]) -> List[str]:
+    prewarm = config.get("prewarm")
+    if not prewarm:
+        return []
+    if not isinstance(prewarm, Mapping):
+        return ["prewarm must be an object"]
+    # key -> (default, lowest, highest)
+    bounds = {
+        "lead_minutes": (10, 0, 24 * 60),
+        "release_minutes": (0, 0, 30),
+        "ramp_minutes": (15, 1, 30),
+        "ramp_quantile": (0.9, 0, 1),
+        "history_days": (14, 0, 366),
+        "refresh_minutes": (60, 0, 24 * 60),
+    }
+    errors = []
+    for key, (default, low, high) in bounds.items():
+        value = prewarm.get(key, default)
+        if not _is_number(value) or not low <= value <= high:
+            errors.append(f"prewarm.{key} must be a number in [{low}, {high}], got {value!r}")
+    return errors
+
+
+def _stabilization_errors(config: Mapping[str, Any]) -> List[str]:
+    stabilization = config.get("stabilization")
+    if not stabilization:
+        return []
+    if not isinstance(stabilization, Mapping):
+        return ["stabilization must be an object"]
+    errors = []
+    confirm = stabilization.get("confirm_breaches", 1)
+    window = stabilization.get("confirm_window", confirm)
+    if not isinstance(confirm, int) or isinstance(confirm, bool) or confirm < 1:
+        errors.append(f"stabilization.confirm_breaches must be a positive integer, got {confirm!r}")
+    elif not isinstance(window, int) or isinstance(window, bool) or window < confirm:
+        errors.append(f"stabilization.confirm_window must be an integer >= confirm_breaches, got {window!r}")
+    for key in ("scale_up_cooldown_minutes", "scale_down_cooldown_minutes", "min_dwell_minutes"):
+        value = stabilization.get(key, 0)
+        if not _is_number(value) or value < 0:
+            errors.append(f"stabilization.{key} must be a non-negative number, got {value!r}")
+    return errors
+
+
+def _cost_errors(config: Mapping[str, Any]) -> List[str]:
+    cost = config.get("cost")
+    if not cost:
+        return []
+    if not isinstance(cost, Mapping):
+        return ["cost must be an object"]
+    errors = []
+    edition = cost.get("edition", DEFAULT_EDITION)
+    if edition not in EDITION_SLOT_HOUR_PRICES:
+        errors.append(f"Unknown cost.edition {edition!r} (known: {sorted(EDITION_SLOT_HOUR_PRICES)})")
+    price = cost.get("slot_hour_price")
+    if price is not None and (not _is_number(price) or price < 0):
+        errors.append(f"cost.slot_hour_price must be a non-negative number, got {price!r}")
+    return errors
+
+
+def _degraded_errors(config: Mapping[str, Any]) -> List[str]:
+    degraded = config.get("degraded_mode")
+    if not degraded:
+        return []
+    if not isinstance(degraded, Mapping):
+        return ["degraded_mode must be an object"]
+    errors = []
+    threshold = degraded.get("failure_threshold", DEGRADED_DEFAULTS["failure_threshold"])
+    if not isinstance(threshold, int) or isinstance(threshold, bool) or threshold < 1:
+        errors.append(f"degraded_mode.failure_threshold must be a positive integer, got {threshold!r}")
+    for key in ("backoff_minutes", "max_backoff_minutes", "staleness_budget_minutes"):
+        value = degraded.get(key, DEGRADED_DEFAULTS[key])
+        if not _is_number(value) or value < 0:
+            errors.append(f"degraded_mode.{key} must be a non-negative number, got {value!r}")
+    policy = degraded.get("policy", DEGRADED_DEFAULTS["policy"])
+    if policy not in DEGRADED_POLICIES:
+        errors.append(f"Unknown degraded_mode.policy {policy!r} (known: {list(DEGRADED_POLICIES)})")
+    return errors
+
+
+def _fleet_errors(config: Mapping[str, Any]) -> List[str]:
+    fleet = config.get("fleet", {})
+    if not isinstance(fleet, Mapping):
+        return ["fleet must be an object"]
+    errors = []
+    timeout = fleet.get("region_timeout_seconds", 60)
+    if not _is_number(timeout) or timeout <= 0:
+        errors.append(f"fleet.region_timeout_seconds must be a positive number, got {timeout!r}")
+    timeouts = fleet.get("region_timeouts", {})
+    if not isinstance(timeouts, Mapping):
+        errors.append("fleet.region_timeouts must map locations to seconds")
+    else:
+        for location, value in timeouts.items():
+            if not _is_number(value) or value <= 0:
+                errors.append(f"fleet.region_timeouts.{location} must be a positive number, got {value!r}")
+    return errors
+
+
+def validate_config(config: Mapping[str, Any]) -> None:
+    """
+    Raise ConfigError listing every problem found in a reservation or fleet
+    config: metadata, intervals, SLA threshold names and values, scaling
+    strategy, and the schedule (compiled as the engine would).
+    """
+    if not isinstance(config, Mapping):
+        raise ConfigError("Config must be a JSON object")
+
+    if "reservations" in config:
+        # imported here: core.fleet imports the controller, which imports this module
+        from core.fleet import reservation_configs
+
+        entries = config["reservations"]
+        if not isinstance(entries, (list, tuple)) or not entries:
+            raise ConfigError("reservations must be a non-empty list")
+        if not all(isinstance(entry, Mapping) for entry in entries):
+            raise ConfigError("every reservations entry must be an object")
+        errors = _fleet_errors(config) + [
+            f"reservations[{i}]: {error}"
+            for i, entry in enumerate(reservation_configs(config))
+            for error in _reservation_errors(entry)
+        ]
+    else:
+        errors = _reservation_errors(config)
+
+    if errors:
+        raise ConfigError("Invalid config:\n  " + "\n  ".join(errors))
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """A validated, read-only config and the file version it came from."""
+    config: Mapping[str, Any]
+    digest: str
+    path: Optional[str] = None
+    mtime_ns: Optional[int] = None
+    loaded_at: float = 0.0
+
+
+class ConfigLoader:
+    """
+    Holds the current ConfigSnapshot of a config file.
+
+    reload_if_changed() costs one stat() while the file is untouched. When
+    the mtime or size moves, the file is re-read and hashed; only a changed
+    digest is parsed and validated, and only a valid config replaces the
+    snapshot, in one reference swap. An invalid edit is logged and the last
+    good snapshot stays in effect.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self.last_error: Optional[str] = None
+        if not self.path.exists():
+            raise FileNotFoundError(f"Config file not found: {path}")
+        self._snapshot = self._load()
+
+    @property
+    def current(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def _load(self) -> ConfigSnapshot:
+        stat = os.stat(self.path)
+        data = self.path.read_bytes()
+        snapshot = self._parse(data, stat.st_mtime_ns)
+        self._stat_key = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _parse(self, data: bytes, mtime_ns: int) -> ConfigSnapshot:
+        try:
+            config = json.loads(data)
+        except ValueError as exc:
+            raise ConfigError(f"Config file {self.path} is not valid JSON: {exc}") from exc
+        try:
+            validate_config(config)
+        except ConfigError:
+            raise
+        except Exception as exc:
+            # a value of the wrong type can trip a validator before it is reported
+            raise ConfigError(f"Config file {self.path} could not be validated: {exc!r}") from exc
+        return ConfigSnapshot(
+            config=freeze(config),
+            digest=hashlib.sha256(data).hexdigest(),
+            path=str(self.path),
+            mtime_ns=mtime_ns,
+            loaded_at=time.time(),
+        )
+
+    def reload_if_changed(self) -> bool:
+        """Swap in the file's config if it changed and is valid; True when swapped."""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError as exc:
+                logging.warning(f"Cannot stat config {self.path}, keeping current config: {exc}")
+                return False
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat_key:
+                return False
+
+            try:
+                data = self.path.read_bytes()
+            except OSError as exc:
+                logging.warning(f"Cannot read config {self.path}, keeping current config: {exc}")
+                return False
+            self._stat_key = stat_key
+            digest = hashlib.sha256(data).hexdigest()
+            if digest == self._snapshot.digest:
+                # touched but not edited
+                return False
+
+            try:
+                snapshot = self._parse(data, stat.st_mtime_ns)
+            except ConfigError as exc:
+                self.last_error = str(exc)
+                logging.error(
+                    f"Rejected config change to {self.path}; keeping snapshot "
+                    f"{self._snapshot.digest[:12]}. {exc}"
+                )
+                return False
+
+            self.last_error = None
+            self._snapshot = snapshot
+            logging.info(f"Reloaded config {self.path} (snapshot {snapshot.digest[:12]})")
+            return True
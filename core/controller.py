@@ -1,30 +1,92 @@
 import json
 import logging
+import os
+import signal
+import threading
+import time
 import pendulum
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from core.config import ConfigLoader
+from core.cost import CostAccountant, slot_hour_price
 from core.decision_engine import DecisionEngine
+from core.instrumentation import REGISTRY, start_http_server
+from core.polling import AdaptivePoller
+from core.sla_policy import SLAEvaluationResult
+from core.store import MetricsStore
+
+
+def seconds_to_next_tick(now: float, interval_seconds: float) -> float:
+    """Seconds from epoch time now to the next wall-clock multiple of interval_seconds."""
+    if interval_seconds <= 0:
+        return 0.0
+    return interval_seconds - now % interval_seconds
+
 
 class SlotController:
     """Wrapper to manage slot adjustments using the DecisionEngine."""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], engine: Optional[DecisionEngine] = None):
         self.config = config
-        self.engine = DecisionEngine(config)
+        self.engine = engine if engine is not None else DecisionEngine(config)
+        self.store = MetricsStore.from_config(config)
+        self.poller = AdaptivePoller.from_config(config)
+        self.cost = CostAccountant.from_config(config)
+        self._stop_event = threading.Event()
+        self.config_loader: Optional[ConfigLoader] = None
+        self._start_instrumentation()
 
     @classmethod
     def from_file(cls, path: str) -> "SlotController":
-        """Load config from JSON file."""
-        path_obj = Path(path)
-        if not path_obj.exists():
-            raise FileNotFoundError(f"Config file not found: {path}")
+        """
+        Load and validate config from a JSON file (raises ConfigError).
+        serve() picks up later edits of the file between cycles.
+        """
+        loader = ConfigLoader(path)
+        controller = cls(loader.current.config)
+        controller.config_loader = loader
+        return controller
+
+    def reload_config(self) -> bool:
+        """
+        Apply the config file's latest valid snapshot, if it changed.
+        Invalid edits are rejected by the loader and the running config
+        stays in effect; True when a new config was applied.
+        """
+        if self.config_loader is None or not self.config_loader.reload_if_changed():
+            return False
+        try:
+            self._apply_config(self.config_loader.current.config)
+        except Exception:
+            logging.exception("Failed to apply reloaded config; keeping the running config")
+            return False
+        return True
 
-        with path_obj.open("r") as f:
-            config = json.load(f)
-        return cls(config)
+    def _apply_config(self, config: Dict[str, Any]) -> None:
+        """Rebuild the engine for a new config, carrying over its running state (see DecisionEngine.carry_over)."""
+        engine = DecisionEngine(config)
+        engine.carry_over(self.engine)
+        store = self._reload_store(config)
+        poller = self.poller
+        if poller is not None and config.get("adaptive_polling") != self.config.get("adaptive_polling"):
+            # its settings reload; switching adaptive polling on or off takes a restart
+            poller = AdaptivePoller.from_config(config) or poller
+        previous_store = self.store
+        self.config, self.engine, self.store, self.poller = config, engine, store, poller
+        if previous_store is not None and previous_store is not store:
+            previous_store.close()
+        if self.cost is not None and config.get("cost"):
+            # totals carry over; later intervals use the new price
+            self.cost.slot_hour_price = slot_hour_price(config)
 
-    def run(self, execution_time: Any = None) -> None:
+    def _reload_store(self, config: Dict[str, Any]) -> Optional[MetricsStore]:
+        """The running metrics store while its section is unchanged, else one for the new section."""
+        if config.get("metrics_store") == self.config.get("metrics_store"):
+            return self.store
+        return MetricsStore.from_config(config)
+
+    def run(self, execution_time: Any = None) -> Optional[SLAEvaluationResult]:
         """Run decision engine at the specified execution time."""
         if execution_time is None:
             execution_time = pendulum.now("Asia/Jakarta")
@@ -34,4 +96,192 @@ class SlotController:
             execution_time = pendulum.instance(execution_time, tz="Asia/Jakarta")
 
         logging.info(f"Running slot controller at {execution_time}")
-        self.engine.run(execution_time)
+        reservation_id = self.config["metadata"]["reservation_id"]
+        self._refresh_prewarm(reservation_id, self.engine, execution_time)
+        result = self.engine.run(execution_time)
+        self._record(reservation_id, self.engine)
+        self._account(reservation_id, self.engine)
+        self._export_metrics()
+        return result
+
+    def _start_instrumentation(self) -> None:
+        """Start the OpenMetrics endpoint if "instrumentation.port" is configured."""
+        self.instrumentation = self.config.get("instrumentation", {})
+        self.metrics_server = None
+        if self.instrumentation.get("port") is not None:
+            self.metrics_server = start_http_server(
+                self.instrumentation["port"], self.instrumentation.get("address", "")
+            )
+
+    def _export_metrics(self) -> None:
+        """Rewrite the OpenMetrics textfile and the cost report, if configured."""
+        path = self.instrumentation.get("textfile")
+        if path:
+            try:
+                REGISTRY.write_textfile(path)
+            except OSError:
+                logging.exception(f"Failed to write metrics textfile {path}")
+
+        report_path = self.config.get("cost", {}).get("report_path")
+        if self.cost is not None and report_path:
+            try:
+                target = Path(report_path)
+                tmp_path = target.with_suffix(target.suffix + ".tmp")
+                tmp_path.write_text(json.dumps(self.cost.summary(), indent=2))
+                os.replace(tmp_path, target)
+            except OSError:
+                logging.exception(f"Failed to write cost report {report_path}")
+
+    def _account(self, reservation_id: str, engine: DecisionEngine) -> None:
+        """
+        Charge the cycle's slot levels to the cost accountant, if configured.
+        The reservation state is the one the cycle already read or wrote.
+        """
+        record = engine.last_cycle
+        if self.cost is None or record is None or record.slots is None:
+            return
+        try:
+            state = engine.reservation_mgr.get_state()
+            self.cost.observe(
+                reservation_id,
+                record.execution_time.timestamp(),
+                current_slots=state["autoscale_current_slots"],
+                max_slots=record.slots,
+                profile_max=engine.get_slot_config_for_time(record.execution_time)["max"],
+            )
+        except Exception:
+            # accounting is for reporting; never fail a cycle because of it
+            logging.exception("Failed to account cycle cost")
+
+    def _refresh_prewarm(self, reservation_id: str, engine: DecisionEngine, execution_time: pendulum.DateTime) -> None:
+        """Let the engine's look-ahead planner learn window ramps from the metrics store."""
+        if self.store is not None and engine.prewarm is not None:
+            engine.prewarm.refresh(self.store, reservation_id, execution_time)
+
+    @staticmethod
+    def _used_slots(engine: DecisionEngine) -> Optional[int]:
+        """Slots autoscaling had allocated, from the reservation state the cycle already read."""
+        try:
+            used = engine.reservation_mgr.get_state()["autoscale_current_slots"]
+        except Exception:
+            logging.exception("Failed to read autoscaled slots for the metrics store")
+            return None
+        return used if isinstance(used, int) else None
+
+    def _record(self, reservation_id: str, engine: DecisionEngine) -> None:
+        """Append the engine's last cycle to the metrics store, if configured."""
+        if self.store is None or engine.last_cycle is None:
+            return
+        try:
+            self.store.append(reservation_id, engine.last_cycle, used_slots=self._used_slots(engine))
+        except Exception:
+            # the store is for analysis; never fail a cycle because of it
+            logging.exception("Failed to record cycle in metrics store")
+
+    def serve(
+        self,
+        interval_seconds: Optional[float] = None,
+        max_cycles: Optional[int] = None,
+    ) -> int:
+        """
+        Run decision cycles on a fixed cadence until stopped.
+
+        The engine, its BigQuery client and its Reservation API channel are
+        built once in __init__ and reused by every cycle. The first cycle
+        runs right away; later ticks fall on wall-clock multiples of the
+        interval (:00, :05, ... for five minutes), so cycles line up with
+        the schedule's 30-minute windows and a slow cycle does not shift
+        later ticks. A cycle that overruns its interval is logged and the
+        missed ticks are skipped rather than run back to back.
+
+        With an "adaptive_polling" config section and no explicit interval,
+        the cadence is adaptive instead (see AdaptivePoller).
+
+        Returns the number of cycles executed.
+        """
+        if interval_seconds is None and self.poller is not None:
+            return self._serve_adaptive(max_cycles)
+        if interval_seconds is None:
+            interval_seconds = self.config.get("check_interval_minutes", 5) * 60
+
+        self._stop_event.clear()
+        cycles = 0
+
+        while not self._stop_event.is_set():
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+
+            cycle_start = time.monotonic()
+            self.reload_config()
+            try:
+                self.run()
+            except Exception:
+                # keep the daemon alive; the next tick gets a fresh attempt
+                logging.exception("Slot controller cycle failed")
+            cycles += 1
+            elapsed = time.monotonic() - cycle_start
+
+            if interval_seconds > 0 and elapsed > interval_seconds:
+                skipped = int(elapsed // interval_seconds)
+                logging.warning(
+                    f"Slot controller cycle overran its interval: took {elapsed:.2f}s "
+                    f"(interval {interval_seconds:.2f}s), skipping {skipped} tick(s)"
+                )
+            else:
+                logging.info(f"Slot controller cycle finished in {elapsed:.2f}s")
+
+            self._stop_event.wait(seconds_to_next_tick(time.time(), interval_seconds))
+
+        logging.info(f"Slot controller stopped after {cycles} cycle(s)")
+        return cycles
+
+    def _serve_adaptive(self, max_cycles: Optional[int] = None) -> int:
+        """
+        Run full decision cycles when the poller asks for one and cheap
+        pending-jobs probes in between. Only full cycles are counted.
+        Full cycles run at whatever time the poller picks; the engine
+        resets the window on the first one after a 30-minute boundary.
+        """
+        self._stop_event.clear()
+        cycles = 0
+
+        while not self._stop_event.is_set():
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+
+            now = time.monotonic()
+            poller = self.poller
+            if poller.full_cycle_due(now):
+                if self.reload_config():
+                    poller = self.poller
+                result = None
+                try:
+                    result = self.run()
+                except Exception:
+                    # keep the daemon alive; the next poll gets a fresh attempt
+                    logging.exception("Slot controller cycle failed")
+                cycles += 1
+                poller.record_cycle(now, breached=result is not None and not result.healthy)
+                logging.info(f"Slot controller cycle finished in {time.monotonic() - now:.2f}s")
+            else:
+                since = pendulum.now("Asia/Jakarta").subtract(seconds=poller.check_interval_seconds)
+                poller.probe(since)
+
+            self._stop_event.wait(poller.next_delay(time.monotonic()))
+
+        logging.info(f"Slot controller stopped after {cycles} cycle(s)")
+        return cycles
+
+    def stop(self) -> None:
+        """Request a graceful stop; the in-flight cycle is allowed to finish."""
+        self._stop_event.set()
+
+    def install_signal_handlers(self) -> None:
+        """Stop the serve loop on SIGINT/SIGTERM. Must be called from the main thread."""
+
+        def _handle(signum, _frame):
+            logging.info(f"Received signal {signum}, stopping slot controller")
+            self.stop()
+
+        signal.signal(signal.SIGINT, _handle)
+        signal.signal(signal.SIGTERM, _handle)
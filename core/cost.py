@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from core.instrumentation import REGISTRY
+
+# BigQuery editions pay-as-you-go list prices, USD per slot-hour (US multi-region)
+EDITION_SLOT_HOUR_PRICES = {
+    "standard": 0.04,
+    "enterprise": 0.06,
+    "enterprise_plus": 0.10,
+}
+DEFAULT_EDITION = "enterprise"
+WINDOW_SECONDS = 30 * 60
+
+SLOT_HOURS = REGISTRY.counter(
+    "slot_controller_slot_hours",
+    "Slot-hours per reservation: billed (autoscale current slots), ceiling (max slots held) "
+    "and counterfactual (profile max held, i.e. no controller).",
+    ("reservation", "kind"),
+)
+COST_DOLLARS = REGISTRY.counter(
+    "slot_controller_cost_dollars",
+    "Slot cost in USD per reservation, by the same kinds as slot_controller_slot_hours.",
+    ("reservation", "kind"),
+)
+SAVINGS_RATIO = REGISTRY.gauge(
+    "slot_controller_savings_ratio",
+    "1 - billed cost / counterfactual cost since the controller started.",
+    ("reservation",),
+)
+
+
+def slot_hour_price(config: Dict[str, Any]) -> float:
+    """USD per slot-hour: cost.slot_hour_price, the legacy slot_hour_price, or the edition's list price."""
+    cost = config.get("cost", {})
+    if cost.get("slot_hour_price") is not None:
+        return cost["slot_hour_price"]
+    if config.get("slot_hour_price") is not None:
+        return config["slot_hour_price"]
+    return EDITION_SLOT_HOUR_PRICES[cost.get("edition", DEFAULT_EDITION)]
+
+
+@dataclass
+class CostTotals:
+    seconds: float = 0.0
+    slot_hours: float = 0.0
+    ceiling_slot_hours: float = 0.0
+    counterfactual_slot_hours: float = 0.0
+    # dollars at the price in effect for each interval
+    cost: float = 0.0
+    ceiling_cost: float = 0.0
+    counterfactual_cost: float = 0.0
+
+    def add(self, seconds: float, current_slots: float, max_slots: float, profile_max: float, price: float) -> None:
+        hours = seconds / 3600
+        self.seconds += seconds
+        self.slot_hours += current_slots * hours
+        self.ceiling_slot_hours += max_slots * hours
+        self.counterfactual_slot_hours += profile_max * hours
+        self.cost += current_slots * hours * price
+        self.ceiling_cost += max_slots * hours * price
+        self.counterfactual_cost += profile_max * hours * price
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "seconds": round(self.seconds, 3),
+            "slot_hours": round(self.slot_hours, 3),
+            "ceiling_slot_hours": round(self.ceiling_slot_hours, 3),
+            "counterfactual_slot_hours": round(self.counterfactual_slot_hours, 3),
+            "cost": round(self.cost, 2),
+            "ceiling_cost": round(self.ceiling_cost, 2),
+            "counterfactual_cost": round(self.counterfactual_cost, 2),
+            "savings": round(self.counterfactual_cost - self.cost, 2),
+            "savings_pct": (
+                round(100 * (1 - self.cost / self.counterfactual_cost), 2) if self.counterfactual_cost else 0.0
+            ),
+        }
+
+
+class CostAccountant:
+    """
+    Running slot-hour and dollar totals per reservation and 30-minute window.
+
+    Each observation charges the time since the reservation's previous one
+    at the previous levels, which held over that interval:
+      - billed: autoscale_current_slots, what autoscaling actually allocated
+      - ceiling: the max slots the controller had set
+      - counterfactual: the window's profile max, the ceiling that would
+        have been held without the controller
+    Gaps longer than max_gap_seconds (e.g. a controller restart) are not
+    charged. Savings compare billed cost with the counterfactual ceiling, so
+    they are an upper bound on what the controller saved.
+    """
+
+    def __init__(self, slot_hour_price: float, max_gap_seconds: float = 900, max_windows: int = 5000):
+        self.slot_hour_price = slot_hour_price
+        self.max_gap_seconds = max_gap_seconds
+        self.max_windows = max_windows
+        self.totals: Dict[str, CostTotals] = {}
+        # (reservation, window start epoch) -> totals, oldest first
+        self.windows: "OrderedDict[Tuple[str, int], CostTotals]" = OrderedDict()
+        self._last: Dict[str, Tuple[float, float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["CostAccountant"]:
+        """Build the accountant from the optional "cost" config section."""
+        cost = config.get("cost")
+        if not cost or not cost.get("enabled", True):
+            return None
+        return cls(
+            slot_hour_price(config),
+            max_gap_seconds=cost.get("max_gap_minutes", 3 * config.get("check_interval_minutes", 5)) * 60,
+        )
+
+    def observe(self, reservation: str, ts: float, current_slots: float, max_slots: float, profile_max: float) -> None:
+        """Record the levels seen at epoch ts and charge the interval since the last observation."""
+        with self._lock:
+            last = self._last.get(reservation)
+            self._last[reservation] = (ts, current_slots, max_slots, profile_max)
+            if last is None:
+                return
+            last_ts, last_current, last_max, last_profile_max = last
+            seconds = ts - last_ts
+            if seconds <= 0 or seconds > self.max_gap_seconds:
+                return
+
+            window = int(last_ts - last_ts % WINDOW_SECONDS)
+            totals = self.totals.setdefault(reservation, CostTotals())
+            window_totals = self.windows.get((reservation, window))
+            if window_totals is None:
+                window_totals = self.windows[(reservation, window)] = CostTotals()
+                while len(self.windows) > self.max_windows:
+                    self.windows.popitem(last=False)
+            price = self.slot_hour_price
+            for entry in (totals, window_totals):
+                entry.add(seconds, last_current, last_max, last_profile_max, price)
+            savings_ratio = None
+            if totals.counterfactual_cost:
+                savings_ratio = 1 - totals.cost / totals.counterfactual_cost
+
+        hours = seconds / 3600
+        for kind, slots in (("billed", last_current), ("ceiling", last_max), ("counterfactual", last_profile_max)):
+            SLOT_HOURS.inc(slots * hours, reservation=reservation, kind=kind)
+            COST_DOLLARS.inc(slots * hours * price, reservation=reservation, kind=kind)
+        if savings_ratio is not None:
+            SAVINGS_RATIO.set(savings_ratio, reservation=reservation)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per reservation and per window, for dashboards and reports."""
+        with self._lock:
+            return {
+                "slot_hour_price": self.slot_hour_price,
+                "reservations": {
+                    reservation: totals.summary()
+                    for reservation, totals in self.totals.items()
+                },
+                "windows": [
+                    {"reservation": reservation, "window_start": window, **totals.summary()}
+                    for (reservation, window), totals in self.windows.items()
+                ],
+            }
@@ -1,24 +1,79 @@
+import asyncio
 import logging
 import pendulum
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
 
-from core.metrics import BigQueryJobMetricsCollector, MetricsCollectionError
+from core.metrics import (
+    AsyncBigQueryJobMetricsCollector,
+    BigQueryJobMetricsCollector,
+    MetricsCollectionError,
+    SlotUtilizationCollector,
+)
+from core.incremental_metrics import IncrementalJobMetricsCollector
+from core.job_metrics import JobLevelMetricsCollector
+from core.instrumentation import CYCLES, MAX_SLOTS, timed
 from core.sla_policy import SLAPolicy, SLAEvaluationResult
-from core.reservation import BigQuerySlotReservation, assert_max_slot_value
+from core.reservation import (
+    AsyncBigQuerySlotReservation,
+    BigQuerySlotReservation,
+    assert_max_slot_value,
+    round_up_slots,
+)
+from core.prewarm import LookAheadPlanner, window_start
+from core.scaling import build_scaling_strategy
+from core.stabilizer import Stabilizer
+from core.degraded import DegradedMode
+from core.schedule import CompiledSchedule
+
+
+CIRCUIT_OPEN_MESSAGE = "metrics query skipped: circuit breaker open"
+
+
+@dataclass
+class CycleRecord:
+    """What one decision cycle saw and did."""
+    execution_time: pendulum.DateTime
+    metrics: Optional[Dict[str, Any]]
+    result: Optional[SLAEvaluationResult]
+    current_slots: Optional[int]
+    target_slots: Optional[int]
+    error: Optional[str] = None
+
+    @property
+    def slots(self) -> Optional[int]:
+        """Max slots in effect after the cycle."""
+        return self.target_slots if self.target_slots is not None else self.current_slots
+
+
+def metrics_query(config: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """SQL file and segmentation dimension of the jobs metrics query."""
+    segmentation = config.get("segmentation")
+    if segmentation:
+        return segmentation.get("sql_path", "queries/jobs_sla_metrics_by_segment.sql"), segmentation["by"]
+    return config.get("sql_path", "queries/jobs_sla_metrics.sql"), None
 
 
 class ReservationManager:
     """Wrapper around BigQuerySlotReservation with utility methods."""
 
-    def __init__(self, project_id: str, reservation_id: str, location: str):
+    def __init__(self, project_id: str, reservation_id: str, location: str, client: Any = None):
         self.reservation_client = BigQuerySlotReservation(
             project_id=project_id,
             reservation_id=reservation_id,
-            zone=location
+            zone=location,
+            client=client
         )
 
+    def begin_cycle(self) -> None:
+        """Forget reservation state cached by the previous cycle."""
+        self.reservation_client.invalidate()
+
+    def get_state(self) -> Dict[str, Any]:
+        return self.reservation_client.get()
+
     def get_current_slots(self) -> int:
-        return self.reservation_client.get()["autoscale_max_slots"]
+        return self.get_state()["autoscale_max_slots"]
 
     def add_slots(self, increment: int) -> None:
         current = self.get_current_slots()
@@ -37,27 +92,118 @@ class ReservationManager:
 class DecisionEngine:
     """Core decision engine for slot adjustment based on SLA & metrics."""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        collector: Optional[BigQueryJobMetricsCollector] = None,
+        reservation_mgr: Optional[ReservationManager] = None,
+        utilization_collector: Optional[SlotUtilizationCollector] = None,
+    ):
+        """
+        collector and reservation_mgr default to the BigQuery-backed
+        implementations; pass substitutes to run the same decision logic
+        against other sources (e.g. offline replay). The BigQuery slot
+        utilization collector is only built alongside the default metrics
+        collector: with an injected collector, utilization_scale_down uses
+        utilization_collector and is off without one.
+        """
+        injected = collector is not None
         self.config = config
         metadata = config["metadata"]
 
         self.slot_profiles = config.get("reservation_slot_profiles", {})
         self.time_mapping = config.get("reservation_time_mapping", {})
+        # the metrics window is the time since the previous cycle, within these bounds
         self.check_interval_minutes = config.get("check_interval_minutes", 5)
+        self.min_lookback_minutes = config.get("min_lookback_minutes", 1)
+        # compiled once; unknown profiles fail here rather than mid-schedule
+        self.schedule = CompiledSchedule.from_config(config)
 
-        self.collector = BigQueryJobMetricsCollector(
-            project_id=metadata["project_id"],
-            location=metadata.get("location", "US"),
-            sql_path=config.get("sql_path", "queries/jobs_sla_metrics.sql"),
-        )
+        if collector is None and config.get("metrics_mode") == "incremental":
+            collector = IncrementalJobMetricsCollector(
+                project_id=metadata["project_id"],
+                location=metadata.get("location", "US"),
+                sql_path=config.get("incremental_sql_path", "queries/jobs_incremental.sql"),
+                state_path=config.get("metrics_state_path"),
+                retain_seconds=self.check_interval_minutes * 60,
+                lookback_seconds=self.check_interval_minutes * 60,
+            )
+        elif collector is None and config.get("metrics_mode") == "jobs":
+            job_metrics = config.get("job_metrics", {})
+            collector = JobLevelMetricsCollector(
+                project_id=metadata["project_id"],
+                location=metadata.get("location", "US"),
+                sql_path=job_metrics.get("sql_path", "queries/jobs_job_level.sql"),
+                detail_sql_path=job_metrics.get("detail_sql_path", "queries/jobs_job_level_detail.sql"),
+                max_queue_seconds=job_metrics.get("max_queue_seconds", 86400),
+                use_storage_api=job_metrics.get("storage_api", True),
+            )
+        elif collector is None:
+            sql_path, segment_by = metrics_query(config)
+            collector = BigQueryJobMetricsCollector(
+                project_id=metadata["project_id"],
+                location=metadata.get("location", "US"),
+                sql_path=sql_path,
+                segment_by=segment_by,
+            )
+        self.collector = collector
 
-        self.sla_policy = SLAPolicy(config.get("sla_thresholds", {}))
-        self.reservation_mgr = ReservationManager(
-            project_id=metadata["project_id"],
-            reservation_id=metadata["reservation_id"],
-            location=metadata.get("location", "asia-southeast2")
-        )
+        self.sla_policy = SLAPolicy.from_config(config)
+        if reservation_mgr is None:
+            reservation_mgr = ReservationManager(
+                project_id=metadata["project_id"],
+                reservation_id=metadata["reservation_id"],
+                location=metadata.get("location", "asia-southeast2")
+            )
+        self.reservation_mgr = reservation_mgr
         self.default_adjustment = config.get("default_adjustment_slots", 50)
+        self.scaling = build_scaling_strategy(config)
+        # optional look-ahead ahead of schedule transitions
+        self.prewarm = LookAheadPlanner.from_config(config, self.schedule)
+        # optional breach confirmation, cooldowns and write coalescing
+        self.stabilizer = Stabilizer.from_config(config)
+        # optional circuit breaker and last-known-good metrics for collection failures
+        self.degraded = DegradedMode.from_config(config)
+
+        # mid-window scale-down when autoscaled slots sit idle
+        self.utilization_config = config.get("utilization_scale_down", {})
+        if utilization_collector is None and not injected:
+            utilization_collector = SlotUtilizationCollector.from_config(config)
+        if not self.utilization_config.get("enabled"):
+            utilization_collector = None
+        self.utilization_collector = utilization_collector
+        self._low_utilization_cycles = 0
+        # schedule window of the previous decision, to reset once per window
+        self._last_window: Optional[pendulum.DateTime] = None
+        self.previous_run_time: Optional[pendulum.DateTime] = None
+        self.last_cycle: Optional[CycleRecord] = None
+
+    def carry_over(self, previous: "DecisionEngine") -> None:
+        """
+        Take over the running state of the engine this one replaces on a
+        config reload. The lookback position and the current window always
+        carry over. Stabilizer, degraded mode, scaling, learned look-ahead
+        ramps and the low-utilization streak carry over while their config
+        sections are unchanged; a changed section starts fresh. The metrics
+        collector is always rebuilt. previous must not be running a cycle.
+        """
+        self.previous_run_time = previous.previous_run_time
+        self._last_window = previous._last_window
+        self.last_cycle = previous.last_cycle
+
+        def unchanged(*keys: str) -> bool:
+            return all(self.config.get(key) == previous.config.get(key) for key in keys)
+
+        if unchanged("stabilization"):
+            self.stabilizer = previous.stabilizer
+        if unchanged("degraded_mode", "metadata"):
+            self.degraded = previous.degraded
+        if unchanged("scaling", "default_adjustment_slots"):
+            self.scaling = previous.scaling
+        if unchanged("utilization_scale_down"):
+            self._low_utilization_cycles = previous._low_utilization_cycles
+        if unchanged("prewarm") and self.prewarm is not None and previous.prewarm is not None:
+            self.prewarm.adopt(previous.prewarm)
 
     def _normalize_execution_time(self, execution_time) -> pendulum.DateTime:
         if isinstance(execution_time, pendulum.DateTime):
@@ -71,54 +217,367 @@ class DecisionEngine:
 
     def get_slot_config_for_time(self, dt: pendulum.DateTime) -> Dict[str, int]:
         """Resolve slot config (min/max/increment) for a given datetime."""
-        day = dt.day_of_week
-        hour = dt.hour
-        minute = (dt.minute // 30) * 30  # round down to nearest 30-min interval
-
-        day_mapping = self.time_mapping.get(str(day), {})
-        hour_mapping = day_mapping.get(str(hour), {})
-        minute_config = hour_mapping.get(str(minute))
-
-        if isinstance(minute_config, str):
-            # resolve from slot profile
-            return self.slot_profiles[minute_config]
-        elif isinstance(minute_config, dict):
-            return minute_config
-        else:
-            # fallback to default
-            return {"min": 1500, "max": 4000, "increment": 100}
+        return self.schedule.resolve(dt)
+
+    def lookback(self, execution_time: pendulum.DateTime) -> pendulum.Duration:
+        """
+        Metrics window for a cycle at execution_time: the time since the
+        previous cycle, clamped to [min_lookback_minutes, check_interval_minutes].
+        The first cycle looks back the full check interval.
+        """
+        maximum = self.check_interval_minutes * 60
+        if self.previous_run_time is None or execution_time <= self.previous_run_time:
+            return pendulum.duration(seconds=maximum)
+        elapsed = (execution_time - self.previous_run_time).total_seconds()
+        return pendulum.duration(seconds=min(max(elapsed, self.min_lookback_minutes * 60), maximum))
+
+    def _start_cycle(self, execution_time: pendulum.DateTime) -> pendulum.DateTime:
+        """Begin a cycle and return the start of its monitoring window."""
+        self.reservation_mgr.begin_cycle()
+        monitoring_time = execution_time - self.lookback(execution_time)
+        self.previous_run_time = execution_time
+        return monitoring_time
 
-    def run(self, execution_time) -> None:
-        """Main decision logic: collect metrics, evaluate SLA, adjust slots."""
+    @timed("cycle")
+    def run(self, execution_time) -> Optional[SLAEvaluationResult]:
+        """
+        Main decision logic: collect metrics, evaluate SLA, adjust slots.
+        Returns the SLA evaluation, or None when metrics could not be collected.
+        """
         execution_time = self._normalize_execution_time(execution_time)
-        monitoring_time = execution_time - pendulum.duration(minutes=5)
-        slot_config = self.get_slot_config_for_time(execution_time)
+        monitoring_time = self._start_cycle(execution_time)
 
         # Step 1: Collect metrics
+        now = execution_time.timestamp()
+        error = None
         try:
+            if self.degraded is not None and not self.degraded.allow(now):
+                raise MetricsCollectionError(CIRCUIT_OPEN_MESSAGE)
             metrics = self.collector.collect(monitoring_time)
-            logging.info(f"Collected metrics at {monitoring_time}: {metrics}")
+            self._collected(now, monitoring_time, metrics)
         except MetricsCollectionError as e:
-            logging.error(f"Metrics collection failed: {e}")
+            error, metrics = str(e), self._fallback_metrics(now, e)
+        if metrics is None:
             # SLA cannot be evaluated; consider increasing slots defensively
-            self.reservation_mgr.add_slots(self.default_adjustment)
-            return
+            current_slots = self.reservation_mgr.get_current_slots()
+            target = self._stabilize(execution_time, current_slots, self._degraded_target(execution_time, current_slots))
+            if target is not None:
+                self.reservation_mgr.set_slots(target)
+            self._finish_cycle(CycleRecord(execution_time, None, None, current_slots, target, error=error))
+            return None
 
         # Step 2: Evaluate SLA
         result: SLAEvaluationResult = self.sla_policy.evaluate(metrics)
         current_slots = self.reservation_mgr.get_current_slots()
+        utilization = None
+        if result.healthy and self.utilization_collector is not None:
+            utilization = self._collect_utilization(monitoring_time, self.reservation_mgr.get_state())
+
+        # Step 3: Adjust slots
+        target = self.decide(execution_time, result, current_slots, utilization)
+        if target is not None:
+            self.reservation_mgr.set_slots(target)
+            if not result.healthy:
+                logging.info(f"Slots updated to {target} due to SLA breach")
+        self._finish_cycle(CycleRecord(execution_time, metrics, result, current_slots, target, error=error))
+        return result
+
+    def _collected(self, now: float, since: pendulum.DateTime, metrics: Dict[str, Any]) -> None:
+        logging.info(f"Collected metrics at {since}: {metrics}")
+        if self.degraded is not None:
+            self.degraded.succeeded(now, metrics)
+
+    def _fallback_metrics(self, now: float, error: MetricsCollectionError) -> Optional[Dict[str, Any]]:
+        """Last-known-good metrics to decide on after a failed collection, if degraded mode has fresh ones."""
+        logging.error(f"Metrics collection failed: {error}")
+        if self.degraded is None:
+            return None
+        metrics = self.degraded.failed(now)
+        if metrics is not None:
+            age = now - self.degraded.last_known_good.collected_at
+            logging.warning(f"Deciding on last-known-good metrics from {age:.0f}s ago")
+        return metrics
+
+    def _degraded_target(self, execution_time: pendulum.DateTime, current_slots: int) -> Optional[int]:
+        """
+        Target when the SLA cannot be evaluated: one default_adjustment_slots
+        step up (none under the "hold" degraded policy), never above the
+        window's profile max, so an outage cannot ratchet the reservation up.
+        """
+        if self.degraded is not None and self.degraded.policy == "hold":
+            return None
+        target = min(current_slots + self.default_adjustment, self.get_slot_config_for_time(execution_time)["max"])
+        return target if target > current_slots else None
+
+    def _finish_cycle(self, record: CycleRecord) -> None:
+        self.last_cycle = record
+        reservation = self.config["metadata"]["reservation_id"]
+        if record.result is None:
+            outcome = "collection_failure"
+        elif record.error is not None:
+            # decided on last-known-good metrics
+            outcome = "stale"
+        else:
+            outcome = "healthy" if record.result.healthy else "breach"
+        CYCLES.inc(reservation=reservation, outcome=outcome)
+        if record.slots is not None:
+            MAX_SLOTS.set(record.slots, reservation=reservation)
+
+    def _collect_utilization(self, since: pendulum.DateTime, reservation_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            usage = self.utilization_collector.collect(since)
+        except MetricsCollectionError as e:
+            logging.warning(f"Slot utilization collection failed: {e}")
+            return None
+        usage["autoscale_current_slots"] = reservation_state["autoscale_current_slots"]
+        return usage
+
+    def decide(
+        self,
+        execution_time: pendulum.DateTime,
+        result: SLAEvaluationResult,
+        current_slots: int,
+        utilization: Optional[Dict[str, Any]] = None,
+    ) -> Optional[int]:
+        """
+        Target max slots for an evaluated window, or None to leave the
+        reservation as it is.
+        """
+        target = self._target(execution_time, result, current_slots, utilization)
+        return self._stabilize(execution_time, current_slots, target)
+
+    def _stabilize(self, execution_time: pendulum.DateTime, current_slots: int, target: Optional[int]) -> Optional[int]:
+        """Pass a target through the stabilizer's cooldowns, if configured."""
+        if self.stabilizer is None:
+            return target
+        return self.stabilizer.filter(execution_time.timestamp(), current_slots, target)
+
+    def _target(
+        self,
+        execution_time: pendulum.DateTime,
+        result: SLAEvaluationResult,
+        current_slots: int,
+        utilization: Optional[Dict[str, Any]] = None,
+    ) -> Optional[int]:
+        slot_config = self.get_slot_config_for_time(execution_time)
+        new_window = self._enter_window(execution_time)
+        if self.stabilizer is not None:
+            confirmed = self.stabilizer.record(breached=not result.healthy)
+            if not result.healthy and not confirmed:
+                logging.info("SLA breach not confirmed yet — holding slots")
+                return None
 
         if result.healthy:
             logging.info("SLA healthy — no adjustment needed")
-            # optionally enforce min slots at the start of a 30-min window
-            if execution_time.minute % 30 == 0 and current_slots != slot_config["min"]:
-                self.reservation_mgr.set_slots(slot_config["min"])
-            return
+            self.scaling.reset()
+            # enforce min slots on the first cycle of a 30-min window
+            if new_window:
+                # with look-ahead, the window starts at its learned warm level
+                floor = slot_config["min"]
+                if self.prewarm is not None:
+                    floor = self.prewarm.warm_level(window_start(execution_time))
+                if current_slots != floor:
+                    self._low_utilization_cycles = 0
+                    return floor
+            if self.prewarm is not None:
+                warm = self.prewarm.target(execution_time, current_slots, healthy=True)
+                if warm is not None:
+                    self._low_utilization_cycles = 0
+                    return None if warm == current_slots else warm
+            return self._scale_down_target(slot_config, current_slots, utilization)
 
-        # Step 3: SLA breach detected → increase slots
+        # SLA breach detected → increase slots
+        self._low_utilization_cycles = 0
         logging.warning(f"SLA breach detected: {result.violations}")
-        increment = self.default_adjustment
-        proposed_slots = min(current_slots + increment, slot_config["max"])
-        self.reservation_mgr.set_slots(proposed_slots)
-        logging.info(f"Slots updated to {proposed_slots} due to SLA breach")
+        target = self.scaling.breach_target(current_slots, slot_config, result)
+        if self.prewarm is not None:
+            warm = self.prewarm.target(execution_time, current_slots, healthy=False)
+            if warm is not None and warm > target:
+                target = warm
+        return target
+
+    def _enter_window(self, execution_time: pendulum.DateTime) -> bool:
+        """
+        Whether this is the first decision in its 30-minute schedule window.
+        Cycles need not land on :00/:30 (serve ticks, adaptive polling), so
+        the window is compared with the previous decision's. Without a
+        previous decision, e.g. one-shot Airflow runs, only a cycle at the
+        boundary minute counts as the window's first.
+        """
+        window = window_start(execution_time)
+        previous, self._last_window = self._last_window, window
+        if previous is None:
+            return execution_time.minute % 30 == 0
+        return window != previous
+
+    def _scale_down_target(
+        self,
+        slot_config: Dict[str, int],
+        current_slots: int,
+        utilization: Optional[Dict[str, Any]],
+    ) -> Optional[int]:
+        """
+        Lower max slots towards actual usage once autoscaled capacity has been
+        mostly idle for consecutive_cycles healthy cycles, without waiting
+        for the next window reset. Never goes below the profile min.
+        """
+        if not utilization or not utilization.get("autoscale_current_slots"):
+            self._low_utilization_cycles = 0
+            return None
+
+        ratio = utilization["avg_slots_used"] / utilization["autoscale_current_slots"]
+        if ratio >= self.utilization_config.get("low_utilization", 0.5):
+            self._low_utilization_cycles = 0
+            return None
+
+        self._low_utilization_cycles += 1
+        if self._low_utilization_cycles < self.utilization_config.get("consecutive_cycles", 2):
+            return None
+
+        headroom = self.utilization_config.get("headroom", 1.25)
+        target = max(slot_config["min"], round_up_slots(utilization["peak_slots_used"] * headroom))
+        if target >= current_slots:
+            return None
+
+        logging.info(
+            f"Slot utilization {ratio:.0%} of {utilization['autoscale_current_slots']} autoscaled slots; "
+            f"lowering max slots from {current_slots} to {target}"
+        )
+        return target
+
+
+class AsyncReservationManager:
+    """asyncio counterpart of ReservationManager."""
+
+    def __init__(self, project_id: str, reservation_id: str, location: str, client: Any = None, timeout_seconds: float = 60):
+        self.reservation_client = AsyncBigQuerySlotReservation(
+            project_id=project_id,
+            reservation_id=reservation_id,
+            zone=location,
+            client=client
+        )
+        self.timeout_seconds = timeout_seconds
+
+    def begin_cycle(self) -> None:
+        """Forget reservation state cached by the previous cycle."""
+        self.reservation_client.invalidate()
+
+    async def get_state(self) -> Dict[str, Any]:
+        return await self.reservation_client.get(timeout=self.timeout_seconds)
+
+    async def get_current_slots(self) -> int:
+        state = await self.get_state()
+        return state["autoscale_max_slots"]
+
+    async def add_slots(self, increment: int) -> None:
+        current = await self.get_current_slots()
+        await self.set_slots(current + increment)
+
+    async def set_slots(self, value: int) -> None:
+        value = assert_max_slot_value(value)
+        response = await self.reservation_client.update(
+            max_autoscaling_slot=value,
+            ignore_idle_slots=True,
+            timeout=self.timeout_seconds
+        )
+        logging.info(f"Updated reservation: {response['content']}")
+
+
+class AsyncDecisionEngine(DecisionEngine):
+    """
+    DecisionEngine whose run() is a coroutine. The metrics query and the
+    reservation read are independent, so they run concurrently and a cycle
+    takes as long as the slower of the two instead of their sum. Each call is
+    bounded by call_timeout_seconds; cancelling run() cancels both.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        collector: Optional[AsyncBigQueryJobMetricsCollector] = None,
+        reservation_mgr: Optional[AsyncReservationManager] = None,
+        utilization_collector: Optional[SlotUtilizationCollector] = None,
+    ):
+        metadata = config["metadata"]
+        timeout_seconds = config.get("call_timeout_seconds", 60)
+
+        if collector is None:
+            if utilization_collector is None:
+                utilization_collector = SlotUtilizationCollector.from_config(config)
+            sql_path, segment_by = metrics_query(config)
+            collector = AsyncBigQueryJobMetricsCollector(
+                project_id=metadata["project_id"],
+                location=metadata.get("location", "US"),
+                sql_path=sql_path,
+                timeout_seconds=timeout_seconds,
+                segment_by=segment_by,
+            )
+        if reservation_mgr is None:
+            reservation_mgr = AsyncReservationManager(
+                project_id=metadata["project_id"],
+                reservation_id=metadata["reservation_id"],
+                location=metadata.get("location", "asia-southeast2"),
+                timeout_seconds=timeout_seconds,
+            )
+        super().__init__(
+            config,
+            collector=collector,
+            reservation_mgr=reservation_mgr,
+            utilization_collector=utilization_collector,
+        )
+
+    @timed("cycle")
+    async def run(self, execution_time) -> Optional[SLAEvaluationResult]:
+        """
+        Main decision logic: collect metrics, evaluate SLA, adjust slots.
+        Returns the SLA evaluation, or None when metrics could not be collected.
+        """
+        execution_time = self._normalize_execution_time(execution_time)
+        monitoring_time = self._start_cycle(execution_time)
+
+        # Step 1: Collect metrics and read the reservation concurrently
+        now = execution_time.timestamp()
+        allowed = self.degraded is None or self.degraded.allow(now)
+        metrics, current_slots = await asyncio.gather(
+            self.collector.collect(monitoring_time) if allowed else self._skip_collect(),
+            self.reservation_mgr.get_current_slots(),
+            return_exceptions=True,
+        )
+        if isinstance(current_slots, BaseException):
+            raise current_slots
+
+        error = None
+        if isinstance(metrics, MetricsCollectionError):
+            error, metrics = str(metrics), self._fallback_metrics(now, metrics)
+            if metrics is None:
+                # SLA cannot be evaluated; consider increasing slots defensively
+                target = self._stabilize(execution_time, current_slots, self._degraded_target(execution_time, current_slots))
+                if target is not None:
+                    await self.reservation_mgr.set_slots(target)
+                self._finish_cycle(CycleRecord(execution_time, None, None, current_slots, target, error=error))
+                return None
+        elif isinstance(metrics, BaseException):
+            raise metrics
+        else:
+            self._collected(now, monitoring_time, metrics)
+
+        # Step 2: Evaluate SLA
+        result: SLAEvaluationResult = self.sla_policy.evaluate(metrics)
+        utilization = None
+        if result.healthy and self.utilization_collector is not None:
+            # served from this cycle's cached reservation read
+            state = await self.reservation_mgr.get_state()
+            utilization = await asyncio.to_thread(self._collect_utilization, monitoring_time, state)
+
+        # Step 3: Adjust slots
+        target = self.decide(execution_time, result, current_slots, utilization)
+        if target is not None:
+            await self.reservation_mgr.set_slots(target)
+            if not result.healthy:
+                logging.info(f"Slots updated to {target} due to SLA breach")
+        self._finish_cycle(CycleRecord(execution_time, metrics, result, current_slots, target, error=error))
+        return result
 
+    @staticmethod
+    async def _skip_collect() -> Dict[str, Any]:
+        raise MetricsCollectionError(CIRCUIT_OPEN_MESSAGE)
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.instrumentation import REGISTRY
+
+METRICS_CIRCUIT_OPEN = REGISTRY.gauge(
+    "slot_controller_metrics_circuit_open",
+    "1 while the metrics query circuit breaker is open (queries are skipped), else 0.",
+    ("source",),
+)
+METRICS_QUERIES_SKIPPED = REGISTRY.counter(
+    "slot_controller_metrics_queries_skipped",
+    "Metrics queries not sent because the circuit breaker was open.",
+    ("source",),
+)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+DEGRADED_POLICIES = ("step", "hold")
+# values of omitted "degraded_mode" keys
+DEGRADED_DEFAULTS = {
+    "failure_threshold": 3,
+    "backoff_minutes": 5,
+    "max_backoff_minutes": 60,
+    "staleness_budget_minutes": 15,
+    "policy": "step",
+}
+
+
+class CircuitBreaker:
+    """
+    Stops sending a failing metrics query.
+
+    After failure_threshold consecutive failures the breaker opens and
+    allow() refuses calls for backoff_seconds. After that one trial call is
+    let through (half-open): success closes the breaker, failure opens it
+    again for twice as long, up to max_backoff_seconds. Times are epoch
+    seconds supplied by the caller, e.g. the cycle's execution time.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        failure_threshold: int = 3,
+        backoff_seconds: float = 300,
+        max_backoff_seconds: float = 3600,
+    ):
+        self.source = source
+        self.failure_threshold = failure_threshold
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.current_backoff = backoff_seconds
+
+    def allow(self, now: float) -> bool:
+        """Whether to send the query now."""
+        if self.state == OPEN and now - self.opened_at >= self.current_backoff:
+            self.state = HALF_OPEN
+        if self.state == OPEN:
+            METRICS_QUERIES_SKIPPED.inc(source=self.source)
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.state, self.failures, self.current_backoff = CLOSED, 0, self.backoff_seconds
+        METRICS_CIRCUIT_OPEN.set(0, source=self.source)
+
+    def record_failure(self, now: float) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.current_backoff = min(self.current_backoff * 2, self.max_backoff_seconds)
+        elif self.failures < self.failure_threshold:
+            return
+        self.state, self.opened_at = OPEN, now
+        METRICS_CIRCUIT_OPEN.set(1, source=self.source)
+        logging.warning(
+            f"Metrics circuit for {self.source} open after {self.failures} failure(s); "
+            f"next attempt in {self.current_backoff:.0f}s"
+        )
+
+
+class LastKnownGood:
+    """
+    The last successfully collected metrics and the cycle time they were
+    collected at, optionally kept in a JSON file so a restarted controller
+    can fall back on them too.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.collected_at: Optional[float] = None
+        self.metrics: Optional[Dict[str, Any]] = None
+        if path and Path(path).exists():
+            try:
+                state = json.loads(Path(path).read_text())
+                self.collected_at, self.metrics = state["collected_at"], state["metrics"]
+            except (OSError, ValueError, KeyError):
+                logging.warning(f"Ignoring unreadable last-known-good metrics {path}")
+
+    def save(self, now: float, metrics: Dict[str, Any]) -> None:
+        self.collected_at, self.metrics = now, metrics
+        if not self.path:
+            return
+        try:
+            target = Path(self.path)
+            tmp_path = target.with_suffix(target.suffix + ".tmp")
+            tmp_path.write_text(json.dumps({"collected_at": now, "metrics": metrics}, default=str))
+            os.replace(tmp_path, target)
+        except OSError:
+            logging.exception(f"Failed to persist last-known-good metrics {self.path}")
+
+    def fresh(self, now: float, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+        """The metrics if they are at most max_age_seconds old, else None."""
+        if self.metrics is None or now - self.collected_at > max_age_seconds:
+            return None
+        return self.metrics
+
+
+class DegradedMode:
+    """
+    What a decision cycle does when fresh metrics are unavailable.
+
+    The metrics query runs behind a CircuitBreaker. While the last-known-good
+    metrics are within staleness_budget_seconds, the cycle is decided on
+    them as usual. Past the budget the cycle falls back to policy: "step"
+    adds default_adjustment_slots per cycle and "hold" leaves the
+    reservation as it is. The engine never raises max slots above the
+    window's profile max in either case.
+    """
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker],
+        last_known_good: LastKnownGood,
+        staleness_budget_seconds: float = 900,
+        policy: str = "step",
+    ):
+        self.breaker = breaker
+        self.last_known_good = last_known_good
+        self.staleness_budget_seconds = staleness_budget_seconds
+        self.policy = policy
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["DegradedMode"]:
+        """Build degraded-mode handling from the optional "degraded_mode" config section."""
+        degraded = config.get("degraded_mode")
+        if not degraded or not degraded.get("enabled", True):
+            return None
+        reservation_id = config["metadata"]["reservation_id"]
+        state_path = degraded.get("state_path")
+        return cls(
+            breaker_from_config(degraded, reservation_id),
+            LastKnownGood(state_path.format(reservation_id=reservation_id) if state_path else None),
+            staleness_budget_seconds=_setting(degraded, "staleness_budget_minutes") * 60,
+            policy=_setting(degraded, "policy"),
+        )
+
+    def allow(self, now: float) -> bool:
+        return self.breaker is None or self.breaker.allow(now)
+
+    def succeeded(self, now: float, metrics: Dict[str, Any]) -> None:
+        if self.breaker is not None:
+            self.breaker.record_success()
+        self.last_known_good.save(now, metrics)
+
+    def failed(self, now: float) -> Optional[Dict[str, Any]]:
+        """Record a failed or skipped collection; the last-known-good metrics to use instead, if fresh."""
+        if self.breaker is not None and self.breaker.state != OPEN:
+            self.breaker.record_failure(now)
+        return self.last_known_good.fresh(now, self.staleness_budget_seconds)
+
+
+def _setting(degraded: Dict[str, Any], key: str) -> Any:
+    return degraded.get(key, DEGRADED_DEFAULTS[key])
+
+
+def breaker_from_config(degraded: Dict[str, Any], source: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        source,
+        failure_threshold=_setting(degraded, "failure_threshold"),
+        backoff_seconds=_setting(degraded, "backoff_minutes") * 60,
+        max_backoff_seconds=_setting(degraded, "max_backoff_minutes") * 60,
+    )
@@ -0,0 +1,607 @@
+import argparse
+import heapq
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+import numpy as np
+import pendulum
+from collections import Counter, deque
+from concurrent.futures import TimeoutError
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from core.lazy import LazyModule
+from core.metrics import reservation_key
+from core.replay import NOT_YET, aggregate_windows, window_metrics
+
+reservation_types = LazyModule("google.cloud.bigquery_reservation_v1.types")
+api_exceptions = LazyModule("google.api_core.exceptions")
+
+DEFAULT_CONFIG_PATH = "configs/reservation_slot_configs.json"
+# Monday 08:00 Jakarta, the start of the sample config's peak window
+DEFAULT_START = pendulum.datetime(2026, 1, 12, 8, 0, tz="Asia/Jakarta")
+STRESS_SLA_THRESHOLDS = {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600}
+
+
+class LatencyModel:
+    """Lognormal call latency from its median and p99, in seconds."""
+
+    def __init__(self, median_seconds: float = 0.0, p99_seconds: Optional[float] = None, seed: Optional[int] = None):
+        self.median_seconds = median_seconds
+        p99_seconds = p99_seconds if p99_seconds is not None else median_seconds
+        # p99 of a lognormal is median * exp(2.326 * sigma)
+        self.sigma = math.log(p99_seconds / median_seconds) / 2.326 if median_seconds > 0 and p99_seconds > median_seconds else 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if self.median_seconds <= 0:
+            return 0.0
+        with self._lock:
+            return self._rng.lognormvariate(math.log(self.median_seconds), self.sigma)
+
+
+class RateQuota:
+    """Calls allowed per rolling minute; ResourceExhausted past the limit."""
+
+    def __init__(self, per_minute: Optional[int], metric: str, clock: Callable[[], float] = time.monotonic):
+        self.per_minute = per_minute
+        self.metric = metric
+        self.clock = clock
+        self._calls: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def take(self) -> None:
+        if self.per_minute is None:
+            return
+        now = self.clock()
+        with self._lock:
+            while self._calls and self._calls[0] <= now - 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.per_minute:
+                raise api_exceptions.ResourceExhausted(
+                    f"Quota exceeded for quota metric '{self.metric}': limit {self.per_minute} per minute"
+                )
+            self._calls.append(now)
+
+
+class EmulatedReservationService:
+    """
+    ReservationServiceClient stand-in holding reservations in memory; pass
+    it as client=... wherever a ReservationServiceClient is accepted.
+
+    autoscale.current_slots follows the attached workload's slot usage,
+    capped at max_slots. Calls are counted in self.calls by method and
+    outcome ("get", "update", "get.quota_exceeded", ...).
+    """
+
+    def __init__(
+        self,
+        get_latency: Optional[LatencyModel] = None,
+        update_latency: Optional[LatencyModel] = None,
+        get_quota_per_minute: Optional[int] = None,
+        update_quota_per_minute: Optional[int] = None,
+    ):
+        self.get_latency = get_latency or LatencyModel()
+        self.update_latency = update_latency or LatencyModel()
+        self.get_quota = RateQuota(get_quota_per_minute, "ReservationGetRequestsPerMinute")
+        self.update_quota = RateQuota(update_quota_per_minute, "ReservationUpdateRequestsPerMinute")
+        self.workload: Optional["SyntheticWorkload"] = None
+        self.calls: Counter = Counter()
+        self._reservations: Dict[str, "reservation_types.Reservation"] = {}
+        self._keys: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def reservation_path(project: str, location: str, reservation: str) -> str:
+        return f"projects/{project}/locations/{location}/reservations/{reservation}"
+
+    def add_reservation(self, project: str, location: str, reservation_id: str, max_slots: int) -> str:
+        name = self.reservation_path(project, location, reservation_id)
+        with self._lock:
+            self._reservations[name] = reservation_types.Reservation(
+                name=name,
+                ignore_idle_slots=True,
+                autoscale=reservation_types.Reservation.Autoscale(max_slots=max_slots),
+            )
+            key = reservation_key(project, location, reservation_id)
+            self._keys[key] = name
+            self._names[name] = key
+        return name
+
+    def max_slots(self, key: str) -> int:
+        """Current max slots of the reservation with the given reservation_key()."""
+        with self._lock:
+            return self._reservations[self._keys[key]].autoscale.max_slots
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+
+    def _call(self, method: str, quota: RateQuota, latency: LatencyModel, timeout: Optional[float]) -> None:
+        try:
+            quota.take()
+        except api_exceptions.ResourceExhausted:
+            self._count(f"{method}.quota_exceeded")
+            raise
+        self._count(method)
+        delay = latency.sample()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            self._count(f"{method}.deadline_exceeded")
+            raise api_exceptions.DeadlineExceeded(f"{method} exceeded its {timeout}s deadline")
+        time.sleep(delay)
+
+    def _snapshot(self, name: str) -> "reservation_types.Reservation":
+        with self._lock:
+            stored = self._reservations.get(name)
+            if stored is None:
+                raise api_exceptions.NotFound(f"Reservation {name} not found")
+            reservation = reservation_types.Reservation(stored)
+        if self.workload is not None:
+            in_use = self.workload.slots_in_use(self._names[name])
+            reservation.autoscale.current_slots = min(in_use, reservation.autoscale.max_slots)
+        return reservation
+
+    def get_reservation(self, request=None, timeout: Optional[float] = None, **kwargs):
+        self._call("get", self.get_quota, self.get_latency, timeout)
+        return self._snapshot(request.name)
+
+    def update_reservation(self, request=None, timeout: Optional[float] = None, **kwargs):
+        self._call("update", self.update_quota, self.update_latency, timeout)
+        update = request.reservation
+        paths = set(request.update_mask.paths)
+        with self._lock:
+            stored = self._reservations.get(update.name)
+            if stored is None:
+                raise api_exceptions.NotFound(f"Reservation {update.name} not found")
+            if "autoscale" in paths:
+                stored.autoscale.max_slots = update.autoscale.max_slots
+            if "ignore_idle_slots" in paths:
+                stored.ignore_idle_slots = update.ignore_idle_slots
+            if "slot_capacity" in paths:
+                stored.slot_capacity = update.slot_capacity
+            if "concurrency" in paths:
+                stored.concurrency = update.concurrency
+            stored.update_time = datetime.now(timezone.utc)
+        return self._snapshot(update.name)
+
+
+@dataclass
+class WorkloadProfile:
+    """Job arrival and size distribution of one reservation."""
+    jobs_per_minute: float = 10.0
+    # chance that a burst starts in any given minute, its length and rate multiplier
+    burst_probability: float = 0.02
+    burst_minutes: float = 10.0
+    burst_multiplier: float = 4.0
+    job_slots_median: float = 100.0
+    job_slots_sigma: float = 0.8
+    job_seconds_median: float = 60.0
+    job_seconds_sigma: float = 1.0
+    stopped_rate: float = 0.0
+
+
+class _Job:
+    __slots__ = ("job_id", "creation", "start", "end", "slots", "duration", "stopped")
+
+    def __init__(self, job_id: str, creation: float, slots: int, duration: float, stopped: bool):
+        self.job_id = job_id
+        self.creation = creation
+        self.start = NOT_YET
+        self.end = NOT_YET
+        self.slots = slots
+        self.duration = duration
+        self.stopped = stopped
+
+
+class _ReservationQueue:
+    """Discrete-event FIFO queue of one reservation's jobs."""
+
+    def __init__(self, key: str, profile: WorkloadProfile, seed: int, now: float):
+        self.key = key
+        self.profile = profile
+        self.rng = np.random.default_rng(seed)
+        self.now = now
+        self.jobs: List[_Job] = []
+        self.pending: Deque[_Job] = deque()
+        self.running: List = []
+        self.in_use = 0
+        self.burst_until = -math.inf
+        self._next_id = 0
+
+    def _arrivals(self, start: float, end: float) -> List[_Job]:
+        profile = self.profile
+        out: List[_Job] = []
+        minute = start
+        while minute < end:
+            chunk_end = min(minute + 60, end)
+            if minute >= self.burst_until and self.rng.random() < profile.burst_probability * (chunk_end - minute) / 60:
+                self.burst_until = minute + profile.burst_minutes * 60
+            rate = profile.jobs_per_minute * (profile.burst_multiplier if minute < self.burst_until else 1.0)
+            count = self.rng.poisson(rate * (chunk_end - minute) / 60)
+            for creation in np.sort(self.rng.uniform(minute, chunk_end, count)):
+                self._next_id += 1
+                out.append(_Job(
+                    job_id=f"{self.key}:job_{self._next_id}",
+                    creation=int(creation),
+                    slots=max(1, int(self.rng.lognormal(math.log(profile.job_slots_median), profile.job_slots_sigma))),
+                    duration=max(1, int(self.rng.lognormal(math.log(profile.job_seconds_median), profile.job_seconds_sigma))),
+                    stopped=bool(self.rng.random() < profile.stopped_rate),
+                ))
+            minute = chunk_end
+        return out
+
+    def _start_fitting(self, at: float, capacity: int) -> None:
+        # first fit in arrival order, so one large job does not block the
+        # queue; a job larger than the reservation still runs once it is alone
+        waiting: Deque[_Job] = deque()
+        for job in self.pending:
+            if self.in_use + job.slots <= capacity or self.in_use == 0:
+                job.start = int(at)
+                job.end = int(at + job.duration)
+                self.in_use += job.slots
+                heapq.heappush(self.running, (job.end, job.job_id, job))
+            else:
+                waiting.append(job)
+        self.pending = waiting
+
+    def advance(self, until: float, capacity: int, retention_seconds: float) -> None:
+        arrivals = self._arrivals(self.now, until)
+        self.jobs.extend(arrivals)
+        self._start_fitting(self.now, capacity)
+
+        index = 0
+        while True:
+            next_arrival = arrivals[index].creation if index < len(arrivals) else math.inf
+            next_end = self.running[0][0] if self.running else math.inf
+            at = min(next_arrival, next_end)
+            if at > until:
+                break
+            if next_end <= next_arrival:
+                _, _, job = heapq.heappop(self.running)
+                self.in_use -= job.slots
+            else:
+                self.pending.append(arrivals[index])
+                index += 1
+            self._start_fitting(at, capacity)
+
+        self.now = until
+        cutoff = until - retention_seconds
+        if self.jobs and self.jobs[0].creation < cutoff:
+            self.jobs = [j for j in self.jobs if j.creation >= cutoff or j.end > until]
+
+    def arrays(self, since: float) -> Dict[str, np.ndarray]:
+        """Job arrays in core.replay's layout for jobs created since the timestamp."""
+        jobs = [j for j in self.jobs if j.creation >= since]
+        stopped = np.fromiter((j.stopped for j in jobs), dtype=bool, count=len(jobs))
+        return {
+            "creation_time": np.fromiter((j.creation for j in jobs), dtype=np.int64, count=len(jobs)),
+            "start_time": np.fromiter((j.start for j in jobs), dtype=np.int64, count=len(jobs)),
+            "end_time": np.fromiter((j.end for j in jobs), dtype=np.int64, count=len(jobs)),
+            "has_error": stopped,
+            "stopped": stopped,
+        }
+
+
+class SyntheticWorkload:
+    """
+    Bursty synthetic jobs for many reservations, simulated up to a clock the
+    caller advances. Capacity is read from the reservation service on every
+    advance, so slot changes made by the controller feed back into queueing.
+    """
+
+    def __init__(
+        self,
+        service: EmulatedReservationService,
+        start: float,
+        seed: int = 0,
+        retention_seconds: float = 3600,
+    ):
+        self.service = service
+        service.workload = self
+        self.now = start
+        self.seed = seed
+        self.retention_seconds = retention_seconds
+        self.queues: Dict[str, _ReservationQueue] = {}
+
+    def add_reservation(self, key: str, profile: Optional[WorkloadProfile] = None) -> None:
+        self.queues[key] = _ReservationQueue(key, profile or WorkloadProfile(), self.seed + len(self.queues), self.now)
+
+    def advance_to(self, now: float) -> None:
+        for key, queue in self.queues.items():
+            queue.advance(now, self.service.max_slots(key), self.retention_seconds)
+        self.now = now
+
+    def slots_in_use(self, key: str) -> int:
+        return self.queues[key].in_use
+
+    def metrics(self, key: str, since: float) -> Dict[str, Any]:
+        """What queries/jobs_sla_metrics.sql returns for one reservation as of now."""
+        jobs = self.queues[key].arrays(since)
+        lookback = max(int(self.now - since), 0)
+        return window_metrics(aggregate_windows(jobs, np.array([int(self.now)]), lookback), 0)
+
+    def pending(self, key: str, since: float) -> Dict[str, Any]:
+        waits = [self.now - j.creation for j in self.queues[key].jobs if j.creation >= since and j.start > self.now]
+        return {"count_job_pending": len(waits), "max_pending_time": int(max(waits)) if waits else None}
+
+    def utilization(self, key: str, since: float) -> Dict[str, Any]:
+        now = self.now
+        deltas: Dict[float, int] = {}
+        slot_seconds = 0.0
+        for job in self.queues[key].jobs:
+            start, end = max(job.start, since), min(job.end, now)
+            if start < end:
+                slot_seconds += job.slots * (end - start)
+                deltas[start] = deltas.get(start, 0) + job.slots
+                deltas[end] = deltas.get(end, 0) - job.slots
+        peak = 0
+        level = 0
+        for _, delta in sorted(deltas.items()):
+            level += delta
+            peak = max(peak, level)
+        return {
+            "total_slot_ms": int(slot_seconds * 1000),
+            "avg_slots_used": slot_seconds / max(now - since, 1),
+            "peak_slots_used": peak,
+        }
+
+    def job_rows(self, key: str, since: float, watermark: float) -> List[Dict[str, Any]]:
+        """Rows of queries/jobs_incremental.sql: jobs created since, changed after the watermark."""
+        now = self.now
+        rows = []
+        for job in self.queues[key].jobs:
+            if job.creation < since:
+                continue
+            start = job.start if job.start <= now else None
+            end = job.end if job.end <= now else None
+            if not (job.creation > watermark or (start or 0) > watermark or (end or 0) > watermark):
+                continue
+            state = "PENDING" if start is None else "RUNNING" if end is None else "DONE"
+            rows.append({
+                "job_id": job.job_id,
+                "state": state,
+                "creation_time": job.creation,
+                "start_time": start,
+                "end_time": end,
+                "error_reason": "stopped" if state == "DONE" and job.stopped else None,
+            })
+        return rows
+
+
+class _Rows(list):
+    """Rows with the total_rows attribute of a BigQuery RowIterator."""
+
+    @property
+    def total_rows(self) -> int:
+        return len(self)
+
+
+class EmulatedQueryJob:
+    def __init__(self, rows: List[Dict[str, Any]], latency_seconds: float, scanned_rows: int):
+        self._rows = rows
+        self._ready_at = time.monotonic() + latency_seconds
+        self.job_id = f"emulated_{id(self):x}"
+        # rough INFORMATION_SCHEMA costs: ~1 KiB and ~1 slot-ms per scanned job row
+        self.total_bytes_processed = scanned_rows * 1024
+        self.total_bytes_billed = max(self.total_bytes_processed, 10 * 1024 * 1024)
+        self.slot_millis = scanned_rows + 10
+
+    def done(self) -> bool:
+        return time.monotonic() >= self._ready_at
+
+    def result(self, timeout: Optional[float] = None) -> _Rows:
+        remaining = self._ready_at - time.monotonic()
+        if timeout is not None and remaining > timeout:
+            time.sleep(timeout)
+            raise TimeoutError()
+        if remaining > 0:
+            time.sleep(remaining)
+        return _Rows(self._rows)
+
+    def cancel(self) -> None:
+        pass
+
+
+def _epoch(value: Any) -> float:
+    return value.timestamp() if hasattr(value, "timestamp") else float(value)
+
+
+class EmulatedBigQueryClient:
+    """
+    bigquery.Client stand-in answering the controller's queries from a
+    SyntheticWorkload. The query kind is recognised from the SQL text;
+    region-wide queries cover reservation_keys (default: every reservation).
+    """
+
+    def __init__(
+        self,
+        workload: SyntheticWorkload,
+        latency: Optional[LatencyModel] = None,
+        reservation_keys: Optional[List[str]] = None,
+    ):
+        self.workload = workload
+        self.latency = latency or LatencyModel()
+        self.reservation_keys = reservation_keys
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def query(self, query: str, job_config=None) -> EmulatedQueryJob:
+        params = {p.name: p.value for p in (job_config.query_parameters if job_config else [])}
+        since = _epoch(params["since_ts"])
+        keys = self.reservation_keys or list(self.workload.queues)
+        workload = self.workload
+
+        if "GROUP BY base.reservation_id" in query:
+            kind = "grouped"
+            rows = []
+            for key in keys:
+                metrics = workload.metrics(key, since)
+                if metrics["count_job_submitted"]:
+                    rows.append({"reservation_id": key, **metrics})
+        elif "JOBS_TIMELINE" in query:
+            kind = "utilization"
+            rows = [workload.utilization(params["reservation_id"], since)]
+        elif "watermark_ts" in params:
+            kind = "incremental"
+            rows = [row for key in keys for row in workload.job_rows(key, since, _epoch(params["watermark_ts"]))]
+        elif "max_pending_time" in query:
+            kind = "probe"
+            probes = [workload.pending(key, since) for key in keys]
+            waits = [p["max_pending_time"] for p in probes if p["max_pending_time"] is not None]
+            rows = [{
+                "count_job_pending": sum(p["count_job_pending"] for p in probes),
+                "max_pending_time": max(waits) if waits else None,
+            }]
+        else:
+            kind = "metrics"
+            rows = [self._region_metrics(keys, since)]
+
+        with self._lock:
+            self.calls[kind] += 1
+        scanned = sum(len(workload.queues[key].jobs) for key in keys)
+        return EmulatedQueryJob(rows, self.latency.sample(), scanned)
+
+    def _region_metrics(self, keys: List[str], since: float) -> Dict[str, Any]:
+        arrays = [self.workload.queues[key].arrays(since) for key in keys]
+        jobs = {name: np.concatenate([a[name] for a in arrays]) for name in arrays[0]}
+        lookback = max(int(self.workload.now - since), 0)
+        return window_metrics(aggregate_windows(jobs, np.array([int(self.workload.now)]), lookback), 0)
+
+
+def run_stress(
+    config: Dict[str, Any],
+    reservations: int,
+    ticks: int,
+    start: pendulum.DateTime = DEFAULT_START,
+    profile: Optional[WorkloadProfile] = None,
+    get_latency: Optional[LatencyModel] = None,
+    update_latency: Optional[LatencyModel] = None,
+    query_latency: Optional[LatencyModel] = None,
+    update_quota_per_minute: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run a fleet of identical reservations against the emulator, one tick per
+    check interval of simulated time, and summarise what happened.
+    """
+    from core.fleet import FleetController
+    from core.schedule import CompiledSchedule
+
+    project = config["metadata"]["project_id"]
+    location = config["metadata"].get("location", "US")
+    tick_minutes = config.get("check_interval_minutes", 5)
+    initial_slots = CompiledSchedule.from_config(config).resolve(start)["min"]
+
+    service = EmulatedReservationService(
+        get_latency=get_latency,
+        update_latency=update_latency,
+        update_quota_per_minute=update_quota_per_minute,
+    )
+    workload = SyntheticWorkload(service, start.timestamp(), seed=seed)
+    entries = []
+    for i in range(reservations):
+        reservation_id = f"res-{i:05d}"
+        service.add_reservation(project, location, reservation_id, initial_slots)
+        workload.add_reservation(reservation_key(project, location, reservation_id), profile)
+        entries.append({"metadata": {"project_id": project, "reservation_id": reservation_id, "location": location}})
+
+    fleet_config = {**config, "reservations": entries}
+    if max_workers is not None:
+        fleet_config["fleet"] = {**config.get("fleet", {}), "max_workers": max_workers}
+    fleet = FleetController(
+        fleet_config,
+        reservation_client=service,
+        bigquery_client=EmulatedBigQueryClient(workload, latency=query_latency),
+    )
+
+    outcomes: Counter = Counter()
+    tick_seconds: List[float] = []
+    try:
+        for tick in range(ticks):
+            now = start.add(minutes=tick * tick_minutes)
+            workload.advance_to(now.timestamp())
+            started = time.perf_counter()
+            results = fleet.run(now)
+            tick_seconds.append(time.perf_counter() - started)
+            for key, result in results.items():
+                if result is None:
+                    outcomes["failed_or_late"] += 1
+                else:
+                    outcomes["healthy" if result.healthy else "breach"] += 1
+    finally:
+        fleet.close()
+
+    ms = np.asarray(tick_seconds) * 1000
+    max_slots = [service.max_slots(key) for key in workload.queues]
+    return {
+        "reservations": reservations,
+        "ticks": ticks,
+        "tick_wall_ms": {
+            "p50": round(float(np.percentile(ms, 50)), 1),
+            "p99": round(float(np.percentile(ms, 99)), 1),
+            "max": round(float(ms.max()), 1),
+        },
+        "cycles": dict(outcomes),
+        "reservation_calls": dict(service.calls),
+        "final_max_slots": {"min": min(max_slots), "max": max(max_slots), "mean": round(float(np.mean(max_slots)), 1)},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.emulator",
+        description="Stress-test the fleet controller against an in-process Reservation API and workload emulator.",
+    )
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="Base config; its profiles and mapping are shared.")
+    parser.add_argument("--reservations", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=12)
+    parser.add_argument("--jobs-per-minute", type=float, default=10.0)
+    parser.add_argument("--burst-probability", type=float, default=0.02)
+    parser.add_argument("--get-latency-ms", type=float, default=30.0, help="Median Get latency.")
+    parser.add_argument("--update-latency-ms", type=float, default=150.0, help="Median Update latency.")
+    parser.add_argument("--query-latency-ms", type=float, default=500.0, help="Median metrics query latency.")
+    parser.add_argument("--update-quota-per-minute", type=int, default=None)
+    parser.add_argument("--max-workers", type=int, default=None, help="Fleet worker threads (default: the config's).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="ERROR", help="Per-cycle breach warnings are noisy at fleet scale.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    with open(args.config) as f:
+        config = json.load(f)
+    # only fill in thresholds the base config leaves out; its own values stand
+    thresholds = config.setdefault("sla_thresholds", {})
+    for name, value in STRESS_SLA_THRESHOLDS.items():
+        thresholds.setdefault(name, value)
+
+    def latency(median_ms: float) -> LatencyModel:
+        # a heavy-ish tail: p99 at four times the median
+        return LatencyModel(median_ms / 1000, median_ms * 4 / 1000, seed=args.seed)
+
+    summary = run_stress(
+        config,
+        reservations=args.reservations,
+        ticks=args.ticks,
+        profile=WorkloadProfile(jobs_per_minute=args.jobs_per_minute, burst_probability=args.burst_probability),
+        get_latency=latency(args.get_latency_ms),
+        update_latency=latency(args.update_latency_ms),
+        query_latency=latency(args.query_latency_ms),
+        update_quota_per_minute=args.update_quota_per_minute,
+        max_workers=args.max_workers,
+        seed=args.seed,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
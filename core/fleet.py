@@ -0,0 +1,305 @@
+import logging
+import threading
+import pendulum
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from core.controller import SlotController
+from core.cost import CostAccountant
+from core.decision_engine import CIRCUIT_OPEN_MESSAGE, DecisionEngine, ReservationManager
+from core.degraded import CircuitBreaker, breaker_from_config
+from core.instrumentation import REGISTRY
+from core.metrics import (
+    MetricsCollectionError,
+    MultiRegionMetricsCollector,
+    ReservationGroupedMetricsCollector,
+    SlotUtilizationCollector,
+    reservation_key,
+)
+from core.sla_policy import SLAEvaluationResult
+from core.store import MetricsStore
+
+CYCLES_OVERRUN = REGISTRY.counter(
+    "slot_controller_fleet_cycles_overrun",
+    "Reservation cycles not started because the reservation's previous cycle was still running.",
+    ("reservation",),
+)
+
+
+class RegionMetrics:
+    """
+    One tick's grouped jobs result for a region, shared by every reservation
+    in that region. The fleet fills it from a MultiRegionMetricsCollector
+    before the reservations' cycles start, so a cycle only reads it.
+    """
+
+    def __init__(
+        self,
+        name: Tuple[str, str],
+        collector: ReservationGroupedMetricsCollector,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        # (query project, location)
+        self.name = name
+        self.collector = collector
+        self.breaker = breaker
+        self._result: Dict[str, Dict[str, Any]] = {}
+        self._error: Optional[MetricsCollectionError] = MetricsCollectionError("Region metrics not collected yet")
+
+    def fill(self, result: Union[Dict[str, Dict[str, Any]], MetricsCollectionError]) -> None:
+        if isinstance(result, MetricsCollectionError):
+            self._result, self._error = {}, result
+        else:
+            self._result, self._error = result, None
+
+    def metrics_for(self, key: str) -> Dict[str, Any]:
+        if self._error is not None:
+            raise self._error
+        # no jobs on the reservation in the window: same as an empty aggregate
+        return self._result.get(key, {})
+
+
+class ReservationMetricsView:
+    """Per-reservation collector backed by a shared RegionMetrics."""
+
+    def __init__(self, region: RegionMetrics, key: str):
+        self.region = region
+        self.key = key
+
+    def collect(self, since: datetime) -> Dict[str, Any]:
+        # the region was queried from the earliest window start of its reservations
+        return self.region.metrics_for(self.key)
+
+
+def region_timeout_seconds(fleet: Dict[str, Any], location: str) -> float:
+    """Per-region query timeout: fleet.region_timeouts[location], else fleet.region_timeout_seconds."""
+    return fleet.get("region_timeouts", {}).get(location, fleet.get("region_timeout_seconds", 60))
+
+
+def reservation_configs(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand a fleet config into one DecisionEngine config per reservation.
+    Top-level keys (profiles, mapping, thresholds, ...) are shared defaults;
+    each entry under "reservations" overrides them for that reservation.
+    """
+    shared = {k: v for k, v in config.items() if k not in ("fleet", "reservations")}
+    return [{**shared, **entry} for entry in config.get("reservations", [])]
+
+
+class FleetController(SlotController):
+    """
+    Runs the decision cycle of many reservations from one process.
+
+    Engines, the Reservation API client and one grouped metrics collector per
+    (project, region) are built once. Every tick first queries all regions
+    concurrently, each within its own timeout, then submits all reservations
+    to a bounded worker pool and waits at most tick_seconds for them. A
+    cycle still running after that is left to finish: its reservation is
+    skipped (and counted as overrun) until it does, and it is recorded at
+    the first tick after it finished.
+
+    reservation_client and bigquery_client default to the real GCP clients;
+    pass substitutes (e.g. core.emulator) to run the fleet without GCP.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        reservation_client: Any = None,
+        bigquery_client: Any = None,
+    ):
+        self.config = config
+        self.store = MetricsStore.from_config(config)
+        # fleets run on the fixed tick; adaptive polling is per reservation
+        self.poller = None
+        self.cost = CostAccountant.from_config(config)
+        self._stop_event = threading.Event()
+        self.config_loader = None
+        self._start_instrumentation()
+
+        fleet = config.get("fleet", {})
+        self.max_workers = fleet.get("max_workers", 8)
+        self.tick_seconds = fleet.get("tick_seconds", config.get("check_interval_minutes", 5) * 60)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fleet")
+        # cycles that outlived their tick, by reservation key
+        self._in_flight: Dict[str, Tuple[Future, DecisionEngine]] = {}
+
+        self._reservation_client = reservation_client
+        self._bigquery_client = bigquery_client
+        self.regions, self.engines = self._build_engines(config)
+        self.region_collector = MultiRegionMetricsCollector(
+            {name: region.collector for name, region in self.regions.items()}
+        )
+
+    def _build_engines(
+        self, config: Dict[str, Any]
+    ) -> Tuple[Dict[Tuple[str, str], RegionMetrics], Dict[str, DecisionEngine]]:
+        fleet = config.get("fleet", {})
+        degraded = config.get("degraded_mode")
+        shared_client = self._reservation_client
+        regions: Dict[Tuple[str, str], RegionMetrics] = {}
+        engines: Dict[str, DecisionEngine] = {}
+
+        for entry in reservation_configs(config):
+            metadata = entry["metadata"]
+            location = metadata.get("location", "US")
+            query_project = fleet.get("query_project_id", metadata["project_id"])
+
+            region = regions.get((query_project, location))
+            if region is None:
+                region = regions[(query_project, location)] = RegionMetrics(
+                    (query_project, location),
+                    ReservationGroupedMetricsCollector(
+                        project_id=query_project,
+                        location=location,
+                        sql_path=fleet.get("sql_path", "queries/jobs_sla_metrics_by_reservation.sql"),
+                        jobs_view=fleet.get("jobs_view", "JOBS"),
+                        timeout_seconds=region_timeout_seconds(fleet, location),
+                        client=self._bigquery_client,
+                    ),
+                    breaker=(
+                        breaker_from_config(degraded, f"{query_project}/{location}")
+                        if degraded and degraded.get("enabled", True) else None
+                    ),
+                )
+
+            manager = ReservationManager(
+                project_id=metadata["project_id"],
+                reservation_id=metadata["reservation_id"],
+                location=location,
+                client=shared_client,
+            )
+            shared_client = manager.reservation_client.client
+
+            key = reservation_key(metadata["project_id"], location, metadata["reservation_id"])
+            engines[key] = DecisionEngine(
+                entry,
+                collector=ReservationMetricsView(region, key),
+                reservation_mgr=manager,
+                utilization_collector=SlotUtilizationCollector.from_config(entry, client=self._bigquery_client),
+            )
+            if engines[key].degraded is not None:
+                # the region's breaker guards the shared query; the view itself never hits BigQuery
+                engines[key].degraded.breaker = None
+        # reloads reuse the Reservation API channel
+        self._reservation_client = shared_client
+        return regions, engines
+
+    def _apply_config(self, config: Dict[str, Any]) -> None:
+        """
+        Rebuild regions and engines for a new fleet config. Reservations that
+        stay carry over their engine's running state; an engine whose cycle
+        is still in flight hands it over once that cycle is reaped. The
+        worker pool size needs a restart.
+        """
+        regions, engines = self._build_engines(config)
+        for key, engine in engines.items():
+            if key in self.engines and key not in self._in_flight:
+                engine.carry_over(self.engines[key])
+        fleet = config.get("fleet", {})
+        self.tick_seconds = fleet.get("tick_seconds", config.get("check_interval_minutes", 5) * 60)
+        store = self._reload_store(config)
+        if self.store is not None and self.store is not store:
+            # late cycles are recorded on this thread, into the current store
+            self.store.close()
+        self.store = store
+        self.region_collector.close()
+        self.region_collector = MultiRegionMetricsCollector(
+            {name: region.collector for name, region in regions.items()}
+        )
+        self.config, self.regions, self.engines = config, regions, engines
+
+    def run(self, execution_time: Any = None) -> Dict[str, Optional[SLAEvaluationResult]]:
+        """Run every reservation's decision cycle concurrently for one tick."""
+        if execution_time is None:
+            execution_time = pendulum.now("Asia/Jakarta")
+
+        if not isinstance(execution_time, pendulum.DateTime):
+            execution_time = pendulum.instance(execution_time, tz="Asia/Jakarta")
+
+        logging.info(f"Running fleet controller for {len(self.engines)} reservation(s) at {execution_time}")
+        self._reap_in_flight()
+        results: Dict[str, Optional[SLAEvaluationResult]] = {}
+        engines: Dict[str, DecisionEngine] = {}
+        for key, engine in self.engines.items():
+            if key in self._in_flight:
+                # one engine never runs two cycles at once
+                logging.warning(f"Skipping reservation {key}: its previous decision cycle is still running")
+                CYCLES_OVERRUN.inc(reservation=key)
+                results[key] = None
+                continue
+            engines[key] = engine
+            self._refresh_prewarm(key, engine, execution_time)
+        self._collect_regions(execution_time, engines)
+        futures = {key: self._executor.submit(engine.run, execution_time) for key, engine in engines.items()}
+        wait(futures.values(), timeout=self.tick_seconds)
+
+        for key, future in futures.items():
+            if future.done():
+                results[key] = self._finish(key, engines[key], future)
+            else:
+                logging.warning(f"Decision cycle for reservation {key} did not finish within the tick")
+                self._in_flight[key] = (future, engines[key])
+                results[key] = None
+
+        self._export_metrics()
+        return results
+
+    def _finish(self, key: str, engine: DecisionEngine, future: Future) -> Optional[SLAEvaluationResult]:
+        """Result of a finished cycle, recorded and accounted."""
+        try:
+            result = future.result()
+        except Exception:
+            logging.exception(f"Decision cycle failed for reservation {key}")
+            return None
+        self._record(key, engine)
+        self._account(key, engine)
+        return result
+
+    def _reap_in_flight(self) -> None:
+        """Record the late cycles that have finished since the last tick."""
+        for key, (future, engine) in list(self._in_flight.items()):
+            if future.done():
+                del self._in_flight[key]
+                logging.info(f"Late decision cycle for reservation {key} finished")
+                self._finish(key, engine, future)
+                replacement = self.engines.get(key)
+                if replacement is not None and replacement is not engine:
+                    # reloaded while the cycle ran; its state is final only now
+                    replacement.carry_over(engine)
+
+    def _collect_regions(self, execution_time: pendulum.DateTime, engines: Dict[str, DecisionEngine]) -> None:
+        """
+        Query every region of the given engines once for this tick, from the
+        earliest window start of its reservations, and share the rows (or
+        the error) with them. Regions whose circuit breaker is open are not
+        queried.
+        """
+        now = execution_time.timestamp()
+        since: Dict[Tuple[str, str], pendulum.DateTime] = {}
+        for engine in engines.values():
+            name = engine.collector.region.name
+            window_start = execution_time - engine.lookback(execution_time)
+            since[name] = min(since.get(name, window_start), window_start)
+
+        for name in list(since):
+            breaker = self.regions[name].breaker
+            if breaker is not None and not breaker.allow(now):
+                self.regions[name].fill(MetricsCollectionError(CIRCUIT_OPEN_MESSAGE))
+                del since[name]
+
+        for name, result in self.region_collector.collect(since).items():
+            region = self.regions[name]
+            region.fill(result)
+            if region.breaker is None:
+                continue
+            if isinstance(result, MetricsCollectionError):
+                region.breaker.record_failure(now)
+            else:
+                region.breaker.record_success()
+
+    def close(self) -> None:
+        self.region_collector.close()
+        self._executor.shutdown(wait=True)
+        self._reap_in_flight()
@@ -0,0 +1,301 @@
+import json
+import logging
+import math
+import os
+from concurrent.futures import TimeoutError
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from core.instrumentation import record_query_job, timed
+from core.lazy import LazyModule
+from core.metrics import BigQueryJobMetricsCollector, MetricsCollectionError
+from core.sketch import QuantileSketch
+
+bigquery = LazyModule("google.cloud.bigquery")
+
+BUCKET_SECONDS = 60
+# the state journal is rewritten as a snapshot once it holds this many rows per live job
+JOURNAL_COMPACT_RATIO = 2
+
+# (state, creation, start, end, error_reason) with times as epoch seconds
+JobRow = Tuple[str, float, Optional[float], Optional[float], Optional[str]]
+
+
+def _epoch(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value.timestamp()
+
+
+def _timestamp(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+class _MinuteBucket:
+    """Rolling state for jobs created within one minute."""
+
+    def __init__(self, relative_accuracy: float):
+        self.job_ids: Set[str] = set()
+        self.running_ids: Set[str] = set()
+        self.submitted = 0
+        self.pending = 0
+        self.done = 0
+        self.error = 0
+        self.queue_count = 0
+        self.queue_sum = 0.0
+        self.queue_sumsq = 0.0
+        self.queue_min = math.inf
+        self.queue_max = -math.inf
+        self.queue_sketch = QuantileSketch(relative_accuracy)
+
+
+class IncrementalJobMetricsCollector(BigQueryJobMetricsCollector):
+    """
+    Metrics collector that only fetches job rows changed since a watermark.
+
+    Job rows are kept locally and folded into per-minute buckets holding
+    state counters, queueing-time moments and a mergeable quantile sketch.
+    Each collect() fetches the rows created, started or finished after the
+    watermark (minus a small overlap for INFORMATION_SCHEMA ingestion lag),
+    applies them idempotently and merges the buckets of the window into the
+    same metrics dict the aggregate query returns. The window start is
+    rounded down to the minute. Buckets are kept for retain_seconds before
+    the window start, so a later cycle with a longer lookback still sees them.
+    Running times are measured at the end of the window, lookback_seconds
+    after its start, rather than at the wall-clock time of the query.
+
+    With state_path set, each collect appends the watermark and the job
+    rows it changed to a JSON-lines journal, so a restarted controller
+    resumes incrementally. Once the journal holds JOURNAL_COMPACT_RATIO
+    rows per live job it is rewritten as one snapshot line.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        sql_path: str = "queries/jobs_incremental.sql",
+        timeout_seconds: int = 60,
+        state_path: Optional[str] = None,
+        overlap_seconds: int = 60,
+        relative_accuracy: float = 0.01,
+        retain_seconds: int = 0,
+        lookback_seconds: int = 300,
+        client: Any = None,
+    ):
+        super().__init__(project_id, location, sql_path, timeout_seconds, client=client)
+        self.state_path = Path(state_path) if state_path else None
+        self.overlap_seconds = overlap_seconds
+        self.relative_accuracy = relative_accuracy
+        self.retain_seconds = retain_seconds
+        self.lookback_seconds = lookback_seconds
+
+        self.watermark: Optional[float] = None
+        self.jobs: Dict[str, JobRow] = {}
+        self._buckets: Dict[int, _MinuteBucket] = {}
+        # rows changed since the last save, and rows in the journal file
+        self._changed: Dict[str, JobRow] = {}
+        self._journal_rows = 0
+        self._load_state()
+
+    @timed("collect")
+    def collect(self, since: datetime, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Collect job metrics since the given timestamp from local rolling state,
+        after applying the job rows that changed since the last call. now is
+        the end of the window; it defaults to since plus lookback_seconds.
+        """
+        since_epoch = _epoch(since)
+        now_epoch = _epoch(now) if now is not None else since_epoch + self.lookback_seconds
+        self._evict(since_epoch - self.retain_seconds)
+
+        if self.watermark is None:
+            watermark = since_epoch - 1
+        else:
+            watermark = self.watermark - self.overlap_seconds
+
+        query = self.query
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("since_ts", "TIMESTAMP", since),
+                bigquery.ScalarQueryParameter("watermark_ts", "TIMESTAMP", _timestamp(watermark)),
+            ]
+        )
+
+        try:
+            query_job = self.client.query(query, job_config=job_config)
+            result = query_job.result(timeout=self.timeout_seconds)
+            record_query_job(self.query_name, query_job)
+
+            latest = self.watermark or watermark
+            for row in result:
+                latest = max(latest, self._apply(dict(row)))
+
+        except TimeoutError:
+            raise MetricsCollectionError("BigQuery metrics query timed out")
+
+        except Exception as exc:
+            logging.exception("Failed to collect incremental BigQuery job metrics")
+            raise MetricsCollectionError(str(exc)) from exc
+
+        self.watermark = latest
+        self._save_state()
+
+        metrics = self._aggregate(since_epoch, now_epoch)
+        self._validate_metrics(metrics)
+        return metrics
+
+    def _bucket_key(self, epoch: float) -> int:
+        return int(epoch // BUCKET_SECONDS)
+
+    def _apply(self, row: Dict[str, Any]) -> float:
+        """Upsert one job row; returns the latest timestamp it carries."""
+        job_id = row["job_id"]
+        new: JobRow = (
+            row["state"],
+            _epoch(row["creation_time"]),
+            _epoch(row.get("start_time")),
+            _epoch(row.get("end_time")),
+            row.get("error_reason"),
+        )
+        old = self.jobs.get(job_id)
+        if old == new:
+            # re-read through the watermark overlap
+            return max(t for t in new[1:4] if t is not None)
+
+        key = self._bucket_key(new[1])
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _MinuteBucket(self.relative_accuracy)
+
+        if old is not None:
+            self._contribute(bucket, job_id, old, -1)
+        self._contribute(bucket, job_id, new, 1)
+
+        # queueing time is fixed once a job starts, so it is added exactly once
+        if new[2] is not None and (old is None or old[2] is None):
+            queued = float(int(new[2] - new[1]))
+            bucket.queue_count += 1
+            bucket.queue_sum += queued
+            bucket.queue_sumsq += queued * queued
+            bucket.queue_min = min(bucket.queue_min, queued)
+            bucket.queue_max = max(bucket.queue_max, queued)
+            bucket.queue_sketch.add(queued)
+
+        self.jobs[job_id] = new
+        self._changed[job_id] = new
+        return max(t for t in new[1:4] if t is not None)
+
+    @staticmethod
+    def _contribute(bucket: _MinuteBucket, job_id: str, job: JobRow, sign: int) -> None:
+        state, _, _, _, error_reason = job
+        bucket.submitted += sign
+        if sign > 0:
+            bucket.job_ids.add(job_id)
+
+        if state == "PENDING":
+            bucket.pending += sign
+        elif state == "RUNNING":
+            if sign > 0:
+                bucket.running_ids.add(job_id)
+            else:
+                bucket.running_ids.discard(job_id)
+        elif state == "DONE" and error_reason is None:
+            bucket.done += sign
+
+        if error_reason == "stopped":
+            bucket.error += sign
+
+    def _evict(self, since_epoch: float) -> None:
+        first_key = self._bucket_key(since_epoch)
+        for key in [k for k in self._buckets if k < first_key]:
+            for job_id in self._buckets.pop(key).job_ids:
+                self.jobs.pop(job_id, None)
+
+    def _aggregate(self, since_epoch: float, now: float) -> Dict[str, Any]:
+        first_key = self._bucket_key(since_epoch)
+        buckets = [b for k, b in self._buckets.items() if k >= first_key]
+
+        submitted = sum(b.submitted for b in buckets)
+        queue_count = sum(b.queue_count for b in buckets)
+        queue_sum = sum(b.queue_sum for b in buckets)
+        queue_sumsq = sum(b.queue_sumsq for b in buckets)
+        sketch = QuantileSketch.merged((b.queue_sketch for b in buckets), self.relative_accuracy)
+
+        running_times = [
+            float(int(now - self.jobs[job_id][2]))
+            for b in buckets
+            for job_id in b.running_ids
+        ]
+
+        return {
+            "count_job_submitted": submitted,
+            "count_job_pending": sum(b.pending for b in buckets),
+            "count_job_done": sum(b.done for b in buckets),
+            "count_job_running": len(running_times),
+            "count_job_error": sum(b.error for b in buckets),
+            "min_queueing_time": min((b.queue_min for b in buckets if b.queue_count), default=None),
+            "max_queueing_time": max((b.queue_max for b in buckets if b.queue_count), default=None),
+            "avg_queueing_time": queue_sum / queue_count if queue_count else None,
+            "stddev_queueing_time": self._stddev(queue_count, queue_sum, queue_sumsq),
+            "queueing_time_p99": sketch.quantile(0.99),
+            "min_running_time": min(running_times, default=None),
+            "max_running_time": max(running_times, default=None),
+            "avg_running_time": sum(running_times) / len(running_times) if running_times else None,
+            "stddev_running_time": self._stddev(
+                len(running_times), sum(running_times), sum(t * t for t in running_times)
+            ),
+        }
+
+    @staticmethod
+    def _stddev(count: int, total: float, sumsq: float) -> Optional[float]:
+        # BigQuery STDDEV is the sample standard deviation, NULL below two rows
+        if count < 2:
+            return None
+        return math.sqrt(max(sumsq - total * total / count, 0.0) / (count - 1))
+
+    def _load_state(self) -> None:
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            lines = self.state_path.read_text().splitlines()
+        except OSError:
+            logging.warning(f"Ignoring unreadable metrics state at {self.state_path}")
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # a save interrupted mid-append; later lines are still valid
+                logging.warning(f"Skipping a corrupt line of metrics state at {self.state_path}")
+                continue
+            for job_id, (status, creation, start, end, reason) in entry.get("jobs", {}).items():
+                self._apply({
+                    "job_id": job_id,
+                    "state": status,
+                    "creation_time": creation,
+                    "start_time": start,
+                    "end_time": end,
+                    "error_reason": reason,
+                })
+            self._journal_rows += len(entry.get("jobs", {}))
+            self.watermark = entry.get("watermark", self.watermark)
+        self._changed = {}
+
+    def _save_state(self) -> None:
+        if self.state_path is None:
+            return
+        if self._journal_rows + len(self._changed) > JOURNAL_COMPACT_RATIO * max(len(self.jobs), 1):
+            tmp_path = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps({"watermark": self.watermark, "jobs": self.jobs}) + "\n")
+            os.replace(tmp_path, self.state_path)
+            self._journal_rows = len(self.jobs)
+        else:
+            with self.state_path.open("a") as journal:
+                journal.write(json.dumps({"watermark": self.watermark, "jobs": self._changed}) + "\n")
+            self._journal_rows += len(self._changed)
+        self._changed = {}
@@ -0,0 +1,294 @@
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# seconds; BigQuery queries land in the upper buckets, cached reads in the lower
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(n, "")).replace("\\", "\\\\").replace('"', '\\"') for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help}"]
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def get(self, **labels: Any) -> Optional[float]:
+        return self.values.get(self._key(labels))
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # label values -> (per-bucket counts, sum, count)
+        self.values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: Any) -> int:
+        entry = self.values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self.values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Process-wide counters, gauges and histograms, rendered in the
+    OpenMetrics text format. Metric names are registered once; asking for
+    an existing name returns the same family.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: Dict[str, _Family] = {}
+
+    def _family(self, cls, name: str, help_text: str, labelnames: Tuple[str, ...], **kwargs) -> Any:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = cls(name, help_text, tuple(labelnames), threading.Lock(), **kwargs)
+        return family
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._family(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._family(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._family(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            families = list(self._families.values())
+        for family in families:
+            with family._lock:
+                lines.extend(family.header())
+                lines.extend(family.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write the exposition, e.g. for node_exporter's textfile collector."""
+        target = Path(path)
+        tmp_path = target.with_suffix(target.suffix + ".tmp")
+        tmp_path.write_text(self.render())
+        os.replace(tmp_path, target)
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "slot_controller_stage_seconds",
+    "Wall time of each decision cycle stage.",
+    ("stage",),
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "slot_controller_stage_errors",
+    "Decision cycle stages that raised.",
+    ("stage",),
+)
+CYCLES = REGISTRY.counter(
+    "slot_controller_cycles",
+    "Decision cycles by outcome (healthy, breach, stale, collection_failure).",
+    ("reservation", "outcome"),
+)
+MAX_SLOTS = REGISTRY.gauge(
+    "slot_controller_max_slots",
+    "Reservation max slots in effect after the last cycle.",
+    ("reservation",),
+)
+QUERY_BYTES_PROCESSED = REGISTRY.counter(
+    "slot_controller_query_bytes_processed",
+    "Bytes processed by the controller's own monitoring queries.",
+    ("query",),
+)
+QUERY_BYTES_BILLED = REGISTRY.counter(
+    "slot_controller_query_bytes_billed",
+    "Bytes billed for the controller's own monitoring queries.",
+    ("query",),
+)
+QUERY_SLOT_MILLIS = REGISTRY.counter(
+    "slot_controller_query_slot_millis",
+    "Slot-milliseconds consumed by the controller's own monitoring queries.",
+    ("query",),
+)
+RESERVATION_WRITES_SKIPPED = REGISTRY.counter(
+    "slot_controller_reservation_writes_skipped",
+    "Reservation updates skipped because the reservation already matched.",
+)
+RESERVATION_WRITES_DEFERRED = REGISTRY.counter(
+    "slot_controller_reservation_writes_deferred",
+    "Slot decisions held back by stabilization cooldowns and coalesced into a later write.",
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block into slot_controller_stage_seconds{stage=...}; failures are counted too."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def timed(stage: str):
+    """Decorator form of span() for plain and async functions."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def record_query_job(query: str, query_job: Any) -> None:
+    """Add a finished QueryJob's bytes and slot-ms to the query counters."""
+    for attr, counter in (
+        ("total_bytes_processed", QUERY_BYTES_PROCESSED),
+        ("total_bytes_billed", QUERY_BYTES_BILLED),
+        ("slot_millis", QUERY_SLOT_MILLIS),
+    ):
+        value = getattr(query_job, attr, None)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            counter.inc(value, query=query)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"metrics endpoint: {format % args}")
+
+
+def start_http_server(port: int, addr: str = "", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve the registry on http://addr:port/ from a daemon thread."""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((addr, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logging.info(f"Serving OpenMetrics on port {server.server_address[1]}")
+    return server
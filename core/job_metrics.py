@@ -0,0 +1,230 @@
+import logging
+import math
+import pathlib
+import time
+from concurrent.futures import TimeoutError
+from datetime import datetime
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+from core.instrumentation import record_query_job, timed
+from core.lazy import LazyModule
+from core.metrics import BigQueryJobMetricsCollector, MetricsCollectionError
+
+bigquery_storage = LazyModule("google.cloud.bigquery_storage")
+
+# state_code values of queries/jobs_job_level.sql
+PENDING, RUNNING, DONE = 0, 1, 2
+NUMERIC_COLUMNS = ("state_code", "has_error", "is_stopped", "creation_ms", "start_ms", "end_ms", "total_slot_ms")
+QUEUEING_QUANTILES = {
+    "queueing_time_p50": 0.50,
+    "queueing_time_p90": 0.90,
+    "queueing_time_p95": 0.95,
+    "queueing_time_p99": 0.99,
+}
+
+
+def arrow_columns(batch: Any) -> Dict[str, np.ndarray]:
+    """
+    NumPy arrays of a record batch's numeric job columns. Arrow hands out
+    views of columns without nulls, which the query guarantees; a column
+    with nulls would be copied rather than rejected.
+    """
+    return {name: batch.column(name).to_numpy(zero_copy_only=False) for name in NUMERIC_COLUMNS}
+
+
+def _whole_seconds(ms: np.ndarray) -> np.ndarray:
+    """Milliseconds to whole seconds truncated towards zero, as TIMESTAMP_DIFF(..., SECOND) does."""
+    return np.where(ms >= 0, ms // 1000, -(-ms // 1000))
+
+
+class _Moments:
+    """Count, min, max, mean and sample standard deviation of a stream of values."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def add(self, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum(dtype=np.float64))
+        self.total_sq += float(np.square(values, dtype=np.float64).sum())
+        low, high = int(values.min()), int(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def stats(self, name: str) -> Dict[str, Optional[float]]:
+        mean = self.total / self.count if self.count else None
+        stddev = None
+        if self.count > 1:
+            # STDDEV in BigQuery is the sample standard deviation
+            stddev = math.sqrt(max(self.total_sq - self.count * mean * mean, 0.0) / (self.count - 1))
+        return {
+            f"min_{name}": self.min,
+            f"max_{name}": self.max,
+            f"avg_{name}": mean,
+            f"stddev_{name}": stddev,
+        }
+
+
+class JobAggregate:
+    """
+    Running aggregate of job rows, fed one batch of NumPy columns at a time.
+
+    Queueing times, in whole seconds as the aggregate query computes them,
+    are counted in an integer histogram with one bin per second up to
+    max_queue_seconds. Memory stays the same however many jobs a region
+    runs, and percentiles are exact (nearest rank) below the cap. Longer
+    waits share the last bin and report as max_queue_seconds.
+    """
+
+    def __init__(self, max_queue_seconds: int = 86400):
+        self.max_queue_seconds = max_queue_seconds
+        self.queue_histogram = np.zeros(max_queue_seconds + 1, dtype=np.int64)
+        self.submitted = 0
+        self.pending = 0
+        self.running = 0
+        self.done = 0
+        self.error = 0
+        self.total_slot_ms = 0
+        self.queueing = _Moments()
+        self.running_time = _Moments()
+
+    def add(self, columns: Mapping[str, np.ndarray], now_ms: int) -> None:
+        """Fold in one batch; now_ms is the query's CURRENT_TIMESTAMP() for running times."""
+        state = columns["state_code"]
+        start = columns["start_ms"]
+        running = state == RUNNING
+        started = start >= 0
+
+        self.submitted += len(state)
+        self.pending += int(np.count_nonzero(state == PENDING))
+        self.running += int(np.count_nonzero(running))
+        self.done += int(np.count_nonzero((state == DONE) & (columns["has_error"] == 0)))
+        self.error += int(np.count_nonzero(columns["is_stopped"]))
+        self.total_slot_ms += int(columns["total_slot_ms"].sum())
+
+        queueing = _whole_seconds(start[started] - columns["creation_ms"][started])
+        self.queueing.add(queueing)
+        self.queue_histogram += np.bincount(
+            np.clip(queueing, 0, self.max_queue_seconds), minlength=self.max_queue_seconds + 1
+        )
+        self.running_time.add(_whole_seconds(now_ms - start[running & started]))
+
+    def queueing_quantile(self, q: float, cumulative: Optional[np.ndarray] = None) -> Optional[int]:
+        """
+        Exact nearest-rank quantile of the queueing times, or None without
+        started jobs. cumulative is the histogram's cumsum, when the caller
+        already has it.
+        """
+        if self.queueing.count == 0:
+            return None
+        if cumulative is None:
+            cumulative = np.cumsum(self.queue_histogram)
+        rank = max(math.ceil(q * self.queueing.count) - 1, 0)
+        return int(np.searchsorted(cumulative, rank, side="right"))
+
+    def metrics(self) -> Dict[str, Any]:
+        """The metrics dict of queries/jobs_sla_metrics.sql, plus extra percentiles and total slot-ms."""
+        cumulative = np.cumsum(self.queue_histogram) if self.queueing.count else None
+        return {
+            "count_job_submitted": self.submitted,
+            "count_job_pending": self.pending,
+            "count_job_done": self.done,
+            "count_job_running": self.running,
+            "count_job_error": self.error,
+            **self.queueing.stats("queueing_time"),
+            **{name: self.queueing_quantile(q, cumulative) for name, q in QUEUEING_QUANTILES.items()},
+            **self.running_time.stats("running_time"),
+            "total_slot_ms": self.total_slot_ms,
+        }
+
+
+class JobLevelMetricsCollector(BigQueryJobMetricsCollector):
+    """
+    Metrics collector that reads one row per job instead of a server-side
+    aggregate (metrics_mode "jobs").
+
+    Rows arrive as Arrow record batches. The BigQuery Storage Read API is
+    used when google-cloud-bigquery-storage is installed; otherwise the
+    batches come from the REST result pages. Each batch's numeric columns
+    are folded into a JobAggregate as NumPy arrays, so only one batch is in
+    memory at a time. collect() returns the aggregate query's metrics dict
+    with exact instead of approximate percentiles. The queueing histogram of
+    the last collect stays on queue_histogram. iter_batches() gives policies
+    that need job-level data the raw batches from detail_sql_path, which
+    adds reservation_id and labels; collect() leaves those columns out so
+    they are not scanned every cycle. Needs pyarrow.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        sql_path: str = "queries/jobs_job_level.sql",
+        timeout_seconds: int = 60,
+        max_queue_seconds: int = 86400,
+        use_storage_api: bool = True,
+        detail_sql_path: str = "queries/jobs_job_level_detail.sql",
+        client: Any = None,
+    ):
+        super().__init__(project_id, location, sql_path, timeout_seconds, client=client)
+        self.detail_sql_path = detail_sql_path
+        self.max_queue_seconds = max_queue_seconds
+        self.use_storage_api = use_storage_api
+        self._bqstorage_client = None
+        self.queue_histogram: Optional[np.ndarray] = None
+
+    def _storage_client(self) -> Any:
+        if not self.use_storage_api:
+            return None
+        if self._bqstorage_client is None:
+            try:
+                self._bqstorage_client = bigquery_storage.BigQueryReadClient()
+            except ImportError:
+                logging.info("google-cloud-bigquery-storage is not installed; reading job rows from REST pages")
+                self.use_storage_api = False
+        return self._bqstorage_client
+
+    def _query(self, query: str, query_name: str, since: datetime) -> Tuple[Any, Iterator[Any]]:
+        query_job = self.client.query(query, job_config=self._job_config(since))
+        result = query_job.result(timeout=self.timeout_seconds)
+        record_query_job(query_name, query_job)
+        return query_job, result.to_arrow_iterable(bqstorage_client=self._storage_client())
+
+    def iter_batches(self, since: datetime) -> Iterator[Any]:
+        """Arrow record batches of the jobs created since the given timestamp, with reservation_id and labels."""
+        sql_file = pathlib.Path(self.detail_sql_path)
+        query = sql_file.read_text().replace("{{ location }}", self.location)
+        _, batches = self._query(query, sql_file.stem, since)
+        return batches
+
+    @timed("collect")
+    def collect(self, since: datetime) -> Dict[str, Any]:
+        """
+        Collect job metrics since the given timestamp from the job rows.
+        """
+        aggregate = JobAggregate(self.max_queue_seconds)
+        try:
+            query_job, batches = self._query(self.query, self.query_name, since)
+            # running times are measured against the query's start, like CURRENT_TIMESTAMP()
+            started = getattr(query_job, "started", None)
+            now = started.timestamp() if isinstance(started, datetime) else time.time()
+            for batch in batches:
+                aggregate.add(arrow_columns(batch), int(now * 1000))
+
+        except TimeoutError:
+            raise MetricsCollectionError("BigQuery metrics query timed out")
+
+        except Exception as exc:
+            logging.exception("Failed to collect job-level BigQuery metrics")
+            raise MetricsCollectionError(str(exc)) from exc
+
+        self.queue_histogram = aggregate.queue_histogram
+        return aggregate.metrics()
@@ -0,0 +1,27 @@
+import importlib
+from typing import Any
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    The google-cloud client libraries (BigQuery, with pandas when it is
+    installed, and the Reservation API's gRPC stack) are most of the
+    controller's import time. Binding them through LazyModule moves that cost
+    to the first cycle that touches a client. Entry points that never touch
+    one, such as --help, config validation, replay or the fakes, skip it.
+
+    Attributes set on the stand-in (e.g. by unittest.mock.patch) shadow the
+    module's own.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        # import_module is thread-safe and a dict lookup once the module is loaded
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
@@ -1,15 +1,66 @@
 from datetime import datetime
-from typing import Dict, Any
-from google.cloud import bigquery
-from concurrent.futures import TimeoutError
+from functools import cached_property
+from typing import Dict, Any, Hashable, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import asyncio
 import logging
 import pathlib
+import re
+import time
+
+from core.instrumentation import record_query_job, timed
+from core.lazy import LazyModule
+
+bigquery = LazyModule("google.cloud.bigquery")
 
 
 class MetricsCollectionError(Exception):
     pass
 
 
+# INFORMATION_SCHEMA.JOBS column per segmentation dimension
+SEGMENT_COLUMNS = {
+    "user": "user_email",
+    "project": "project_id",
+    "priority": "priority",
+}
+LABEL_KEY_PATTERN = re.compile(r"^[a-z0-9_-]{1,63}$")
+# metrics combined across segments by summing; the rest take the max
+SUMMED_METRICS = ("count_job_submitted", "count_job_pending", "count_job_done", "count_job_running", "count_job_error")
+MAX_METRICS = ("max_queueing_time", "queueing_time_p99", "max_running_time")
+
+
+def segment_expression(segment_by: str) -> str:
+    """SQL expression for a segmentation dimension: user, project, priority or label:<key>."""
+    if segment_by in SEGMENT_COLUMNS:
+        return SEGMENT_COLUMNS[segment_by]
+    if segment_by.startswith("label:"):
+        key = segment_by[len("label:"):]
+        # the key is inlined into SQL, so only BigQuery label key characters are accepted
+        if LABEL_KEY_PATTERN.match(key):
+            return f"(SELECT value FROM UNNEST(labels) WHERE key = '{key}')"
+    raise ValueError(
+        f"Unknown segmentation {segment_by!r}; expected one of {sorted(SEGMENT_COLUMNS)} or label:<key>"
+    )
+
+
+def combine_segments(segments: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reservation-level metrics from per-segment rows, with the rows kept
+    under "segments". Counts are summed; queueing p99 and max running time
+    are the worst segment's, an upper bound of the true aggregate.
+    """
+    if not segments:
+        return {}
+    rows = list(segments.values())
+    combined: Dict[str, Any] = {name: sum(row.get(name) or 0 for row in rows) for name in SUMMED_METRICS}
+    for name in MAX_METRICS:
+        values = [row[name] for row in rows if row.get(name) is not None]
+        combined[name] = max(values) if values else None
+    combined["segments"] = segments
+    return combined
+
+
 class BigQueryJobMetricsCollector:
     def __init__(
         self,
@@ -17,46 +68,52 @@ class BigQueryJobMetricsCollector:
         location: str,
         sql_path: str,
         timeout_seconds: int = 60,
+        client: Any = None,
+        segment_by: Optional[str] = None,
     ):
-        self.client = bigquery.Client(project=project_id)
+        """
+        With segment_by, the query (e.g. queries/jobs_sla_metrics_by_segment.sql)
+        returns one row per segment and collect() returns the combined
+        metrics with the per-segment rows under "segments".
+        """
+        self.client = client or bigquery.Client(project=project_id)
         self.location = location
         self.timeout_seconds = timeout_seconds
+        self.segment_by = segment_by
 
         sql_file = pathlib.Path(sql_path)
         self.query_template = sql_file.read_text()
+        if segment_by is not None:
+            self.query_template = self.query_template.replace("{{ segment }}", segment_expression(segment_by))
+        # label for the query cost counters
+        self.query_name = sql_file.stem
 
+    @cached_property
+    def query(self) -> str:
+        """
+        The query with the location rendered. Built once, on the first
+        collect, after subclasses have finished filling in the template.
+        """
+        return self.query_template.replace("{{ location }}", self.location)
+
+    @timed("collect")
     def collect(self, since: datetime) -> Dict[str, Any]:
         """
         Collect aggregated BigQuery job metrics since the given timestamp.
         """
 
-        query = self.query_template.replace("{{ location }}", self.location)
-
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter(
-                    "since_ts", "TIMESTAMP", since
-                )
-            ]
-        )
+        query = self.query
 
         try:
             query_job = self.client.query(
                 query,
-                job_config=job_config,
+                job_config=self._job_config(since),
             )
 
             result = query_job.result(timeout=self.timeout_seconds)
+            record_query_job(self.query_name, query_job)
 
-            if result.total_rows == 0:
-                return {}
-
-            row = list(result)[0]
-            metrics = dict(row)
-
-            self._validate_metrics(metrics)
-
-            return metrics
+            return self._metrics_from_result(result)
 
         except TimeoutError:
             raise MetricsCollectionError("BigQuery metrics query timed out")
@@ -65,6 +122,39 @@ class BigQueryJobMetricsCollector:
             logging.exception("Failed to collect BigQuery job metrics")
             raise MetricsCollectionError(str(exc)) from exc
 
+    @staticmethod
+    def _job_config(since: datetime) -> "bigquery.QueryJobConfig":
+        return bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "since_ts", "TIMESTAMP", since
+                )
+            ]
+        )
+
+    def _metrics_from_result(self, result) -> Dict[str, Any]:
+        if result.total_rows == 0:
+            return {}
+
+        if self.segment_by is not None:
+            # rows are consumed as the iterator pages them in
+            segments = {}
+            for row in result:
+                metrics = dict(row)
+                segment = metrics.pop("segment")
+                self._validate_metrics(metrics)
+                segments[segment] = metrics
+            return combine_segments(segments)
+
+        row = next(iter(result), None)
+        if row is None:
+            return {}
+        metrics = dict(row)
+
+        self._validate_metrics(metrics)
+
+        return metrics
+
     @staticmethod
     def _validate_metrics(metrics: Dict[str, Any]) -> None:
         required_fields = {
@@ -81,3 +171,313 @@ class BigQueryJobMetricsCollector:
                 f"Missing required metrics: {missing}"
             )
 
+
+
+class AsyncBigQueryJobMetricsCollector(BigQueryJobMetricsCollector):
+    """
+    asyncio variant of BigQueryJobMetricsCollector.
+
+    The query job is submitted and then polled with non-blocking sleeps, so
+    the event loop is free to run other I/O (e.g. the reservation read)
+    while BigQuery executes the query. Cancelling collect() or exceeding the
+    deadline cancels the BigQuery job as well.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        sql_path: str,
+        timeout_seconds: int = 60,
+        poll_interval_seconds: float = 0.5,
+        client: Any = None,
+        segment_by: Optional[str] = None,
+    ):
+        super().__init__(project_id, location, sql_path, timeout_seconds, client=client, segment_by=segment_by)
+        self.poll_interval_seconds = poll_interval_seconds
+
+    @timed("collect")
+    async def collect(self, since: datetime, timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Collect aggregated BigQuery job metrics since the given timestamp.
+        """
+        timeout = self.timeout_seconds if timeout_seconds is None else timeout_seconds
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        query = self.query
+        query_job = None
+
+        try:
+            # the client calls are blocking HTTP requests; keep them off the loop
+            query_job = await asyncio.to_thread(
+                self.client.query, query, job_config=self._job_config(since)
+            )
+
+            while not await asyncio.to_thread(query_job.done):
+                if loop.time() >= deadline:
+                    await self._cancel(query_job)
+                    raise TimeoutError()
+                await asyncio.sleep(min(self.poll_interval_seconds, max(deadline - loop.time(), 0)))
+
+            result = await asyncio.to_thread(query_job.result)
+            record_query_job(self.query_name, query_job)
+            return self._metrics_from_result(result)
+
+        except asyncio.CancelledError:
+            if query_job is not None:
+                await asyncio.shield(self._cancel(query_job))
+            raise
+
+        except TimeoutError:
+            raise MetricsCollectionError("BigQuery metrics query timed out")
+
+        except Exception as exc:
+            logging.exception("Failed to collect BigQuery job metrics")
+            raise MetricsCollectionError(str(exc)) from exc
+
+    @staticmethod
+    async def _cancel(query_job) -> None:
+        try:
+            await asyncio.to_thread(query_job.cancel)
+        except Exception:
+            logging.warning(f"Could not cancel BigQuery job {getattr(query_job, 'job_id', '')}")
+
+
+def reservation_key(project_id: str, location: str, reservation_id: str) -> str:
+    """Key matching INFORMATION_SCHEMA.JOBS.reservation_id ("project:LOCATION.reservation")."""
+    return f"{project_id}:{location}.{reservation_id}".lower()
+
+
+class SlotUtilizationCollector(BigQueryJobMetricsCollector):
+    """
+    Actual slot usage of one reservation from INFORMATION_SCHEMA.JOBS_TIMELINE:
+    total slot-ms, average slots used over the window and the per-second peak.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        reservation_id: str,
+        sql_path: str = "queries/reservation_slot_utilization.sql",
+        timeout_seconds: int = 60,
+        client: Any = None,
+    ):
+        super().__init__(project_id, location, sql_path, timeout_seconds, client=client)
+        self.reservation_key = reservation_key(project_id, location, reservation_id)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], client: Any = None) -> Optional["SlotUtilizationCollector"]:
+        """Collector for the reservation's utilization_scale_down section, or None when it is off."""
+        utilization = config.get("utilization_scale_down", {})
+        if not utilization.get("enabled"):
+            return None
+        metadata = config["metadata"]
+        return cls(
+            project_id=metadata["project_id"],
+            location=metadata.get("location", "US"),
+            reservation_id=metadata["reservation_id"],
+            sql_path=utilization.get("sql_path", "queries/reservation_slot_utilization.sql"),
+            client=client,
+        )
+
+    @timed("collect_utilization")
+    def collect(self, since: datetime) -> Dict[str, Any]:
+        """
+        Collect slot usage of the reservation since the given timestamp.
+        """
+
+        query = self.query
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("since_ts", "TIMESTAMP", since),
+                bigquery.ScalarQueryParameter("reservation_id", "STRING", self.reservation_key),
+            ]
+        )
+
+        try:
+            query_job = self.client.query(
+                query,
+                job_config=job_config,
+            )
+
+            result = query_job.result(timeout=self.timeout_seconds)
+            record_query_job(self.query_name, query_job)
+
+            rows = list(result)
+            usage = dict(rows[0]) if rows else {}
+            missing = {"avg_slots_used", "peak_slots_used"} - usage.keys()
+            if missing:
+                raise MetricsCollectionError(f"Missing required utilization metrics: {missing}")
+
+            return usage
+
+        except TimeoutError:
+            raise MetricsCollectionError("BigQuery utilization query timed out")
+
+        except MetricsCollectionError:
+            raise
+
+        except Exception as exc:
+            logging.exception("Failed to collect BigQuery slot utilization")
+            raise MetricsCollectionError(str(exc)) from exc
+
+
+class ReservationGroupedMetricsCollector(BigQueryJobMetricsCollector):
+    """
+    Runs the jobs metrics query once for a whole region and returns one
+    metrics dict per reservation, keyed by reservation_key().
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        sql_path: str = "queries/jobs_sla_metrics_by_reservation.sql",
+        timeout_seconds: int = 60,
+        jobs_view: str = "JOBS",
+        client: Any = None,
+    ):
+        super().__init__(project_id, location, sql_path, timeout_seconds, client=client)
+        self.query_template = self.query_template.replace("{{ jobs_view }}", jobs_view)
+
+    @timed("collect")
+    def collect(self, since: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect aggregated job metrics per reservation since the given timestamp.
+        """
+
+        query = self.query
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    "since_ts", "TIMESTAMP", since
+                )
+            ]
+        )
+
+        try:
+            query_job = self.client.query(
+                query,
+                job_config=job_config,
+            )
+
+            result = query_job.result(timeout=self.timeout_seconds)
+            record_query_job(self.query_name, query_job)
+
+            grouped = {}
+            for row in result:
+                metrics = dict(row)
+                key = metrics.pop("reservation_id").lower()
+                self._validate_metrics(metrics)
+                grouped[key] = metrics
+
+            return grouped
+
+        except TimeoutError:
+            raise MetricsCollectionError("BigQuery metrics query timed out")
+
+        except MetricsCollectionError:
+            raise
+
+        except Exception as exc:
+            logging.exception("Failed to collect grouped BigQuery job metrics")
+            raise MetricsCollectionError(str(exc)) from exc
+
+
+class MultiRegionMetricsCollector:
+    """
+    Runs the grouped jobs query of every region concurrently, so a cycle
+    waits for the slowest region instead of the sum of all of them.
+
+    Each region is bounded by its collector's timeout_seconds. A region that
+    fails or misses its deadline gets a MetricsCollectionError in its entry
+    of the result and the other regions are unaffected. A query that missed
+    its deadline keeps its worker thread until BigQuery returns.
+    """
+
+    def __init__(self, collectors: Dict[Hashable, ReservationGroupedMetricsCollector]):
+        self.collectors = collectors
+        self._executor = ThreadPoolExecutor(max_workers=max(len(collectors), 1), thread_name_prefix="region")
+
+    def collect(
+        self, since: Dict[Hashable, datetime]
+    ) -> Dict[Hashable, Union[Dict[str, Dict[str, Any]], MetricsCollectionError]]:
+        """
+        Collect grouped metrics of each region in since, from that region's
+        window start. Returns the rows per reservation, or the error, per region.
+        """
+        started = time.monotonic()
+        futures = {
+            region: self._executor.submit(self.collectors[region].collect, region_since)
+            for region, region_since in since.items()
+        }
+
+        results: Dict[Hashable, Union[Dict[str, Dict[str, Any]], MetricsCollectionError]] = {}
+        for region, future in futures.items():
+            timeout_seconds = self.collectors[region].timeout_seconds
+            try:
+                results[region] = future.result(timeout=max(started + timeout_seconds - time.monotonic(), 0))
+            except TimeoutError:
+                logging.warning(f"Metrics query for region {region} did not finish within {timeout_seconds}s")
+                results[region] = MetricsCollectionError(f"Metrics query for region {region} timed out")
+            except MetricsCollectionError as exc:
+                results[region] = exc
+            except Exception as exc:
+                logging.exception(f"Metrics query for region {region} failed")
+                results[region] = MetricsCollectionError(str(exc))
+        return results
+
+    def close(self) -> None:
+        # queries past their deadline are not waited for
+        self._executor.shutdown(wait=False)
+
+
+class PendingJobsProbe(BigQueryJobMetricsCollector):
+    """
+    Lightweight query run between full metrics cycles: the number of
+    pending jobs and how long the oldest one has been waiting.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        location: str,
+        sql_path: str = "queries/pending_jobs_probe.sql",
+        timeout_seconds: int = 30,
+        client: Any = None,
+    ):
+        super().__init__(project_id, location, sql_path, timeout_seconds, client=client)
+
+    @timed("probe")
+    def collect(self, since: datetime) -> Dict[str, Any]:
+        """
+        Collect pending job counts for jobs created since the given timestamp.
+        """
+
+        query = self.query
+
+        try:
+            query_job = self.client.query(
+                query,
+                job_config=self._job_config(since),
+            )
+
+            result = query_job.result(timeout=self.timeout_seconds)
+            record_query_job(self.query_name, query_job)
+
+            rows = list(result)
+            probe = dict(rows[0]) if rows else {}
+            return {
+                "count_job_pending": probe.get("count_job_pending") or 0,
+                "max_pending_time": probe.get("max_pending_time") or 0,
+            }
+
+        except TimeoutError:
+            raise MetricsCollectionError("BigQuery pending jobs probe timed out")
+
+        except Exception as exc:
+            logging.exception("Failed to run BigQuery pending jobs probe")
+            raise MetricsCollectionError(str(exc)) from exc
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.metrics import MetricsCollectionError, PendingJobsProbe
+
+
+class AdaptivePoller:
+    """
+    Decides when the serve loop runs a full decision cycle and when a cheap
+    pending-jobs probe is enough.
+
+    A full cycle runs at least every check_interval_seconds, and right away
+    when a probe sees pressure: at least pending_jobs jobs waiting, or one
+    job waiting longer than max_pending_seconds. The delay before the next
+    poll drops to min_interval_seconds after a breach or a pressured probe
+    and grows by backoff_factor after each healthy poll, never past the time
+    left until the next mandatory full cycle.
+    """
+
+    def __init__(
+        self,
+        probe: PendingJobsProbe,
+        check_interval_seconds: float,
+        min_interval_seconds: float = 30,
+        backoff_factor: float = 2.0,
+        pending_jobs: Optional[int] = None,
+        max_pending_seconds: Optional[float] = 60,
+    ):
+        self.probe_collector = probe
+        self.check_interval_seconds = check_interval_seconds
+        self.min_interval_seconds = min(min_interval_seconds, check_interval_seconds)
+        self.backoff_factor = backoff_factor
+        self.pending_jobs = pending_jobs
+        self.max_pending_seconds = max_pending_seconds
+
+        self.interval = self.min_interval_seconds
+        self._last_full_cycle: Optional[float] = None
+        self._pressure = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["AdaptivePoller"]:
+        """Build the poller from the optional "adaptive_polling" config section."""
+        polling = config.get("adaptive_polling")
+        if not polling or not polling.get("enabled", True):
+            return None
+
+        metadata = config["metadata"]
+        probe = PendingJobsProbe(
+            project_id=metadata["project_id"],
+            location=metadata.get("location", "US"),
+            sql_path=polling.get("sql_path", "queries/pending_jobs_probe.sql"),
+        )
+        # a job queued longer than the p99 threshold is already a breach in the making
+        default_max_pending = config.get("sla_thresholds", {}).get("queueing_time_p99", 60)
+        return cls(
+            probe,
+            check_interval_seconds=config.get("check_interval_minutes", 5) * 60,
+            min_interval_seconds=polling.get("min_interval_seconds", 30),
+            backoff_factor=polling.get("backoff_factor", 2.0),
+            pending_jobs=polling.get("pending_jobs"),
+            max_pending_seconds=polling.get("max_pending_seconds", default_max_pending),
+        )
+
+    def full_cycle_due(self, now: float) -> bool:
+        """Whether the poll at monotonic time now should be a full cycle."""
+        if self._last_full_cycle is None or self._pressure:
+            return True
+        return now - self._last_full_cycle >= self.check_interval_seconds
+
+    def record_cycle(self, started: float, breached: bool) -> None:
+        """Note a full cycle that started at monotonic time started."""
+        self._last_full_cycle = started
+        self._pressure = False
+        self._adjust(breached)
+
+    def probe(self, since: datetime) -> bool:
+        """Run the pending-jobs probe; returns True when it sees pressure."""
+        try:
+            pending = self.probe_collector.collect(since)
+        except MetricsCollectionError as e:
+            # keep the current interval; the full cycle is still bounded
+            logging.warning(f"Pending jobs probe failed: {e}")
+            return False
+
+        pressure = (
+            self.pending_jobs is not None and pending["count_job_pending"] >= self.pending_jobs
+        ) or (
+            self.max_pending_seconds is not None and pending["max_pending_time"] >= self.max_pending_seconds
+        )
+        if pressure:
+            logging.info(f"Pending jobs probe saw pressure: {pending}")
+        self._pressure = pressure
+        self._adjust(pressure)
+        return pressure
+
+    def _adjust(self, tighten: bool) -> None:
+        if tighten:
+            self.interval = self.min_interval_seconds
+        else:
+            self.interval = min(self.interval * self.backoff_factor, self.check_interval_seconds)
+
+    def next_delay(self, now: float) -> float:
+        """Seconds to wait before the next poll."""
+        if self._pressure or self._last_full_cycle is None:
+            return 0.0
+        until_full_cycle = self.check_interval_seconds - (now - self._last_full_cycle)
+        return max(0.0, min(self.interval, until_full_cycle))
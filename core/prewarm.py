@@ -0,0 +1,149 @@
+import logging
+import numpy as np
+import pendulum
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.reservation import round_up_slots
+from core.schedule import CompiledSchedule, slot_index
+
+WINDOW_MINUTES = 30
+
+
+def window_start(dt: pendulum.DateTime) -> pendulum.DateTime:
+    """Start of the 30-minute schedule window containing dt."""
+    return dt.replace(minute=dt.minute - dt.minute % WINDOW_MINUTES, second=0, microsecond=0)
+
+
+class LookAheadPlanner:
+    """
+    Moves max slots towards upcoming schedule windows before they start.
+
+    Each window has a warm level: its profile min, or the slots the
+    reservation typically needed in the first ramp_minutes of that weekday
+    window (the ramp_quantile of recent history), capped at the profile
+    max. Within lead_minutes of a window whose warm level is above
+    the current slots, the planner raises to it ahead of time. Within
+    release_minutes of a window with a lower profile max, a healthy
+    reservation is lowered to that window's warm level early. Outside
+    those lead times nothing changes, so baselines are not lifted.
+    """
+
+    def __init__(
+        self,
+        schedule: CompiledSchedule,
+        lead_minutes: float = 10,
+        release_minutes: float = 0,
+        ramp_minutes: float = 15,
+        ramp_quantile: float = 0.9,
+        history_days: float = 14,
+        refresh_minutes: float = 60,
+    ):
+        self.schedule = schedule
+        self.lead_minutes = lead_minutes
+        self.release_minutes = release_minutes
+        self.ramp_minutes = ramp_minutes
+        self.ramp_quantile = ramp_quantile
+        self.history_days = history_days
+        self.refresh_minutes = refresh_minutes
+        # (weekday, window index) -> learned warm level
+        self.ramps: Dict[Tuple[int, int], int] = {}
+        self._refreshed_at: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], schedule: CompiledSchedule) -> Optional["LookAheadPlanner"]:
+        """Build the planner from the optional "prewarm" config section."""
+        prewarm = config.get("prewarm")
+        if not prewarm or not prewarm.get("enabled", True):
+            return None
+        return cls(
+            schedule,
+            lead_minutes=prewarm.get("lead_minutes", 10),
+            release_minutes=prewarm.get("release_minutes", 0),
+            ramp_minutes=prewarm.get("ramp_minutes", 15),
+            ramp_quantile=prewarm.get("ramp_quantile", 0.9),
+            history_days=prewarm.get("history_days", 14),
+            refresh_minutes=prewarm.get("refresh_minutes", 60),
+        )
+
+    def warm_level(self, start: pendulum.DateTime) -> int:
+        """Max slots to hold going into the window starting at start."""
+        slot_config = self.schedule.resolve(start)
+        learned = self.ramps.get((start.weekday(), slot_index(start)), 0)
+        return min(max(slot_config["min"], learned), slot_config["max"])
+
+    def target(self, execution_time: pendulum.DateTime, current_slots: int, healthy: bool) -> Optional[int]:
+        """
+        Max slots to set ahead of the next windows, current_slots to hold a
+        pre-warmed level, or None when no window is within its lead time.
+        """
+        start = window_start(execution_time)
+        upcoming: List[pendulum.DateTime] = []
+        boundary = start.add(minutes=WINDOW_MINUTES)
+        while (boundary - execution_time).total_seconds() <= self.lead_minutes * 60:
+            upcoming.append(boundary)
+            boundary = boundary.add(minutes=WINDOW_MINUTES)
+
+        if upcoming:
+            level = max(self.warm_level(b) for b in upcoming)
+            if level > current_slots:
+                logging.info(f"Pre-warming max slots from {current_slots} to {level} ahead of {upcoming[0]}")
+                return level
+            if level == current_slots:
+                return current_slots
+
+        following = start.add(minutes=WINDOW_MINUTES)
+        if healthy and (following - execution_time).total_seconds() <= self.release_minutes * 60:
+            if self.schedule.resolve(following)["max"] < self.schedule.resolve(execution_time)["max"]:
+                level = self.warm_level(following)
+                if level < current_slots:
+                    logging.info(f"Releasing max slots from {current_slots} to {level} ahead of {following}")
+                    return level
+        return None
+
+    def learn(self, history: Dict[str, np.ndarray]) -> None:
+        """
+        Learn each weekday window's ramp from MetricsStore.range columns:
+        the ramp_quantile of the slots demanded during the window's first
+        ramp_minutes. Demand is what autoscaling allocated (used_slots) or,
+        on a breach, the slots the engine added for it. The max slots in
+        effect are not used: they include the planner's own pre-warming,
+        and learning from them would only ever ratchet the level up.
+        Downsampled rows are too coarse and are skipped.
+        """
+        breach_target = np.where(history["healthy"] == 0, history["target_slots"], np.nan)
+        slots = np.fmax(history["used_slots"], breach_target)
+        keep = (history["resolution"] == 0) & ~np.isnan(slots)
+
+        samples: Dict[Tuple[int, int], List[float]] = defaultdict(list)
+        for ts, value in zip(history["ts"][keep], slots[keep]):
+            dt = pendulum.from_timestamp(int(ts), tz=self.schedule.timezone)
+            if dt.minute % WINDOW_MINUTES < self.ramp_minutes:
+                samples[(dt.weekday(), slot_index(dt))].append(value)
+
+        self.ramps = {
+            key: round_up_slots(np.quantile(values, self.ramp_quantile))
+            for key, values in samples.items()
+        }
+
+    def adopt(self, previous: "LookAheadPlanner") -> None:
+        """
+        Take over the ramps learned by the planner this one replaces, and its
+        refresh time, so a config reload neither forgets them nor re-reads
+        the store early. Ramps are keyed by weekday window, so they hold
+        across schedule edits.
+        """
+        self.ramps = previous.ramps
+        self._refreshed_at = previous._refreshed_at
+
+    def refresh(self, store: Any, reservation_id: str, now: pendulum.DateTime) -> None:
+        """Re-learn ramps from the store at most every refresh_minutes."""
+        stamp = now.timestamp()
+        if self._refreshed_at is not None and stamp - self._refreshed_at < self.refresh_minutes * 60:
+            return
+        self._refreshed_at = stamp
+        try:
+            self.learn(store.range(reservation_id, stamp - self.history_days * 86400, stamp))
+        except Exception:
+            # fall back to the schedule alone rather than fail the cycle
+            logging.exception("Failed to learn pre-warm ramps from the metrics store")
@@ -0,0 +1,372 @@
+import argparse
+import json
+import logging
+import numpy as np
+import pendulum
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.cost import slot_hour_price as config_slot_hour_price
+from core.decision_engine import DecisionEngine
+from core.metrics import MetricsCollectionError
+from core.reservation import assert_max_slot_value
+from core.sla_policy import SLAPolicy
+
+# DecisionEngine.run looks back check_interval_minutes (default 5) at most
+MONITORING_LOOKBACK_SECONDS = 5 * 60
+# sentinel for start/end times that never happened in the export
+NOT_YET = np.iinfo(np.int64).max
+
+
+def load_jobs_export(path: str) -> Dict[str, np.ndarray]:
+    """Read an INFORMATION_SCHEMA.JOBS export (Parquet or CSV) into replay arrays."""
+    try:
+        import pandas as pd
+    except ImportError as exc:
+        raise ImportError("pandas (and pyarrow for Parquet) is required to load job exports") from exc
+
+    if str(path).endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+    return jobs_from_frame(frame)
+
+
+def _error_reason(value: Any) -> Optional[str]:
+    if value is None or value != value:  # None or NaN
+        return None
+    if isinstance(value, dict):
+        return value.get("reason")
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return value
+        return parsed.get("reason") if isinstance(parsed, dict) else value
+    return None
+
+
+def jobs_from_frame(frame) -> Dict[str, np.ndarray]:
+    """
+    Convert a JOBS export DataFrame into epoch-second arrays.
+
+    Rows are filtered like queries/jobs_sla_metrics.sql: script parent jobs
+    are dropped, and so are rows with a NULL statement_type because
+    `statement_type NOT IN (...)` is never true for NULL.
+    """
+    import pandas as pd
+
+    statement = frame["statement_type"]
+    keep = statement.notna() & ~statement.astype(str).str.upper().eq("SCRIPT")
+    frame = frame[keep]
+
+    def seconds(column: str) -> np.ndarray:
+        stamps = pd.to_datetime(frame[column], utc=True)
+        values = ((stamps - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+        out = np.full(len(values), NOT_YET, dtype=np.int64)
+        known = ~np.isnan(values)
+        out[known] = values[known].astype(np.int64)
+        return out
+
+    if "error_reason" in frame:
+        reasons = frame["error_reason"].map(_error_reason)
+    elif "error_result" in frame:
+        reasons = frame["error_result"].map(_error_reason)
+    else:
+        reasons = pd.Series([None] * len(frame), index=frame.index)
+
+    return {
+        "creation_time": seconds("creation_time"),
+        "start_time": seconds("start_time"),
+        "end_time": seconds("end_time"),
+        "has_error": reasons.notna().to_numpy(),
+        "stopped": reasons.eq("stopped").to_numpy(),
+    }
+
+
+def _group_stats(groups: np.ndarray, values: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    counts = np.bincount(groups, minlength=size)
+    totals = np.bincount(groups, weights=values, minlength=size)
+    squares = np.bincount(groups, weights=values * values, minlength=size)
+
+    minimum = np.full(size, np.inf)
+    maximum = np.full(size, -np.inf)
+    np.minimum.at(minimum, groups, values)
+    np.maximum.at(maximum, groups, values)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = totals / counts
+        # BigQuery STDDEV is the sample standard deviation; NULL below two rows
+        variance = (squares - totals * mean) / (counts - 1)
+    stddev = np.where(counts > 1, np.sqrt(np.clip(variance, 0, None)), np.nan)
+
+    empty = counts == 0
+    minimum[empty] = np.nan
+    maximum[empty] = np.nan
+    mean[empty] = np.nan
+    return {"count": counts, "min": minimum, "max": maximum, "avg": mean, "stddev": stddev}
+
+
+def _group_quantile(groups: np.ndarray, values: np.ndarray, size: int, q: float) -> np.ndarray:
+    """Nearest-rank quantile per group, the exact counterpart of APPROX_QUANTILES."""
+    order = np.lexsort((values, groups))
+    sorted_groups = groups[order]
+    sorted_values = values[order]
+
+    starts = np.searchsorted(sorted_groups, np.arange(size), side="left")
+    counts = np.bincount(groups, minlength=size)
+    out = np.full(size, np.nan)
+    has = counts > 0
+    rank = np.ceil(q * counts[has]).astype(np.int64) - 1
+    out[has] = sorted_values[starts[has] + np.clip(rank, 0, None)]
+    return out
+
+
+def aggregate_windows(
+    jobs: Dict[str, np.ndarray],
+    eval_times: np.ndarray,
+    lookback_seconds: int = MONITORING_LOOKBACK_SECONDS,
+) -> Dict[str, np.ndarray]:
+    """
+    Reproduce queries/jobs_sla_metrics.sql for every evaluation time at once.
+
+    For evaluation time t the query sees jobs created in [t - lookback, t],
+    with state, queueing and running time as of t. Each job is expanded to
+    the (usually single) windows that can see it, and all aggregates are
+    grouped reductions over those job/window pairs.
+    """
+    eval_times = np.asarray(eval_times, dtype=np.int64)
+    size = len(eval_times)
+    creation = np.asarray(jobs["creation_time"], dtype=np.int64)
+
+    first = np.searchsorted(eval_times, creation, side="left")
+    last = np.searchsorted(eval_times, creation + lookback_seconds, side="right")
+    spans = np.clip(last - first, 0, None)
+    total = int(spans.sum())
+
+    job_idx = np.repeat(np.arange(len(creation)), spans)
+    offsets = np.arange(total) - np.repeat(np.cumsum(spans) - spans, spans)
+    window = np.repeat(first, spans) + offsets
+
+    now = eval_times[window]
+    created = creation[job_idx]
+    start = jobs["start_time"][job_idx]
+    end = jobs["end_time"][job_idx]
+    has_error = np.asarray(jobs["has_error"], dtype=bool)[job_idx]
+    stopped = np.asarray(jobs["stopped"], dtype=bool)[job_idx]
+
+    started = start <= now
+    ended = end <= now
+    running = started & ~ended
+
+    metrics: Dict[str, np.ndarray] = {
+        "count_job_submitted": np.bincount(window, minlength=size),
+        "count_job_pending": np.bincount(window[~started], minlength=size),
+        "count_job_done": np.bincount(window[ended & ~has_error], minlength=size),
+        "count_job_running": np.bincount(window[running], minlength=size),
+        "count_job_error": np.bincount(window[ended & stopped], minlength=size),
+    }
+
+    queue_window = window[started]
+    queueing = (start[started] - created[started]).astype(np.float64)
+    stats = _group_stats(queue_window, queueing, size)
+    for name in ("min", "max", "avg", "stddev"):
+        metrics[f"{name}_queueing_time"] = stats[name]
+    metrics["queueing_time_p99"] = _group_quantile(queue_window, queueing, size, 0.99)
+
+    run_window = window[running]
+    running_time = (now[running] - start[running]).astype(np.float64)
+    stats = _group_stats(run_window, running_time, size)
+    for name in ("min", "max", "avg", "stddev"):
+        metrics[f"{name}_running_time"] = stats[name]
+
+    return metrics
+
+
+def window_metrics(metrics: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+    """One window as the metrics dict BigQueryJobMetricsCollector returns (NaN -> None)."""
+    row: Dict[str, Any] = {}
+    for name, values in metrics.items():
+        value = values[index].item()
+        row[name] = None if isinstance(value, float) and value != value else value
+    return row
+
+
+class ReplayMetricsCollector:
+    """Serves precomputed window metrics to DecisionEngine in place of BigQuery."""
+
+    def __init__(self, eval_times: np.ndarray, metrics: Dict[str, np.ndarray], lookback_seconds: int):
+        self.metrics = metrics
+        self.lookback_seconds = lookback_seconds
+        self._index = {int(t): i for i, t in enumerate(eval_times)}
+
+    def collect(self, since) -> Dict[str, Any]:
+        index = self._index.get(int(since.timestamp()) + self.lookback_seconds)
+        if index is None:
+            raise MetricsCollectionError(f"No replay window for {since}")
+        return window_metrics(self.metrics, index)
+
+
+class InMemoryReservationManager:
+    """ReservationManager stand-in that only tracks max slots and call counts."""
+
+    def __init__(self, initial_slots: int):
+        self.slots = initial_slots
+        self.reads = 0
+        self.writes = 0
+
+    def begin_cycle(self) -> None:
+        pass
+
+    def get_state(self) -> Dict[str, Any]:
+        self.reads += 1
+        return {"autoscale_max_slots": self.slots, "autoscale_current_slots": self.slots}
+
+    def get_current_slots(self) -> int:
+        return self.get_state()["autoscale_max_slots"]
+
+    def add_slots(self, increment: int) -> None:
+        self.set_slots(self.get_current_slots() + increment)
+
+    def set_slots(self, value: int) -> None:
+        value = assert_max_slot_value(value)
+        if value != self.slots:
+            self.writes += 1
+            self.slots = value
+
+
+@dataclass
+class ReplayReport:
+    windows: int
+    step_minutes: int
+    slot_hours: float
+    estimated_cost: float
+    sla_violation_minutes: int
+    reservation_updates: int
+    # windows breaching each SLA rule, from one columnar evaluation
+    violations_by_metric: Dict[str, int] = field(default_factory=dict)
+    times: List[str] = field(default_factory=list, repr=False)
+    slots: List[int] = field(default_factory=list, repr=False)
+    healthy: List[bool] = field(default_factory=list, repr=False)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "windows": self.windows,
+            "step_minutes": self.step_minutes,
+            "slot_hours": round(self.slot_hours, 3),
+            "estimated_cost": round(self.estimated_cost, 2),
+            "sla_violation_minutes": self.sla_violation_minutes,
+            "reservation_updates": self.reservation_updates,
+            "violations_by_metric": self.violations_by_metric,
+        }
+
+
+class ReplaySimulator:
+    """
+    Replay historical JOBS data through DecisionEngine and SLAPolicy.
+
+    Workload is taken as observed, so the replay scores the controller's
+    capacity decisions against real demand; it does not model how a
+    different slot ceiling would have changed queueing. Slot-hours are the
+    max_slots ceiling held over each step, i.e. an upper bound on billed
+    autoscale capacity.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        jobs: Dict[str, np.ndarray],
+        step_minutes: int = 5,
+        initial_slots: Optional[int] = None,
+        slot_hour_price: Optional[float] = None,
+    ):
+        self.config = config
+        self.jobs = jobs
+        self.step_minutes = step_minutes
+        self.initial_slots = initial_slots
+        self.slot_hour_price = slot_hour_price if slot_hour_price is not None else config_slot_hour_price(config)
+
+    def run(self, start: pendulum.DateTime, end: pendulum.DateTime) -> ReplayReport:
+        times = []
+        current = start
+        while current < end:
+            times.append(current)
+            current = current.add(minutes=self.step_minutes)
+        eval_times = np.array([int(t.timestamp()) for t in times], dtype=np.int64)
+
+        reservation = InMemoryReservationManager(self.initial_slots or 0)
+        # the jobs export has no slot usage, so utilization_scale_down stays off
+        engine = DecisionEngine(
+            self.config,
+            collector=ReplayMetricsCollector(eval_times, {}, 0),
+            reservation_mgr=reservation,
+        )
+        # every replayed cycle runs one step after the previous one, so all
+        # windows share the lookback the engine derives from the step
+        engine.previous_run_time = start.subtract(minutes=self.step_minutes)
+        lookback_seconds = int(engine.lookback(start).total_seconds())
+        metrics = aggregate_windows(self.jobs, eval_times, lookback_seconds)
+        engine.collector = ReplayMetricsCollector(eval_times, metrics, lookback_seconds)
+        if not self.initial_slots:
+            reservation.slots = engine.get_slot_config_for_time(start)["min"]
+
+        slots = np.empty(len(times), dtype=np.int64)
+        healthy = np.empty(len(times), dtype=bool)
+        for i, t in enumerate(times):
+            result = engine.run(t)
+            slots[i] = reservation.slots
+            healthy[i] = bool(result is not None and result.healthy)
+
+        slot_hours = float(slots.sum()) * self.step_minutes / 60
+        return ReplayReport(
+            windows=len(times),
+            step_minutes=self.step_minutes,
+            slot_hours=slot_hours,
+            estimated_cost=slot_hours * self.slot_hour_price,
+            sla_violation_minutes=int((~healthy).sum()) * self.step_minutes,
+            reservation_updates=reservation.writes,
+            violations_by_metric=SLAPolicy(self.config.get("sla_thresholds", {})).evaluate_batch(metrics).counts(),
+            times=[t.isoformat() for t in times],
+            slots=slots.tolist(),
+            healthy=healthy.tolist(),
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.replay",
+        description="Replay an INFORMATION_SCHEMA.JOBS export through the decision engine.",
+    )
+    parser.add_argument("--config", required=True, help="Reservation slot config to evaluate.")
+    parser.add_argument("--jobs", required=True, help="JOBS export (.parquet or .csv).")
+    parser.add_argument("--start", required=True, help="Replay start (ISO 8601).")
+    parser.add_argument("--end", required=True, help="Replay end (ISO 8601, exclusive).")
+    parser.add_argument("--step-minutes", type=int, default=5)
+    parser.add_argument("--slot-hour-price", type=float, default=None)
+    parser.add_argument("--timeline", action="store_true", help="Include the per-step timeline.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    with open(args.config) as f:
+        config = json.load(f)
+    tz = config.get("timezone", "Asia/Jakarta")
+
+    report = ReplaySimulator(
+        config,
+        load_jobs_export(args.jobs),
+        step_minutes=args.step_minutes,
+        slot_hour_price=args.slot_hour_price,
+    ).run(pendulum.parse(args.start, tz=tz), pendulum.parse(args.end, tz=tz))
+
+    output = report.summary()
+    if args.timeline:
+        output["timeline"] = [
+            {"time": t, "slots": s, "healthy": h}
+            for t, s, h in zip(report.times, report.slots, report.healthy)
+        ]
+    print(json.dumps(output, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
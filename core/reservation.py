@@ -1,9 +1,14 @@
 import pendulum
-import google.auth
-from google.cloud.bigquery_reservation_v1.services import reservation_service
-import google.cloud.bigquery_reservation_v1.types as reservation_types
-from google.protobuf import field_mask_pb2
-from google.api_core.exceptions import NotFound
+
+from core.instrumentation import RESERVATION_WRITES_SKIPPED, span
+from core.lazy import LazyModule
+
+# imported on first use; see core.lazy
+google_auth = LazyModule("google.auth")
+reservation_service = LazyModule("google.cloud.bigquery_reservation_v1.services.reservation_service")
+reservation_types = LazyModule("google.cloud.bigquery_reservation_v1.types")
+field_mask_pb2 = LazyModule("google.protobuf.field_mask_pb2")
+api_exceptions = LazyModule("google.api_core.exceptions")
 
 
 def assert_max_slot_value(value):
@@ -16,22 +21,47 @@ def assert_max_slot_value(value):
     return value
 
 
+def round_up_slots(value):
+    """Round a slot count up to the next valid max slot value (multiple of 50, at least 50)."""
+    return max(50, -(-int(value) // 50) * 50)
+
+
 class BigQuerySlotReservation:
     def __init__(self, **kwargs):
         if not 'project_id' in kwargs:
-            _, self.project_id = google.auth.default()
+            _, self.project_id = google_auth.default()
         else:
             self.project_id = kwargs['project_id']
-        self.client = reservation_service.ReservationServiceClient(transport='grpc')
+        # a shared client lets many reservations reuse one gRPC channel
+        self.client = kwargs.get('client') or self._default_client()
         self.reservation_name = self.client.reservation_path(self.project_id, kwargs['zone'], kwargs['reservation_id'])
+        # last Reservation message returned by get/update, reused within a cycle
+        self._cached = None
+
+    @staticmethod
+    def _default_client():
+        return reservation_service.ReservationServiceClient(transport='grpc')
 
     def create(self, **kwargs):  # POST
         raise NotImplementedError()
 
-    def get(self):  # GET
-        request = reservation_types.reservation.GetReservationRequest(name=self.reservation_name)
-        response = self.client.get_reservation(request)
-
+    def get(self, refresh: bool = False):  # GET
+        """
+        Return the reservation state, reusing the last read or write response
+        unless refresh is True or the cache has been invalidated.
+        """
+        if self._cached is None or refresh:
+            request = reservation_types.reservation.GetReservationRequest(name=self.reservation_name)
+            with span("get_reservation"):
+                self._cached = self.client.get_reservation(request)
+        return self._state(self._cached)
+
+    def invalidate(self):
+        """Drop the cached reservation so the next get() hits the API."""
+        self._cached = None
+
+    @staticmethod
+    def _state(response):
         out = {}
         out['reservation_name'] = response.name
         out['ignore_idle_slots'] = response.ignore_idle_slots
@@ -39,6 +69,16 @@ class BigQuerySlotReservation:
         out['autoscale_max_slots'] = response.autoscale.max_slots
         return out
 
+    def _is_unchanged(self, max_slots, ignore_idle_slots):
+        cached = self._cached
+        return (
+            cached is not None
+            and cached.autoscale.max_slots == max_slots
+            and cached.ignore_idle_slots == ignore_idle_slots
+            and cached.slot_capacity == 0
+            and cached.concurrency == 0
+        )
+
     def update(self, **kwargs):  # PUT
         # reservation has to be exist first
         """
@@ -47,33 +87,60 @@ class BigQuerySlotReservation:
         ignore_idle_slots: bool, default value is True
         max_autoscaling_slot: int, default value is 50
         concurrency: int, default value is 0
+
+        The write is skipped when the cached reservation already matches the
+        target. A missing reservation is reported by the update call itself
+        instead of a separate existence check.
         """
 
+        max_slots = assert_max_slot_value(kwargs['max_autoscaling_slot'])
+
+        if self._is_unchanged(max_slots, kwargs['ignore_idle_slots']):
+            return self._unchanged_response(max_slots)
+
+        request = self._update_request(max_slots, kwargs['ignore_idle_slots'])
+
         try:
-            self.client.get_reservation(name=self.reservation_name)
-        except NotFound:
-            return {
-                "status_code": 404,
-                "content": f"Reservation {self.reservation_name} not found"
-            }
+            with span("update_reservation"):
+                response = self.client.update_reservation(request=request)
+        except api_exceptions.NotFound:
+            return self._not_found_response()
+
+        return self._updated_response(response)
 
-        autoscale = reservation_types.Reservation.Autoscale(max_slots=assert_max_slot_value(kwargs['max_autoscaling_slot']))
+    def _update_request(self, max_slots, ignore_idle_slots):
+        autoscale = reservation_types.Reservation.Autoscale(max_slots=max_slots)
 
         field_mask = field_mask_pb2.FieldMask(paths=["slot_capacity", "ignore_idle_slots", "autoscale", "concurrency"])
 
         reservation_params = {
             'name': self.reservation_name,
             'slot_capacity': 0,
-            'ignore_idle_slots': kwargs['ignore_idle_slots'],
+            'ignore_idle_slots': ignore_idle_slots,
             'autoscale': autoscale,
             'concurrency': 0
         }
 
         reservation = reservation_types.Reservation(**reservation_params)
 
-        request = reservation_types.reservation.UpdateReservationRequest(reservation=reservation, update_mask=field_mask)
+        return reservation_types.reservation.UpdateReservationRequest(reservation=reservation, update_mask=field_mask)
+
+    def _unchanged_response(self, max_slots):
+        RESERVATION_WRITES_SKIPPED.inc()
+        return {
+            "status_code": 304,
+            "content": f"Reservation {self.reservation_name} already at {max_slots} max slots"
+        }
+
+    def _not_found_response(self):
+        self.invalidate()
+        return {
+            "status_code": 404,
+            "content": f"Reservation {self.reservation_name} not found"
+        }
 
-        response = self.client.update_reservation(request=request)
+    def _updated_response(self, response):
+        self._cached = response
 
         updated_time_utc7 = str(response.update_time.astimezone(pendulum.timezone('Asia/Jakarta')))
 
@@ -85,3 +152,38 @@ class BigQuerySlotReservation:
     def delete(self, **kwargs):
         raise NotImplementedError("Reservation deletion is prohibited.")
 
+
+
+class AsyncBigQuerySlotReservation(BigQuerySlotReservation):
+    """
+    asyncio variant of BigQuerySlotReservation on the grpc_asyncio transport.
+    Same caching and write-skipping behaviour; every call accepts a timeout
+    (seconds) used as the gRPC deadline.
+    """
+
+    @staticmethod
+    def _default_client():
+        return reservation_service.ReservationServiceAsyncClient(transport='grpc_asyncio')
+
+    async def get(self, refresh: bool = False, timeout=None):  # GET
+        if self._cached is None or refresh:
+            request = reservation_types.reservation.GetReservationRequest(name=self.reservation_name)
+            with span("get_reservation"):
+                self._cached = await self.client.get_reservation(request, timeout=timeout)
+        return self._state(self._cached)
+
+    async def update(self, timeout=None, **kwargs):  # PUT
+        max_slots = assert_max_slot_value(kwargs['max_autoscaling_slot'])
+
+        if self._is_unchanged(max_slots, kwargs['ignore_idle_slots']):
+            return self._unchanged_response(max_slots)
+
+        request = self._update_request(max_slots, kwargs['ignore_idle_slots'])
+
+        try:
+            with span("update_reservation"):
+                response = await self.client.update_reservation(request=request, timeout=timeout)
+        except api_exceptions.NotFound:
+            return self._not_found_response()
+
+        return self._updated_response(response)
@@ -0,0 +1,119 @@
+import logging
+import math
+from typing import Any, Dict
+
+from core.reservation import round_up_slots
+from core.sla_policy import SLAEvaluationResult
+
+
+def cap_slots(value: int, maximum: int) -> int:
+    """Cap at the profile max, kept on the multiple-of-50 grid of assert_max_slot_value."""
+    return min(value, maximum - maximum % 50)
+
+
+class ScalingStrategy:
+    """
+    Decides the max slots to request when the SLA is breached.
+    Strategies may keep state across cycles; reset() is called on every
+    healthy cycle.
+    """
+
+    def breach_target(
+        self,
+        current_slots: int,
+        slot_config: Dict[str, int],
+        result: SLAEvaluationResult,
+    ) -> int:
+        raise NotImplementedError()
+
+    def reset(self) -> None:
+        pass
+
+
+class FlatScalingStrategy(ScalingStrategy):
+    """Add a fixed number of slots per breached cycle (the original behaviour)."""
+
+    def __init__(self, adjustment: int = 50):
+        self.adjustment = adjustment
+
+    def breach_target(self, current_slots, slot_config, result) -> int:
+        return min(current_slots + self.adjustment, slot_config["max"])
+
+
+class PIDScalingStrategy(ScalingStrategy):
+    """
+    Size the step from how far the SLA is breached.
+
+    The error is the largest relative overshoot across violations
+    ((value - threshold) / threshold, so a 3x queueing p99 is 2.0). The PID
+    output is the number of profile increments to add, at least one. The
+    target is rounded up to a multiple of 50 and capped at the profile max.
+    The integral term is cleared on healthy cycles so it cannot wind up
+    across incidents.
+    """
+
+    def __init__(
+        self,
+        kp: float = 1.0,
+        ki: float = 0.25,
+        kd: float = 0.0,
+        max_step_increments: int = 10,
+        default_increment: int = 50,
+    ):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.max_step_increments = max_step_increments
+        self.default_increment = default_increment
+        self.reset()
+
+    def reset(self) -> None:
+        self._integral = 0.0
+        self._previous_error = None
+
+    @staticmethod
+    def breach_error(result: SLAEvaluationResult) -> float:
+        errors = [
+            (v.value - v.threshold) / v.threshold
+            for v in result.violations
+            if getattr(v, "threshold", None)
+        ]
+        # a breach with no measurable overshoot (e.g. missing metrics) counts as one step
+        return max(errors, default=1.0)
+
+    def breach_target(self, current_slots, slot_config, result) -> int:
+        error = self.breach_error(result)
+        self._integral += error
+        derivative = 0.0 if self._previous_error is None else error - self._previous_error
+        self._previous_error = error
+
+        output = self.kp * error + self.ki * self._integral + self.kd * derivative
+        increments = min(max(1, math.ceil(output)), self.max_step_increments)
+        increment = slot_config.get("increment") or self.default_increment
+
+        proposed = round_up_slots(current_slots + increments * increment)
+        target = cap_slots(proposed, slot_config["max"])
+        logging.info(
+            f"PID scaling: error={error:.2f} integral={self._integral:.2f} "
+            f"-> {increments} x {increment} slots, target {target}"
+        )
+        return target
+
+
+def build_scaling_strategy(config: Dict[str, Any]) -> ScalingStrategy:
+    """Build the strategy named in config["scaling"]["strategy"] (default: flat)."""
+    scaling = config.get("scaling", {})
+    name = scaling.get("strategy", "flat")
+    adjustment = config.get("default_adjustment_slots", 50)
+
+    if name == "flat":
+        return FlatScalingStrategy(adjustment)
+    if name == "pid":
+        return PIDScalingStrategy(
+            kp=scaling.get("kp", 1.0),
+            ki=scaling.get("ki", 0.25),
+            kd=scaling.get("kd", 0.0),
+            max_step_increments=scaling.get("max_step_increments", 10),
+            default_increment=adjustment,
+        )
+    raise ValueError(f"Unknown scaling strategy: {name!r}")
@@ -0,0 +1,203 @@
+import bisect
+import logging
+import numpy as np
+import pendulum
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+DAYS_PER_WEEK = 7
+SLOTS_PER_DAY = 48  # 30-minute windows
+PROFILE_FIELDS = ("min", "max", "increment")
+DEFAULT_SLOT_CONFIG = {"min": 1500, "max": 4000, "increment": 100}
+DEFAULT_PROFILE_NAME = "__default__"
+
+
+class ScheduleCompileError(ValueError):
+    pass
+
+
+def slot_index(dt) -> int:
+    """30-minute window index within the day (0..47)."""
+    return dt.hour * 2 + dt.minute // 30
+
+
+class CompiledSchedule:
+    """
+    reservation_time_mapping compiled into a dense weekday x 30-minute grid
+    of profile indices, plus a sorted interval index of calendar overrides.
+
+    Every profile reference is resolved and validated once, so looking up
+    the slot config for a datetime is two array reads and (only when
+    overrides exist) one bisect.
+    """
+
+    def __init__(
+        self,
+        slot_profiles: Dict[str, Dict[str, int]],
+        time_mapping: Dict[Any, Any],
+        overrides: Optional[List[Dict[str, Any]]] = None,
+        holidays: Optional[Dict[str, str]] = None,
+        default_profile: Optional[str] = None,
+        timezone: str = "Asia/Jakarta",
+    ):
+        self.timezone = timezone
+        self.profile_names: List[str] = []
+        self._profile_ids: Dict[str, int] = {}
+        rows: List[Tuple[int, int, int]] = []
+
+        for name, profile in slot_profiles.items():
+            rows.append(self._validate_profile(name, profile))
+            self._register(name)
+
+        if default_profile is not None:
+            if default_profile not in self._profile_ids:
+                raise ScheduleCompileError(f"Unknown default slot profile: {default_profile!r}")
+            fill = self._profile_ids[default_profile]
+        else:
+            rows.append(self._validate_profile(DEFAULT_PROFILE_NAME, DEFAULT_SLOT_CONFIG))
+            fill = self._register(DEFAULT_PROFILE_NAME)
+
+        grid = np.full((DAYS_PER_WEEK, SLOTS_PER_DAY), -1, dtype=np.int16)
+
+        for day_key, day_mapping in time_mapping.items():
+            day = self._parse_key(day_key, 0, DAYS_PER_WEEK - 1, "weekday")
+            for hour_key, hour_mapping in (day_mapping or {}).items():
+                hour = self._parse_key(hour_key, 0, 23, f"hour (weekday {day})")
+                for minute_key, entry in (hour_mapping or {}).items():
+                    minute = self._parse_key(minute_key, 0, 59, f"minute ({day}/{hour})")
+                    if minute not in (0, 30):
+                        raise ScheduleCompileError(
+                            f"Minute key must be 0 or 30, got {minute_key!r} at {day}/{hour}"
+                        )
+                    where = f"{day}/{hour}/{minute}"
+                    grid[day, hour * 2 + minute // 30] = self._resolve_entry(entry, where, rows)
+
+        gaps = np.argwhere(grid < 0)
+        self.gaps: List[Tuple[int, int, int]] = [
+            (int(day), int(slot) // 2, (int(slot) % 2) * 30) for day, slot in gaps
+        ]
+        if self.gaps and default_profile is None:
+            per_day = {day: int((grid[day] < 0).sum()) for day in range(DAYS_PER_WEEK)}
+            logging.warning(
+                f"reservation_time_mapping leaves {len(self.gaps)} of "
+                f"{DAYS_PER_WEEK * SLOTS_PER_DAY} windows unmapped (per weekday: {per_day}); "
+                f"they fall back to {DEFAULT_SLOT_CONFIG}"
+            )
+        grid[grid < 0] = fill
+
+        self.grid = grid
+        self.profile_table = np.array(rows, dtype=np.int64).reshape(-1, len(PROFILE_FIELDS))
+        self._profile_dicts = [dict(zip(PROFILE_FIELDS, map(int, row))) for row in self.profile_table]
+
+        self._compile_overrides(overrides or [], holidays or {})
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CompiledSchedule":
+        return cls(
+            slot_profiles=config.get("reservation_slot_profiles", {}),
+            time_mapping=config.get("reservation_time_mapping", {}),
+            overrides=config.get("reservation_calendar_overrides"),
+            holidays=config.get("reservation_holidays"),
+            default_profile=config.get("default_slot_profile"),
+            timezone=config.get("timezone", "Asia/Jakarta"),
+        )
+
+    def _register(self, name: str) -> int:
+        self._profile_ids[name] = len(self.profile_names)
+        self.profile_names.append(name)
+        return self._profile_ids[name]
+
+    @staticmethod
+    def _validate_profile(name: str, profile: Dict[str, int]) -> Tuple[int, int, int]:
+        missing = {"min", "max"} - set(profile)
+        if missing:
+            raise ScheduleCompileError(f"Slot profile {name!r} is missing {sorted(missing)}")
+        row = (int(profile["min"]), int(profile["max"]), int(profile.get("increment", 0)))
+        if row[0] > row[1]:
+            raise ScheduleCompileError(f"Slot profile {name!r} has min > max")
+        return row
+
+    @staticmethod
+    def _parse_key(key: Any, low: int, high: int, what: str) -> int:
+        try:
+            value = int(key)
+        except (TypeError, ValueError):
+            raise ScheduleCompileError(f"Invalid {what} key: {key!r}")
+        if not low <= value <= high:
+            raise ScheduleCompileError(f"{what} key out of range: {key!r}")
+        return value
+
+    def _resolve_entry(self, entry: Any, where: str, rows: List[Tuple[int, int, int]]) -> int:
+        if isinstance(entry, str):
+            if entry not in self._profile_ids or entry == DEFAULT_PROFILE_NAME:
+                raise ScheduleCompileError(f"Unknown slot profile {entry!r} at {where}")
+            return self._profile_ids[entry]
+        if isinstance(entry, Mapping):
+            # inline profile; identical inline dicts share one row
+            row = self._validate_profile(f"inline {where}", entry)
+            name = f"inline:{row[0]}-{row[1]}-{row[2]}"
+            if name not in self._profile_ids:
+                rows.append(row)
+                self._register(name)
+            return self._profile_ids[name]
+        raise ScheduleCompileError(f"Unsupported mapping entry at {where}: {entry!r}")
+
+    def _compile_overrides(self, overrides: List[Dict[str, Any]], holidays: Dict[str, str]) -> None:
+        intervals = []
+        for item in overrides:
+            start = pendulum.parse(str(item["start"]), tz=self.timezone)
+            end = pendulum.parse(str(item["end"]), tz=self.timezone)
+            if end <= start:
+                raise ScheduleCompileError(f"Override ends before it starts: {item}")
+            intervals.append((start.timestamp(), end.timestamp(), self._override_profile(item["profile"], item)))
+
+        for day, profile in holidays.items():
+            start = pendulum.parse(str(day), tz=self.timezone).start_of("day")
+            end = start.add(days=1)
+            intervals.append((start.timestamp(), end.timestamp(), self._override_profile(profile, day)))
+
+        intervals.sort()
+        for (_, prev_end, _), (start, _, _) in zip(intervals, intervals[1:]):
+            if start < prev_end:
+                raise ScheduleCompileError("Calendar overrides/holidays must not overlap")
+
+        self._override_starts = np.array([i[0] for i in intervals], dtype=np.float64)
+        self._override_ends = np.array([i[1] for i in intervals], dtype=np.float64)
+        self._override_profiles = np.array([i[2] for i in intervals], dtype=np.int16)
+        self._starts_list = self._override_starts.tolist()
+
+    def _override_profile(self, name: str, where: Any) -> int:
+        if name not in self._profile_ids or name == DEFAULT_PROFILE_NAME:
+            raise ScheduleCompileError(f"Unknown slot profile {name!r} in override {where}")
+        return self._profile_ids[name]
+
+    def resolve_index(self, dt) -> int:
+        """Profile index for a datetime; overrides take precedence over the weekly grid."""
+        if self._starts_list:
+            ts = dt.timestamp()
+            pos = bisect.bisect_right(self._starts_list, ts) - 1
+            if pos >= 0 and ts < self._override_ends[pos]:
+                return int(self._override_profiles[pos])
+        return int(self.grid[dt.weekday(), slot_index(dt)])
+
+    def resolve(self, dt) -> Dict[str, int]:
+        """Resolve slot config (min/max/increment) for a given datetime."""
+        return self._profile_dicts[self.resolve_index(dt)]
+
+    def resolve_many(self, times: Sequence[Any]) -> np.ndarray:
+        """Resolve many datetimes at once; returns an (N, 3) min/max/increment array."""
+        weekdays = np.fromiter((t.weekday() for t in times), dtype=np.int64, count=len(times))
+        slots = np.fromiter((slot_index(t) for t in times), dtype=np.int64, count=len(times))
+        indices = self.grid[weekdays, slots].astype(np.int64)
+
+        if len(self._override_starts):
+            stamps = np.fromiter((t.timestamp() for t in times), dtype=np.float64, count=len(times))
+            pos = np.searchsorted(self._override_starts, stamps, side="right") - 1
+            clipped = np.clip(pos, 0, None)
+            hit = (pos >= 0) & (stamps < self._override_ends[clipped])
+            indices[hit] = self._override_profiles[clipped[hit]]
+
+        return self.profile_table[indices]
+
+    def week_table(self) -> np.ndarray:
+        """Weekly baseline (no overrides) as a (7, 48, 3) min/max/increment array."""
+        return self.profile_table[self.grid]
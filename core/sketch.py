@@ -0,0 +1,64 @@
+import math
+from typing import Dict, Iterable, Optional
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch-style).
+
+    Values are counted in logarithmic buckets, so any quantile estimate is
+    within `relative_accuracy` of the true value. Two sketches built with
+    the same accuracy merge by adding bucket counts, which lets per-minute
+    sketches be combined into any window without keeping raw values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            # queueing/running times are never negative; clamp clock skew to 0
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"], relative_accuracy: float = 0.01) -> "QuantileSketch":
+        out = cls(relative_accuracy)
+        for sketch in sketches:
+            out.merge(sketch)
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Nearest-rank quantile estimate, or None for an empty sketch."""
+        if self.count == 0:
+            return None
+        rank = max(math.ceil(q * self.count) - 1, 0)
+
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # midpoint of (gamma^(key-1), gamma^key] in relative terms
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
@@ -1,31 +1,179 @@
 import logging
-from dataclasses import dataclass
-from typing import Dict, List
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+from core.instrumentation import timed
 
-@dataclass
+
+@dataclass(frozen=True)
+class SLARule:
+    """
+    One threshold rule. The measured value is the source metric, or its
+    percentage of count_job_submitted when percent_of_submitted is set;
+    NULL values (and absent ones, with allow_missing) count as 0.
+    Violated when value > threshold.
+    """
+    metric: str
+    source: str
+    message: str
+    percent_of_submitted: bool = False
+    required: bool = True
+    allow_missing: bool = False
+
+
+RULES: Tuple[SLARule, ...] = (
+    SLARule(
+        "pending_job_pct", "count_job_pending",
+        "Pending job percentage {value:.2f}% exceeds threshold", percent_of_submitted=True,
+    ),
+    SLARule("queueing_time_p99", "queueing_time_p99", "Queueing P99 {value:.2f}s exceeds threshold"),
+    SLARule(
+        "max_running_time", "max_running_time",
+        "Max runtime {value:.2f}s exceeds threshold", allow_missing=True,
+    ),
+    SLARule(
+        "error_job_pct", "count_job_error",
+        "Error rate {value:.2f}% exceeds threshold", percent_of_submitted=True, required=False,
+    ),
+)
+RULES_BY_METRIC: Dict[str, SLARule] = {rule.metric: rule for rule in RULES}
+# violation code bit of each rule, in RULES order
+RULE_BITS: Dict[str, int] = {rule.metric: 1 << i for i, rule in enumerate(RULES)}
+
+
+@dataclass(init=False)
 class SLAViolation:
     metric: str
     value: float
     threshold: float
-    message: str
+    # workload segment the violation was measured on, when segmented
+    segment: Optional[str] = None
+
+    def __init__(
+        self,
+        metric: str,
+        value: float,
+        threshold: float,
+        message: Optional[str] = None,
+        segment: Optional[str] = None,
+    ):
+        self.metric = metric
+        self.value = value
+        self.threshold = threshold
+        self.segment = segment
+        self._message = message
+
+    @property
+    def message(self) -> str:
+        """The given message, or the rule's, formatted on first access; evaluation never builds it."""
+        if self._message is None:
+            rule = RULES_BY_METRIC.get(self.metric)
+            template = rule.message if rule else "{metric} {value:.2f} exceeds threshold {threshold}"
+            self._message = template.format(metric=self.metric, value=self.value, threshold=self.threshold)
+            if self.segment is not None:
+                self._message = f"[{self.segment}] {self._message}"
+        return self._message
 
 
 @dataclass
 class SLAEvaluationResult:
     healthy: bool
     violations: List[SLAViolation]
+    # bitmask of violated rules (see RULE_BITS)
+    code: int = 0
+    # per-segment evaluations, when the metrics were segmented
+    segments: Dict[str, "SLAEvaluationResult"] = field(default_factory=dict)
+
+
+@dataclass
+class SLABatchResult:
+    """
+    Columnar evaluation of many metrics rows. healthy and codes have the
+    shape of the input columns; values holds each compiled rule's measured
+    value. Violation objects are only built on request.
+    """
+    healthy: np.ndarray
+    codes: np.ndarray
+    values: Dict[str, np.ndarray]
+    thresholds: Dict[str, float]
+
+    def violations(self, index) -> List[SLAViolation]:
+        code = int(self.codes[index])
+        return [
+            SLAViolation(metric, float(self.values[metric][index]), threshold)
+            for metric, threshold in self.thresholds.items()
+            if code & RULE_BITS[metric]
+        ]
+
+    def result(self, index) -> SLAEvaluationResult:
+        return SLAEvaluationResult(
+            healthy=bool(self.healthy[index]),
+            violations=self.violations(index),
+            code=int(self.codes[index]),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of violating rows per rule."""
+        return {metric: int(np.count_nonzero(self.codes & RULE_BITS[metric])) for metric in self.thresholds}
 
 
 class SLAPolicy:
     """
     Applies SLA rules to aggregated BigQuery job metrics.
     This class is intentionally agnostic of how metrics are collected.
+
+    The rules that have a threshold are compiled once. A required rule
+    without a threshold makes every non-empty evaluation unhealthy.
+
+    With segments, metrics carrying per-segment rows (see
+    BigQueryJobMetricsCollector segment_by) are evaluated segment by
+    segment: each configured segment with its own threshold overrides and
+    weight, unlisted ones with the shared thresholds and default_weight.
+    The SLA is breached once the weights of the breached segments add up to
+    breach_weight, so a weight-0 segment never adds capacity.
     """
 
-    def __init__(self, thresholds: Dict[str, float]):
+    def __init__(
+        self,
+        thresholds: Mapping[str, float],
+        segments: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        default_weight: float = 1.0,
+        breach_weight: float = 1.0,
+    ):
         self.thresholds = thresholds
+        self.rules: List[Tuple[SLARule, float]] = [
+            (rule, thresholds[rule.metric]) for rule in RULES if rule.metric in thresholds
+        ]
+        self.missing_thresholds = [rule.metric for rule in RULES if rule.required and rule.metric not in thresholds]
 
+        self.segmented = segments is not None
+        self.default_weight = default_weight
+        self.breach_weight = breach_weight
+        # segment -> (policy with the segment's thresholds, weight)
+        self.segment_policies: Dict[str, Tuple[SLAPolicy, float]] = {
+            name: (
+                SLAPolicy({**thresholds, **segment.get("sla_thresholds", {})}),
+                segment.get("weight", default_weight),
+            )
+            for name, segment in (segments or {}).items()
+        }
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "SLAPolicy":
+        """Build the policy from "sla_thresholds" and the optional "segmentation" section."""
+        thresholds = config.get("sla_thresholds", {})
+        segmentation = config.get("segmentation")
+        if not segmentation:
+            return cls(thresholds)
+        return cls(
+            thresholds,
+            segments=segmentation.get("segments", {}),
+            default_weight=segmentation.get("default_weight", 1.0),
+            breach_weight=segmentation.get("breach_weight", 1.0),
+        )
+
+    @timed("evaluate")
     def evaluate(self, metrics: Dict) -> SLAEvaluationResult:
         """
         Expected metrics keys:
@@ -34,71 +182,95 @@ class SLAPolicy:
           - count_job_error
           - queueing_time_p99
           - max_running_time
+          - segments (optional): segment -> metrics with the keys above
         """
+        if self.segmented and metrics and "segments" in metrics:
+            return self._evaluate_segments(metrics["segments"])
+        return self._evaluate(metrics)
+
+    def _evaluate_segments(self, segments: Mapping[str, Dict]) -> SLAEvaluationResult:
+        results: Dict[str, SLAEvaluationResult] = {}
+        violations: List[SLAViolation] = []
+        code = 0
+        breached_weight = 0.0
 
+        for name, metrics in segments.items():
+            policy, weight = self.segment_policies.get(name, (self, self.default_weight))
+            result = results[name] = policy._evaluate(metrics)
+            if result.healthy or weight <= 0:
+                continue
+            breached_weight += weight
+            code |= result.code
+            violations.extend(SLAViolation(v.metric, v.value, v.threshold, segment=name) for v in result.violations)
+
+        if breached_weight < self.breach_weight:
+            return SLAEvaluationResult(healthy=True, violations=[], segments=results)
+        return SLAEvaluationResult(healthy=False, violations=violations, code=code, segments=results)
+
+    def _evaluate(self, metrics: Dict) -> SLAEvaluationResult:
         if not metrics:
             # No workload = healthy system
             return SLAEvaluationResult(healthy=True, violations=[])
 
-        violations: List[SLAViolation] = []
-
         try:
             submitted = metrics["count_job_submitted"]
 
             if submitted == 0:
                 return SLAEvaluationResult(healthy=True, violations=[])
 
-            pending_pct = metrics["count_job_pending"] / submitted * 100
-            error_pct = metrics["count_job_error"] / submitted * 100
-            queueing_p99 = metrics["queueing_time_p99"]
-            max_runtime = metrics.get("max_running_time", 0) or 0
-
-            if pending_pct > self.thresholds["pending_job_pct"]:
-                violations.append(
-                    SLAViolation(
-                        metric="pending_job_pct",
-                        value=pending_pct,
-                        threshold=self.thresholds["pending_job_pct"],
-                        message=f"Pending job percentage {pending_pct:.2f}% exceeds threshold"
-                    )
-                )
-
-            if queueing_p99 > self.thresholds["queueing_time_p99"]:
-                violations.append(
-                    SLAViolation(
-                        metric="queueing_time_p99",
-                        value=queueing_p99,
-                        threshold=self.thresholds["queueing_time_p99"],
-                        message=f"Queueing P99 {queueing_p99:.2f}s exceeds threshold"
-                    )
-                )
-
-            if max_runtime > self.thresholds["max_running_time"]:
-                violations.append(
-                    SLAViolation(
-                        metric="max_running_time",
-                        value=max_runtime,
-                        threshold=self.thresholds["max_running_time"],
-                        message=f"Max runtime {max_runtime:.2f}s exceeds threshold"
-                    )
-                )
-
-            if "error_job_pct" in self.thresholds and error_pct > self.thresholds["error_job_pct"]:
-                violations.append(
-                    SLAViolation(
-                        metric="error_job_pct",
-                        value=error_pct,
-                        threshold=self.thresholds["error_job_pct"],
-                        message=f"Error rate {error_pct:.2f}% exceeds threshold"
-                    )
-                )
+            if self.missing_thresholds:
+                raise KeyError(self.missing_thresholds[0])
+
+            violations: List[SLAViolation] = []
+            code = 0
+            for rule, threshold in self.rules:
+                if rule.percent_of_submitted:
+                    value = metrics[rule.source] / submitted * 100
+                else:
+                    # NULL when e.g. no job in the window has started yet
+                    value = (metrics.get(rule.source) if rule.allow_missing else metrics[rule.source]) or 0
+                if value > threshold:
+                    violations.append(SLAViolation(rule.metric, value, threshold))
+                    code |= RULE_BITS[rule.metric]
 
             return SLAEvaluationResult(
                 healthy=len(violations) == 0,
-                violations=violations
+                violations=violations,
+                code=code,
             )
 
         except KeyError as e:
             logging.error(f"Missing required SLA metric: {e}")
             return SLAEvaluationResult(healthy=False, violations=[])
 
+    @timed("evaluate_batch")
+    def evaluate_batch(self, columns: Mapping[str, np.ndarray]) -> SLABatchResult:
+        """
+        Evaluate columnar metrics of any shape (e.g. reservations x windows)
+        with the same semantics as evaluate(): rows with no submitted jobs
+        (0 or NaN) are healthy, NULL values count as 0, and a missing
+        required column or threshold makes non-empty rows unhealthy.
+        """
+        submitted = np.asarray(columns["count_job_submitted"], dtype=np.float64)
+        empty = ~(submitted > 0)
+        codes = np.zeros(submitted.shape, dtype=np.uint8)
+        values: Dict[str, np.ndarray] = {}
+        complete = not self.missing_thresholds
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for rule, threshold in self.rules:
+                if rule.source in columns:
+                    value = np.nan_to_num(np.asarray(columns[rule.source], dtype=np.float64), nan=0.0)
+                elif rule.allow_missing:
+                    value = np.zeros(submitted.shape)
+                else:
+                    complete = False
+                    continue
+                if rule.percent_of_submitted:
+                    value = value / submitted * 100
+                values[rule.metric] = value
+                codes |= np.where((value > threshold) & ~empty, RULE_BITS[rule.metric], 0).astype(np.uint8)
+
+        healthy = empty | ((codes == 0) & complete)
+        thresholds = {rule.metric: threshold for rule, threshold in self.rules if rule.metric in values}
+        return SLABatchResult(healthy=healthy, codes=codes, values=values, thresholds=thresholds)
@@ -0,0 +1,84 @@
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from core.instrumentation import RESERVATION_WRITES_DEFERRED
+
+
+class Stabilizer:
+    """
+    Sits between the engine's slot decision and the reservation write.
+
+    A breach only counts once confirm_breaches of the last confirm_window
+    cycles breached. A write has to wait after the previous write for the
+    longer of min_dwell_seconds and the cooldown of its direction
+    (scale_up_cooldown_seconds or scale_down_cooldown_seconds); the two
+    are not added. Targets decided inside the wait are coalesced: the
+    latest one replaces earlier ones and is written once, when the wait is
+    over, unless it has become the current value by then.
+    """
+
+    def __init__(
+        self,
+        confirm_breaches: int = 1,
+        confirm_window: int = 1,
+        scale_up_cooldown_seconds: float = 0,
+        scale_down_cooldown_seconds: float = 0,
+        min_dwell_seconds: float = 0,
+    ):
+        self.confirm_breaches = confirm_breaches
+        self.scale_up_cooldown_seconds = scale_up_cooldown_seconds
+        self.scale_down_cooldown_seconds = scale_down_cooldown_seconds
+        self.min_dwell_seconds = min_dwell_seconds
+        self._outcomes: Deque[bool] = deque(maxlen=max(confirm_window, confirm_breaches))
+        self._last_write_at: Optional[float] = None
+        self.pending: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["Stabilizer"]:
+        """Build the stabilizer from the optional "stabilization" config section."""
+        stabilization = config.get("stabilization")
+        if not stabilization or not stabilization.get("enabled", True):
+            return None
+        return cls(
+            confirm_breaches=stabilization.get("confirm_breaches", 1),
+            confirm_window=stabilization.get("confirm_window", stabilization.get("confirm_breaches", 1)),
+            scale_up_cooldown_seconds=stabilization.get("scale_up_cooldown_minutes", 0) * 60,
+            scale_down_cooldown_seconds=stabilization.get("scale_down_cooldown_minutes", 0) * 60,
+            min_dwell_seconds=stabilization.get("min_dwell_minutes", 0) * 60,
+        )
+
+    def record(self, breached: bool) -> bool:
+        """Record a cycle's SLA outcome; True when the breach is confirmed."""
+        self._outcomes.append(breached)
+        return breached and sum(self._outcomes) >= self.confirm_breaches
+
+    def wait_seconds(self, now: float, current_slots: int, target: int) -> float:
+        """How long a write from current_slots to target still has to wait."""
+        if self._last_write_at is None:
+            return 0.0
+        cooldown = self.scale_up_cooldown_seconds if target > current_slots else self.scale_down_cooldown_seconds
+        return max(0.0, self._last_write_at + max(self.min_dwell_seconds, cooldown) - now)
+
+    def filter(self, now: float, current_slots: int, target: Optional[int]) -> Optional[int]:
+        """
+        The write to issue now (None for no write) given this cycle's target.
+        now is in seconds, e.g. the execution time's timestamp.
+        """
+        if target is not None:
+            # the latest decision wins; one back at the current value cancels
+            self.pending = None if target == current_slots else target
+        if self.pending is None or self.pending == current_slots:
+            self.pending = None
+            return None
+
+        wait = self.wait_seconds(now, current_slots, self.pending)
+        if wait > 0:
+            if target is not None and target != current_slots:
+                RESERVATION_WRITES_DEFERRED.inc()
+                logging.info(f"Deferring max slots {current_slots} -> {self.pending} for {wait:.0f}s (cooldown)")
+            return None
+
+        write, self.pending = self.pending, None
+        self._last_write_at = now
+        return write
@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.decision_engine import CycleRecord
+
+RAW_RESOLUTION = 0
+
+# (column, SQLite type, aggregate used when raw rows are downsampled)
+COLUMNS = (
+    ("healthy", "INTEGER", "MIN"),  # a bucket is healthy only if every cycle was
+    ("violations", "TEXT", "GROUP_CONCAT"),
+    ("current_slots", "INTEGER", "CAST(ROUND(AVG({c})) AS INTEGER)"),
+    ("target_slots", "INTEGER", "MAX"),
+    # autoscale_current_slots at the cycle's reservation read: measured demand
+    ("used_slots", "INTEGER", "MAX"),
+    ("count_job_submitted", "INTEGER", "SUM"),
+    ("count_job_pending", "INTEGER", "SUM"),
+    ("count_job_error", "INTEGER", "SUM"),
+    ("queueing_time_p99", "REAL", "MAX"),
+    ("avg_queueing_time", "REAL", "AVG"),
+    ("max_running_time", "REAL", "MAX"),
+)
+COLUMN_NAMES = tuple(name for name, _, _ in COLUMNS)
+METRIC_COLUMNS = COLUMN_NAMES[5:]
+
+
+class MetricsStore:
+    """
+    Embedded SQLite store of per-cycle metrics and decisions.
+
+    Rows are clustered on (reservation_id, ts) in a WITHOUT ROWID table, so a
+    range read for one reservation is a single index range scan; reads come
+    back as NumPy columns. Raw cycles older than downsample_after_hours are
+    folded into hourly rows and everything older than retention_days is
+    deleted, which keeps disk use bounded.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = 30,
+        downsample_after_hours: float = 48,
+        downsample_seconds: int = 3600,
+        compact_every_seconds: float = 3600,
+    ):
+        self.path = path
+        self.retention_seconds = int(retention_days * 86400)
+        self.downsample_after_seconds = int(downsample_after_hours * 3600)
+        self.downsample_seconds = downsample_seconds
+        self.compact_every_seconds = compact_every_seconds
+        self._last_compaction = 0.0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ",\n".join(f"  {name} {kind}" for name, kind, _ in COLUMNS)
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS cycles (
+              reservation_id TEXT NOT NULL,
+              ts INTEGER NOT NULL,
+              resolution INTEGER NOT NULL,
+            {columns},
+              PRIMARY KEY (reservation_id, ts, resolution)
+            ) WITHOUT ROWID
+            """
+        )
+        # stores created before a column was added get it as NULLs
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(cycles)")}
+        for name, kind, _ in COLUMNS:
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE cycles ADD COLUMN {name} {kind}")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["MetricsStore"]:
+        """Build the store from the optional "metrics_store" config section."""
+        store_config = config.get("metrics_store")
+        if not store_config:
+            return None
+        return cls(
+            path=store_config["path"],
+            retention_days=store_config.get("retention_days", 30),
+            downsample_after_hours=store_config.get("downsample_after_hours", 48),
+        )
+
+    def append(self, reservation_id: str, record: CycleRecord, used_slots: Optional[int] = None) -> None:
+        metrics = record.metrics or {}
+        violations = None
+        if record.result is not None:
+            violations = ",".join(
+                v.metric if v.segment is None else f"{v.segment}/{v.metric}" for v in record.result.violations
+            ) or None
+        row = {
+            "healthy": None if record.result is None else int(record.result.healthy),
+            "violations": violations,
+            "current_slots": record.current_slots,
+            "target_slots": record.target_slots,
+            "used_slots": used_slots,
+            **{name: metrics.get(name) for name in METRIC_COLUMNS},
+        }
+        self.append_row(reservation_id, int(record.execution_time.timestamp()), **row)
+
+    def append_row(self, reservation_id: str, ts: int, **values: Any) -> None:
+        placeholders = ", ".join("?" for _ in range(len(COLUMN_NAMES) + 3))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO cycles (reservation_id, ts, resolution, {', '.join(COLUMN_NAMES)}) "
+                f"VALUES ({placeholders})",
+                (reservation_id, ts, RAW_RESOLUTION, *(values.get(name) for name in COLUMN_NAMES)),
+            )
+            self._conn.commit()
+
+        now = time.time()
+        if now - self._last_compaction >= self.compact_every_seconds:
+            self.compact(now)
+
+    def range(self, reservation_id: str, start: float, end: float) -> Dict[str, np.ndarray]:
+        """
+        Columns for one reservation with start <= ts < end, ordered by time.
+        Downsampled and raw rows are both returned; "resolution" tells them apart.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT ts, resolution, {', '.join(COLUMN_NAMES)} FROM cycles "
+                "WHERE reservation_id = ? AND ts >= ? AND ts < ? ORDER BY ts, resolution",
+                (reservation_id, int(start), int(end)),
+            ).fetchall()
+
+        names = ("ts", "resolution") + COLUMN_NAMES
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        out: Dict[str, np.ndarray] = {}
+        for name, values in zip(names, columns):
+            if name == "violations":
+                out[name] = np.array(values, dtype=object)
+            elif name in ("ts", "resolution"):
+                out[name] = np.array(values, dtype=np.int64)
+            else:
+                out[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        return out
+
+    def compact(self, now: Optional[float] = None) -> None:
+        """Downsample old raw rows and drop rows past retention."""
+        now = time.time() if now is None else now
+        cutoff = int(now - self.downsample_after_seconds)
+        # only whole buckets are folded so a bucket is never downsampled twice
+        cutoff -= cutoff % self.downsample_seconds
+        bucket = self.downsample_seconds
+
+        aggregates = ", ".join(
+            (agg.format(c=name) if "{c}" in agg else f"{agg}({name})") for name, _, agg in COLUMNS
+        )
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO cycles (reservation_id, ts, resolution, {', '.join(COLUMN_NAMES)}) "
+                f"SELECT reservation_id, ts - ts % {bucket}, {bucket}, {aggregates} "
+                "FROM cycles WHERE resolution = ? AND ts < ? "
+                f"GROUP BY reservation_id, ts - ts % {bucket}",
+                (RAW_RESOLUTION, cutoff),
+            )
+            self._conn.execute(
+                "DELETE FROM cycles WHERE resolution = ? AND ts < ?",
+                (RAW_RESOLUTION, cutoff),
+            )
+            self._conn.execute(
+                "DELETE FROM cycles WHERE ts < ?",
+                (int(now - self.retention_seconds),),
+            )
+            self._conn.commit()
+        self._last_compaction = now
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
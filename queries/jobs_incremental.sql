@@ -0,0 +1,20 @@
+DECLARE since_ts TIMESTAMP DEFAULT @since_ts;
+DECLARE watermark_ts TIMESTAMP DEFAULT @watermark_ts;
+
+-- job rows created in the monitoring window that changed after the watermark;
+-- the aggregation happens client-side in IncrementalJobMetricsCollector
+SELECT
+  job_id,
+  state,
+  creation_time,
+  start_time,
+  end_time,
+  error_result.reason AS error_reason
+FROM `region-{{ location }}`.INFORMATION_SCHEMA.JOBS
+WHERE creation_time >= since_ts
+  AND statement_type NOT IN ("SCRIPT", "script")
+  AND (
+    creation_time > watermark_ts
+    OR start_time > watermark_ts
+    OR end_time > watermark_ts
+  );
@@ -0,0 +1,17 @@
+DECLARE since_ts TIMESTAMP DEFAULT @since_ts;
+
+-- one row per job created in the monitoring window, read as Arrow record
+-- batches and aggregated client-side in JobLevelMetricsCollector; times are
+-- epoch milliseconds and -1 stands for NULL, so the numeric columns convert
+-- to NumPy without copying
+SELECT
+  CASE state WHEN 'PENDING' THEN 0 WHEN 'RUNNING' THEN 1 ELSE 2 END AS state_code,
+  IF(error_result IS NULL, 0, 1) AS has_error,
+  IF(error_result.reason = 'stopped', 1, 0) AS is_stopped,
+  UNIX_MILLIS(creation_time) AS creation_ms,
+  IFNULL(UNIX_MILLIS(start_time), -1) AS start_ms,
+  IFNULL(UNIX_MILLIS(end_time), -1) AS end_ms,
+  IFNULL(total_slot_ms, 0) AS total_slot_ms
+FROM `region-{{ location }}`.INFORMATION_SCHEMA.JOBS
+WHERE creation_time >= since_ts
+  AND statement_type NOT IN ("SCRIPT", "script");
@@ -0,0 +1,17 @@
+DECLARE since_ts TIMESTAMP DEFAULT @since_ts;
+
+-- queries/jobs_job_level.sql plus the reservation and labels of each job,
+-- for JobLevelMetricsCollector.iter_batches; collect() does not read them
+SELECT
+  CASE state WHEN 'PENDING' THEN 0 WHEN 'RUNNING' THEN 1 ELSE 2 END AS state_code,
+  IF(error_result IS NULL, 0, 1) AS has_error,
+  IF(error_result.reason = 'stopped', 1, 0) AS is_stopped,
+  UNIX_MILLIS(creation_time) AS creation_ms,
+  IFNULL(UNIX_MILLIS(start_time), -1) AS start_ms,
+  IFNULL(UNIX_MILLIS(end_time), -1) AS end_ms,
+  IFNULL(total_slot_ms, 0) AS total_slot_ms,
+  reservation_id,
+  labels
+FROM `region-{{ location }}`.INFORMATION_SCHEMA.JOBS
+WHERE creation_time >= since_ts
+  AND statement_type NOT IN ("SCRIPT", "script");
@@ -0,0 +1,11 @@
+DECLARE since_ts TIMESTAMP DEFAULT @since_ts;
+
+-- cheap between-cycle probe: only jobs still waiting for slots, no
+-- percentiles, so the scan stays small and the query returns one row
+SELECT
+  COUNT(*) AS count_job_pending,
+  MAX(TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), creation_time, SECOND)) AS max_pending_time
+FROM `region-{{ location }}`.INFORMATION_SCHEMA.JOBS
+WHERE creation_time >= since_ts
+  AND state = 'PENDING'
+  AND statement_type NOT IN ("SCRIPT", "script");
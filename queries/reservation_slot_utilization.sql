@@ -0,0 +1,23 @@
+DECLARE since_ts TIMESTAMP DEFAULT @since_ts;
+
+WITH per_second AS (
+  SELECT
+    period_start,
+    SUM(period_slot_ms) AS slot_ms
+  FROM `region-{{ location }}`.INFORMATION_SCHEMA.JOBS_TIMELINE
+  -- jobs created up to 6 hours earlier can still be consuming slots;
+  -- the bound keeps partition pruning on job_creation_time
+  WHERE job_creation_time >= TIMESTAMP_SUB(since_ts, INTERVAL 6 HOUR)
+    AND period_start >= since_ts
+    AND LOWER(reservation_id) = @reservation_id
+    -- script parents report their children's slots again
+    AND (statement_type IS NULL OR statement_type NOT IN ("SCRIPT", "script"))
+  GROUP BY period_start
+)
+
+SELECT
+  COALESCE(SUM(slot_ms), 0) AS total_slot_ms,
+  COALESCE(SUM(slot_ms), 0)
+    / 1000 / GREATEST(TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), since_ts, SECOND), 1) AS avg_slots_used,
+  COALESCE(MAX(slot_ms), 0) / 1000 AS peak_slots_used
+FROM per_second;
@@ -0,0 +1,132 @@
+import asyncio
+import importlib
+import json
+import sys
+import types
+
+import pendulum
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.metrics import MetricsCollectionError
+
+T0 = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta")
+HEALTHY = {
+    "count_job_submitted": 100,
+    "count_job_pending": 0,
+    "count_job_error": 0,
+    "queueing_time_p99": 1,
+    "max_running_time": 10,
+}
+
+
+def airflow_stubs():
+    """The slice of the Airflow API the adapter imports, for environments without Airflow."""
+    exceptions = types.ModuleType("airflow.exceptions")
+    exceptions.AirflowException = type("AirflowException", (Exception,), {})
+
+    models = types.ModuleType("airflow.models")
+
+    class BaseOperator:
+        def __init__(self, **kwargs):
+            self.task_id = kwargs.get("task_id")
+
+    models.BaseOperator = BaseOperator
+
+    base = types.ModuleType("airflow.triggers.base")
+
+    class BaseTrigger:
+        def __init__(self, **kwargs):
+            pass
+
+    class TriggerEvent:
+        def __init__(self, payload):
+            self.payload = payload
+
+    base.BaseTrigger, base.TriggerEvent = BaseTrigger, TriggerEvent
+    return {
+        "airflow": types.ModuleType("airflow"),
+        "airflow.exceptions": exceptions,
+        "airflow.models": models,
+        "airflow.triggers": types.ModuleType("airflow.triggers"),
+        "airflow.triggers.base": base,
+    }
+
+
+@pytest.fixture
+def deferrable(monkeypatch):
+    try:
+        import airflow  # noqa: F401
+    except ImportError:
+        for name, module in airflow_stubs().items():
+            monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "adapters.airflow_deferrable", raising=False)
+    return importlib.import_module("adapters.airflow_deferrable")
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "metadata": {"project_id": "p", "reservation_id": "etl", "location": "US"},
+        "reservation_slot_profiles": {"high": {"min": 1000, "max": 2000, "increment": 100}},
+        "default_slot_profile": "high",
+        "default_adjustment_slots": 100,
+        "sla_thresholds": {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600},
+    }))
+    return path
+
+
+def test_trigger_event_metrics(deferrable):
+    assert deferrable.TriggerEventMetrics({"status": "success", "metrics": HEALTHY}).collect(T0) == HEALTHY
+
+    with pytest.raises(MetricsCollectionError, match="timed out"):
+        deferrable.TriggerEventMetrics({"status": "error", "message": "timed out"}).collect(T0)
+
+
+@patch("core.decision_engine.ReservationManager")
+def test_event_drives_execute_complete(mock_manager_cls, deferrable, config_path):
+    mock_manager_cls.return_value.get_current_slots.return_value = 1500
+    operator = deferrable.SlotControlOperator(task_id="slots", config_path=str(config_path))
+
+    assert operator.execute_complete({"logical_date": T0}, {"status": "success", "metrics": HEALTHY}) is True
+    mock_manager_cls.return_value.set_slots.assert_not_called()
+
+    # a failed query takes the collection-failure path: one step up, within the profile max
+    assert operator.execute_complete({"logical_date": T0}, {"status": "error", "message": "boom"}) is None
+    mock_manager_cls.return_value.set_slots.assert_called_once_with(1600)
+
+
+def test_execute_defers_with_the_monitoring_window(deferrable, config_path):
+    operator = deferrable.SlotControlOperator(task_id="slots", config_path=str(config_path))
+    operator.defer = MagicMock()
+
+    operator.execute({"logical_date": T0})
+
+    deferred = operator.defer.call_args.kwargs
+    assert deferred["method_name"] == "execute_complete"
+    assert pendulum.parse(deferred["trigger"].since) == T0.subtract(minutes=5)
+
+
+def test_execute_rejects_unsupported_metrics_mode(deferrable, config_path):
+    config = json.loads(config_path.read_text())
+    config_path.write_text(json.dumps({**config, "metrics_mode": "incremental"}))
+    operator = deferrable.SlotControlOperator(task_id="slots", config_path=str(config_path))
+
+    with pytest.raises(Exception, match="metrics_mode 'incremental' is not supported"):
+        operator.execute({"logical_date": T0})
+
+
+@patch("core.metrics.bigquery.Client")
+def test_trigger_fires_one_event_with_the_metrics(mock_client, deferrable, config_path):
+    trigger = deferrable.SlotMetricsTrigger(str(config_path), T0.isoformat(), poll_interval_seconds=0)
+    query_job = MagicMock()
+    query_job.done.return_value = True
+    query_job.result.return_value.total_rows = 1
+    query_job.result.return_value.__iter__.return_value = iter([HEALTHY])
+    mock_client.return_value.query.return_value = query_job
+
+    async def events():
+        return [event.payload async for event in trigger.run()]
+
+    assert asyncio.run(events()) == [{"status": "success", "since": T0.isoformat(), "metrics": HEALTHY}]
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from benchmarks.run import DEFAULT_CONFIG_PATH, bench_cold_start, run_benchmarks
+
+
+def test_rpc_counts_per_decision_path():
+    results = run_benchmarks(iterations=3, import_runs=0)
+    paths = results["paths"]
+
+    assert paths["healthy"]["rpcs_per_cycle"] == {"bigquery.query": 1, "reservation.get": 1}
+    assert paths["breach"]["rpcs_per_cycle"] == {
+        "bigquery.query": 1,
+        "reservation.get": 1,
+        "reservation.update": 1,
+    }
+    assert paths["collection_failure"]["rpcs_per_cycle"] == paths["breach"]["rpcs_per_cycle"]
+    assert set(paths["healthy"]["engine_run"]) == {"p50_ms", "p99_ms", "mean_ms"}
+    assert "config_load" in results
+
+
+def test_controller_import_defers_google_clients():
+    code = (
+        "import sys, core.cli, core.controller, core.fleet, core.emulator; "
+        "print(sorted(m for m in ('google.cloud.bigquery', 'google.cloud.bigquery_reservation_v1') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+    assert out.strip() == "[]"
+
+
+def test_cold_start_reports_import_and_first_cycle():
+    results = bench_cold_start(DEFAULT_CONFIG_PATH, runs=1)
+
+    assert set(results) == {"import", "first_cycle", "total"}
+    assert results["total"]["p50_ms"] >= results["import"]["p50_ms"]
@@ -0,0 +1,223 @@
+import json
+import os
+
+import pendulum
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.config import ConfigError, ConfigLoader, freeze, validate_config
+from core.controller import SlotController
+from core.decision_engine import DecisionEngine
+from core.sla_policy import SLAEvaluationResult
+
+SHIPPED_CONFIG = "configs/reservation_slot_configs.json"
+
+
+@pytest.fixture
+def config():
+    return {
+        "metadata": {"project_id": "test-project", "reservation_id": "res-123", "location": "US"},
+        "check_interval_minutes": 5,
+        "reservation_slot_profiles": {"low": {"min": 100, "max": 200, "increment": 50}},
+        "default_slot_profile": "low",
+        "sla_thresholds": {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600},
+    }
+
+
+def write(path, config, mtime_ns=None):
+    path.write_text(json.dumps(config))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_shipped_config_is_valid():
+    with open(SHIPPED_CONFIG) as f:
+        validate_config(json.load(f))
+
+
+def test_validate_rejects_unknown_and_missing_thresholds(config):
+    config["sla_thresholds"] = {"count_job_pending_max": 50, "avg_queueing_time_max": 60}
+
+    with pytest.raises(ConfigError) as exc:
+        validate_config(config)
+
+    message = str(exc.value)
+    assert "Unknown SLA threshold 'count_job_pending_max'" in message
+    assert "Missing required SLA threshold 'queueing_time_p99'" in message
+
+
+def test_validate_reports_schedule_and_metadata_errors(config):
+    config["metadata"]["reservation_id"] = ""
+    config["reservation_time_mapping"] = {"0": {"8": {"0": "missing"}}}
+    config["default_adjustment_slots"] = 75
+
+    with pytest.raises(ConfigError) as exc:
+        validate_config(config)
+
+    message = str(exc.value)
+    assert "metadata.reservation_id" in message
+    assert "Unknown slot profile 'missing'" in message
+    assert "default_adjustment_slots" in message
+
+
+def test_validate_fleet_prefixes_reservation_errors(config):
+    fleet = {
+        **{k: v for k, v in config.items() if k != "metadata"},
+        "reservations": [
+            {"metadata": config["metadata"]},
+            {"metadata": {"project_id": "p", "reservation_id": "r"}, "sla_thresholds": {"bogus": 1}},
+        ],
+    }
+
+    with pytest.raises(ConfigError, match=r"reservations\[1\]: Unknown SLA threshold 'bogus'"):
+        validate_config(fleet)
+
+    fleet["reservations"].pop()
+    fleet["fleet"] = {"region_timeouts": {"US": 0}}
+    with pytest.raises(ConfigError, match=r"fleet.region_timeouts.US must be a positive number"):
+        validate_config(fleet)
+
+
+def test_snapshot_is_read_only(tmp_path, config):
+    path = tmp_path / "config.json"
+    write(path, config)
+
+    snapshot = ConfigLoader(str(path)).current
+
+    with pytest.raises(TypeError):
+        snapshot.config["sla_thresholds"]["pending_job_pct"] = 99
+    assert snapshot.config["sla_thresholds"]["pending_job_pct"] == 20
+
+
+def test_engine_runs_on_frozen_config(config):
+    config["reservation_time_mapping"] = {"0": {"8": {"0": {"min": 300, "max": 400}}}}
+    engine = DecisionEngine(freeze(config), collector=MagicMock(), reservation_mgr=MagicMock())
+
+    assert engine.schedule.resolve(pendulum.datetime(2026, 1, 12, 8, 0, tz="Asia/Jakarta"))["min"] == 300
+
+
+def test_reload_only_when_file_changes(tmp_path, config):
+    path = tmp_path / "config.json"
+    write(path, config, mtime_ns=1_000_000_000)
+    loader = ConfigLoader(str(path))
+    first = loader.current
+
+    assert loader.reload_if_changed() is False
+
+    # touched, same bytes: re-hashed but not re-parsed
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    with patch.object(loader, "_parse") as parse:
+        assert loader.reload_if_changed() is False
+    parse.assert_not_called()
+
+    config["sla_thresholds"]["pending_job_pct"] = 35
+    write(path, config, mtime_ns=3_000_000_000)
+    assert loader.reload_if_changed() is True
+    assert loader.current is not first
+    assert loader.current.config["sla_thresholds"]["pending_job_pct"] == 35
+    assert loader.current.digest != first.digest
+
+
+def test_bad_edit_keeps_last_good_snapshot(tmp_path, config, caplog):
+    path = tmp_path / "config.json"
+    write(path, config, mtime_ns=1_000_000_000)
+    loader = ConfigLoader(str(path))
+    good = loader.current
+
+    path.write_text("{not json")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert loader.reload_if_changed() is False
+    assert loader.current is good
+    assert "not valid JSON" in loader.last_error
+
+    config["sla_thresholds"] = {"avg_queueing_time_max": 60}
+    write(path, config, mtime_ns=3_000_000_000)
+    assert loader.reload_if_changed() is False
+    assert loader.current is good
+    assert "Rejected config change" in caplog.text
+
+
+def test_mistyped_edit_is_rejected_not_raised(tmp_path, config):
+    path = tmp_path / "config.json"
+    write(path, config, mtime_ns=1_000_000_000)
+    loader = ConfigLoader(str(path))
+    good = loader.current
+
+    config["cost"] = {"edition": []}
+    write(path, config, mtime_ns=2_000_000_000)
+
+    assert loader.reload_if_changed() is False
+    assert loader.current is good
+    assert "could not be validated" in loader.last_error
+
+
+def test_from_file_rejects_invalid_config(tmp_path, config):
+    path = tmp_path / "config.json"
+    config["sla_thresholds"] = {}
+    write(path, config)
+
+    with pytest.raises(ConfigError):
+        SlotController.from_file(str(path))
+
+
+@patch("core.controller.DecisionEngine")
+def test_serve_applies_reloaded_config(mock_engine_cls, tmp_path, config):
+    path = tmp_path / "config.json"
+    write(path, config, mtime_ns=1_000_000_000)
+    controller = SlotController.from_file(str(path))
+    first_engine = controller.engine
+    first_engine.previous_run_time = "last-run"
+    mock_engine_cls.side_effect = lambda cfg: MagicMock(previous_run_time=None)
+
+    config["sla_thresholds"]["queueing_time_p99"] = 120
+    write(path, config, mtime_ns=2_000_000_000)
+    controller.serve(interval_seconds=0, max_cycles=2)
+
+    assert controller.engine is not first_engine
+    assert controller.config["sla_thresholds"]["queueing_time_p99"] == 120
+    # the new engine continues from the old one's running state
+    controller.engine.carry_over.assert_called_once_with(first_engine)
+    assert controller.engine.run.call_count == 2
+
+
+@patch("core.decision_engine.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_reload_carries_engine_state_of_unchanged_sections(mock_client, mock_manager_cls, tmp_path, config):
+    breach = SLAEvaluationResult(healthy=False, violations=[])
+    path = tmp_path / "config.json"
+    config["stabilization"] = {"scale_up_cooldown_minutes": 10}
+    write(path, config, mtime_ns=1_000_000_000)
+    controller = SlotController.from_file(str(path))
+    now = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta")
+    assert controller.engine.decide(now, breach, 100) == 150
+    controller.engine.previous_run_time = now
+
+    config["sla_thresholds"]["queueing_time_p99"] = 120
+    write(path, config, mtime_ns=2_000_000_000)
+    assert controller.reload_config() is True
+
+    # still inside the cooldown of the write before the reload
+    assert controller.engine.previous_run_time == now
+    assert controller.engine.decide(now.add(minutes=5), breach, 150) is None
+
+    config["stabilization"] = {"scale_up_cooldown_minutes": 1}
+    write(path, config, mtime_ns=3_000_000_000)
+    assert controller.reload_config() is True
+
+    # a changed section starts fresh
+    assert controller.engine.decide(now.add(minutes=6), breach, 150) == 200
+
+
+def test_validate_segmentation(config):
+    config["segmentation"] = {
+        "by": "label:bad key",
+        "segments": {"etl": {"weight": -1, "sla_thresholds": {"queueing_p99": 30}}},
+    }
+
+    with pytest.raises(ConfigError) as exc:
+        validate_config(config)
+
+    message = str(exc.value)
+    assert "Unknown segmentation 'label:bad key'" in message
+    assert "segmentation.segments.etl.weight" in message
+    assert "Unknown SLA threshold 'queueing_p99' in segmentation.segments.etl" in message
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+
+import pendulum
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.controller import SlotController, seconds_to_next_tick
+from core.decision_engine import CycleRecord
+
+
+@pytest.fixture
+def mock_config():
+    return {
+        "metadata": {
+            "project_id": "test-project",
+            "reservation_id": "res-123",
+            "location": "asia-southeast2"
+        },
+        "check_interval_minutes": 5,
+    }
+
+
+@patch("core.controller.DecisionEngine")
+def test_serve_reuses_engine_across_cycles(mock_engine_cls, mock_config):
+    controller = SlotController(mock_config)
+
+    cycles = controller.serve(interval_seconds=0, max_cycles=3)
+
+    assert cycles == 3
+    mock_engine_cls.assert_called_once_with(mock_config)
+    assert mock_engine_cls.return_value.run.call_count == 3
+
+
+@patch("core.controller.DecisionEngine")
+def test_serve_survives_failed_cycle(mock_engine_cls, mock_config):
+    mock_engine_cls.return_value.run.side_effect = [RuntimeError("boom"), None]
+    controller = SlotController(mock_config)
+
+    cycles = controller.serve(interval_seconds=0, max_cycles=2)
+
+    assert cycles == 2
+
+
+@patch("core.controller.DecisionEngine")
+def test_serve_logs_overrun(mock_engine_cls, mock_config, caplog):
+    mock_engine_cls.return_value.run.side_effect = lambda *_: time.sleep(0.05)
+    controller = SlotController(mock_config)
+
+    with caplog.at_level(logging.WARNING):
+        controller.serve(interval_seconds=0.01, max_cycles=1)
+
+    assert "overran its interval" in caplog.text
+
+
+def test_serve_ticks_fall_on_wall_clock_multiples():
+    # 08:02:10 UTC -> next five-minute tick at 08:05:00
+    now = 1_768_204_930.0
+    assert seconds_to_next_tick(now, 300) == 170
+    assert seconds_to_next_tick(now + 170, 300) == 300
+    assert seconds_to_next_tick(now, 0) == 0
+
+
+@patch("core.controller.DecisionEngine")
+def test_stop_ends_serve_loop(mock_engine_cls, mock_config):
+    controller = SlotController(mock_config)
+    mock_engine_cls.return_value.run.side_effect = lambda *_: controller.stop()
+
+    thread = threading.Thread(target=controller.serve, kwargs={"interval_seconds": 60})
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    mock_engine_cls.return_value.run.assert_called_once()
+
+
+@patch("core.controller.DecisionEngine")
+def test_run_appends_cycle_to_metrics_store(mock_engine_cls, mock_config, tmp_path):
+    mock_config["metrics_store"] = {"path": str(tmp_path / "cycles.db")}
+    execution_time = pendulum.now("Asia/Jakarta").replace(microsecond=0)
+    mock_engine_cls.return_value.last_cycle = CycleRecord(execution_time, {}, None, 1000, None)
+    controller = SlotController(mock_config)
+
+    controller.run(execution_time)
+
+    cols = controller.store.range("res-123", execution_time.timestamp(), execution_time.add(minutes=1).timestamp())
+    assert cols["current_slots"].tolist() == [1000]
+
+
+@patch("core.controller.DecisionEngine")
+def test_reload_keeps_or_closes_the_metrics_store(mock_engine_cls, mock_config, tmp_path):
+    mock_config["metrics_store"] = {"path": str(tmp_path / "cycles.db")}
+    controller = SlotController(mock_config)
+    first = controller.store
+
+    controller._apply_config({**mock_config, "check_interval_minutes": 10})
+    assert controller.store is first
+
+    controller._apply_config({**mock_config, "metrics_store": {"path": str(tmp_path / "other.db")}})
+    assert controller.store is not first
+    with pytest.raises(Exception, match="closed"):
+        first.range("res-123", 0, 1)
+
+
+@patch("core.controller.AdaptivePoller")
+@patch("core.controller.DecisionEngine")
+def test_serve_adaptive_probes_between_full_cycles(mock_engine_cls, mock_poller_cls, mock_config):
+    poller = mock_poller_cls.from_config.return_value
+    poller.check_interval_seconds = 300
+    poller.full_cycle_due.side_effect = [True, False, False, True]
+    poller.next_delay.return_value = 0.0
+    mock_engine_cls.return_value.run.return_value = MagicMock(healthy=False)
+    controller = SlotController(mock_config)
+
+    cycles = controller.serve(max_cycles=2)
+
+    assert cycles == 2
+    assert poller.probe.call_count == 2
+    assert poller.record_cycle.call_args.kwargs == {"breached": True}
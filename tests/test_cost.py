@@ -0,0 +1,80 @@
+import json
+
+import pendulum
+import pytest
+from unittest.mock import patch
+
+from core.controller import SlotController
+from core.cost import COST_DOLLARS, CostAccountant, slot_hour_price
+from core.decision_engine import CycleRecord
+from core.instrumentation import REGISTRY
+
+T0 = pendulum.datetime(2026, 1, 12, 9, 0, tz="Asia/Jakarta")
+
+
+def test_slot_hour_price_prefers_explicit_price_over_edition():
+    assert slot_hour_price({}) == 0.06
+    assert slot_hour_price({"cost": {"edition": "standard"}}) == 0.04
+    assert slot_hour_price({"slot_hour_price": 0.05, "cost": {"edition": "standard"}}) == 0.05
+    assert slot_hour_price({"cost": {"edition": "enterprise_plus", "slot_hour_price": 0.08}}) == 0.08
+
+
+def test_accountant_charges_previous_levels_per_window():
+    cost = CostAccountant(slot_hour_price=0.06, max_gap_seconds=900)
+    ts = T0.timestamp()
+
+    cost.observe("etl", ts, current_slots=600, max_slots=1000, profile_max=2000)
+    cost.observe("etl", ts + 1800, current_slots=1000, max_slots=1500, profile_max=2000)  # gap: not charged
+    cost.observe("etl", ts + 2100, current_slots=0, max_slots=1500, profile_max=2000)
+    cost.observe("etl", ts + 2400, current_slots=0, max_slots=1500, profile_max=2000)
+
+    summary = cost.summary()
+    etl = summary["reservations"]["etl"]
+    # two 5-minute intervals: 1000 then 0 autoscaled slots, 1500 ceiling, 2000 profile max
+    assert etl["slot_hours"] == pytest.approx(1000 / 12, abs=1e-3)
+    assert etl["ceiling_slot_hours"] == pytest.approx(2 * 1500 / 12, abs=1e-3)
+    assert etl["counterfactual_slot_hours"] == pytest.approx(2 * 2000 / 12, abs=1e-3)
+    assert etl["cost"] == 5.0
+    assert etl["counterfactual_cost"] == 20.0
+    assert etl["savings_pct"] == 75.0
+    assert [w["window_start"] for w in summary["windows"]] == [int(ts + 1800)]
+
+
+def test_price_change_applies_to_later_intervals_only():
+    cost = CostAccountant(slot_hour_price=0.06)
+    ts = T0.timestamp()
+
+    cost.observe("etl", ts, current_slots=1200, max_slots=1200, profile_max=2400)
+    cost.observe("etl", ts + 300, current_slots=1200, max_slots=1200, profile_max=2400)
+    cost.slot_hour_price = 0.04
+    cost.observe("etl", ts + 600, current_slots=1200, max_slots=1200, profile_max=2400)
+
+    etl = cost.summary()["reservations"]["etl"]
+    # 100 slot-hours per interval, at 0.06 then 0.04
+    assert etl["cost"] == 10.0
+    assert etl["counterfactual_cost"] == 20.0
+    assert etl["savings_pct"] == 50.0
+
+
+@patch("core.controller.DecisionEngine")
+def test_controller_accounts_cycles_and_writes_report(mock_engine_cls, tmp_path):
+    report_path = tmp_path / "cost.json"
+    config = {
+        "metadata": {"project_id": "p", "reservation_id": "res-cost", "location": "US"},
+        "cost": {"edition": "standard", "report_path": str(report_path)},
+    }
+    engine = mock_engine_cls.return_value
+    engine.reservation_mgr.get_state.return_value = {"autoscale_current_slots": 300}
+    engine.get_slot_config_for_time.return_value = {"min": 500, "max": 2000, "increment": 100}
+    controller = SlotController(config)
+    dollars = COST_DOLLARS.get(reservation="res-cost", kind="counterfactual")
+
+    for minutes in (0, 5):
+        engine.last_cycle = CycleRecord(T0.add(minutes=minutes), {}, None, 1000, None)
+        controller.run(T0.add(minutes=minutes))
+
+    report = json.loads(report_path.read_text())
+    assert report["reservations"]["res-cost"]["slot_hours"] == 25.0
+    assert report["reservations"]["res-cost"]["ceiling_slot_hours"] == pytest.approx(83.333)
+    assert COST_DOLLARS.get(reservation="res-cost", kind="counterfactual") - dollars == pytest.approx(2000 / 12 * 0.04)
+    assert 'slot_controller_slot_hours_total{reservation="res-cost",kind="billed"} 25' in REGISTRY.render()
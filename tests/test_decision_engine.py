@@ -1,6 +1,15 @@
+import asyncio
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
-from core.decision_engine import DecisionEngine
+from core.decision_engine import AsyncDecisionEngine, DecisionEngine, metrics_query
+from core.instrumentation import CYCLES, MAX_SLOTS
+from core.metrics import MetricsCollectionError
+
+HEALTHY = {"count_job_submitted": 10, "count_job_pending": 0, "count_job_error": 0,
+           "queueing_time_p99": 0, "max_running_time": 0}
+
 
 @pytest.fixture
 def mock_config():
@@ -25,6 +34,15 @@ def mock_config():
         "default_adjustment_slots": 50
     }
 
+
+def fake_engine(config, metrics=None, slots=1000):
+    """DecisionEngine on a fake collector and reservation manager."""
+    reservation = MagicMock()
+    reservation.get_current_slots.return_value = slots
+    collector = MagicMock()
+    collector.collect.return_value = {} if metrics is None else metrics
+    return DecisionEngine(config, collector=collector, reservation_mgr=reservation)
+
 @patch("core.decision_engine.ReservationManager")
 def test_engine_increases_slot_on_sla_breach(mock_reservation_mgr, mock_config):
     # Mock reservation manager instance
@@ -97,3 +115,196 @@ def test_engine_no_change_on_healthy_sla_non_boundary(mock_reservation_mgr, mock
 
     mock_instance.set_slots.assert_not_called()
     mock_instance.add_slots.assert_not_called()
+
+
+class SlowAsyncCollector:
+    def __init__(self, metrics, delay):
+        self.metrics = metrics
+        self.delay = delay
+
+    async def collect(self, since):
+        await asyncio.sleep(self.delay)
+        if isinstance(self.metrics, Exception):
+            raise self.metrics
+        return self.metrics
+
+
+class SlowAsyncReservationManager:
+    def __init__(self, slots, delay):
+        self.slots = slots
+        self.delay = delay
+        self.set_calls = []
+
+    def begin_cycle(self):
+        pass
+
+    async def get_current_slots(self):
+        await asyncio.sleep(self.delay)
+        return self.slots
+
+    async def set_slots(self, value):
+        self.set_calls.append(value)
+
+
+def test_async_engine_overlaps_metrics_and_reservation_read(mock_config):
+    breach = {"count_job_submitted": 10, "count_job_pending": 10, "count_job_error": 0,
+              "queueing_time_p99": 0, "max_running_time": 0}
+    mock_config["sla_thresholds"] = {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420}
+    manager = SlowAsyncReservationManager(1000, delay=0.2)
+    engine = AsyncDecisionEngine(mock_config, collector=SlowAsyncCollector(breach, 0.2), reservation_mgr=manager)
+
+    started = time.monotonic()
+    result = asyncio.run(engine.run("2026-01-11T09:05:00"))
+    elapsed = time.monotonic() - started
+
+    assert result.healthy is False
+    assert manager.set_calls == [1050]
+    assert elapsed < 0.35
+
+
+def test_async_engine_collection_failure_reuses_concurrent_read(mock_config):
+    manager = SlowAsyncReservationManager(1000, delay=0)
+    engine = AsyncDecisionEngine(
+        mock_config,
+        collector=SlowAsyncCollector(MetricsCollectionError("boom"), 0),
+        reservation_mgr=manager,
+    )
+
+    assert asyncio.run(engine.run("2026-01-11T09:05:00")) is None
+    assert manager.set_calls == [1050]
+
+
+def test_async_engine_run_can_be_cancelled(mock_config):
+    manager = SlowAsyncReservationManager(1000, delay=5)
+    engine = AsyncDecisionEngine(mock_config, collector=SlowAsyncCollector({}, 5), reservation_mgr=manager)
+
+    async def run_with_deadline():
+        await asyncio.wait_for(engine.run("2026-01-11T09:05:00"), timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run_with_deadline())
+    assert manager.set_calls == []
+
+
+def healthy_reservation(slots):
+    reservation = MagicMock()
+    reservation.get_current_slots.return_value = slots
+    reservation.get_state.return_value = {"autoscale_max_slots": slots, "autoscale_current_slots": slots}
+    return reservation
+
+
+def test_engine_lowers_max_slots_when_utilization_stays_low(mock_config):
+    mock_config["sla_thresholds"] = {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420}
+    mock_config["utilization_scale_down"] = {"enabled": True, "low_utilization": 0.5, "headroom": 1.25, "consecutive_cycles": 2}
+    reservation = healthy_reservation(4000)
+    utilization = MagicMock()
+    utilization.collect.return_value = {"avg_slots_used": 1000, "peak_slots_used": 3000}
+
+    engine = DecisionEngine(
+        mock_config,
+        collector=MagicMock(**{"collect.return_value": dict(HEALTHY)}),
+        reservation_mgr=reservation,
+        utilization_collector=utilization,
+    )
+
+    engine.run("2026-01-12T09:05:00")  # Monday, "high" profile: min 3500
+    reservation.set_slots.assert_not_called()
+
+    engine.run("2026-01-12T09:10:00")
+    reservation.set_slots.assert_called_once_with(3750)
+
+
+def test_engine_keeps_slots_when_utilization_high(mock_config):
+    mock_config["sla_thresholds"] = {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420}
+    mock_config["utilization_scale_down"] = {"enabled": True, "consecutive_cycles": 1}
+    reservation = healthy_reservation(4000)
+    utilization = MagicMock()
+    utilization.collect.return_value = {"avg_slots_used": 3800, "peak_slots_used": 4000}
+
+    engine = DecisionEngine(
+        mock_config,
+        collector=MagicMock(**{"collect.return_value": dict(HEALTHY)}),
+        reservation_mgr=reservation,
+        utilization_collector=utilization,
+    )
+    engine.run("2026-01-12T09:05:00")
+
+    reservation.set_slots.assert_not_called()
+
+
+@patch("core.metrics.bigquery.Client")
+def test_engine_with_injected_collector_skips_live_utilization(mock_client, mock_config):
+    mock_config["sla_thresholds"] = {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420}
+    mock_config["utilization_scale_down"] = {"enabled": True, "consecutive_cycles": 1}
+
+    engine = DecisionEngine(mock_config, collector=MagicMock(), reservation_mgr=healthy_reservation(4000))
+
+    assert engine.utilization_collector is None
+    mock_client.assert_not_called()
+
+
+def test_engine_lookback_follows_cycle_spacing(mock_config):
+    engine = fake_engine(mock_config)
+
+    engine.run("2026-01-11T09:05:00")
+    engine.run("2026-01-11T09:05:30")
+    engine.run("2026-01-11T09:07:30")
+    engine.run("2026-01-11T09:30:00")
+
+    windows = [str(call.args[0]) for call in engine.collector.collect.call_args_list]
+    assert windows == [
+        "2026-01-11 09:00:00+00:00",  # first cycle: full check interval
+        "2026-01-11 09:04:30+00:00",  # floored at min_lookback_minutes
+        "2026-01-11 09:05:30+00:00",  # time since the previous cycle
+        "2026-01-11 09:25:00+00:00",  # capped at check_interval_minutes
+    ]
+
+
+def test_engine_resets_window_once_per_boundary_minute(mock_config):
+    engine = fake_engine(mock_config)
+
+    engine.run("2026-01-11T08:00:00")
+    engine.run("2026-01-11T08:00:30")
+
+    engine.reservation_mgr.set_slots.assert_called_once()
+
+
+def test_engine_resets_on_first_cycle_of_window_off_the_boundary(mock_config):
+    engine = fake_engine(mock_config)
+
+    # a daemon started at 08:02 never runs at :00 or :30
+    for minute in range(2, 30, 5):
+        engine.run(f"2026-01-11T08:{minute:02d}:00")
+    engine.reservation_mgr.set_slots.assert_not_called()
+
+    engine.run("2026-01-11T08:32:00")
+    engine.run("2026-01-11T08:37:00")
+
+    engine.reservation_mgr.set_slots.assert_called_once_with(1500)
+
+
+def test_engine_counts_cycle_outcomes(mock_config):
+    engine = fake_engine(mock_config)
+    before = CYCLES.get(reservation="res-123", outcome="healthy")
+
+    engine.run("2026-01-11T09:05:00")
+
+    assert CYCLES.get(reservation="res-123", outcome="healthy") == before + 1
+    assert MAX_SLOTS.get(reservation="res-123") == 1000
+
+
+def test_engine_adds_slots_only_for_weighted_segments(mock_config):
+    mock_config["sla_thresholds"] = {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420}
+    mock_config["segmentation"] = {"by": "user", "segments": {"adhoc@corp.com": {"weight": 0}}}
+    assert metrics_query(mock_config) == ("queries/jobs_sla_metrics_by_segment.sql", "user")
+
+    noisy = {
+        "count_job_submitted": 10, "count_job_pending": 9, "count_job_error": 0,
+        "queueing_time_p99": 900, "max_running_time": 60,
+    }
+    engine = fake_engine(mock_config, metrics={"segments": {"adhoc@corp.com": noisy}})
+
+    result = engine.run("2026-01-12T09:05:00")
+
+    assert result.healthy is True
+    engine.reservation_mgr.set_slots.assert_not_called()
@@ -0,0 +1,134 @@
+import pendulum
+import pytest
+from unittest.mock import MagicMock
+
+from core.config import ConfigError, validate_config
+from core.decision_engine import DecisionEngine
+from core.degraded import CLOSED, DEGRADED_DEFAULTS, HALF_OPEN, OPEN, CircuitBreaker, DegradedMode
+from core.metrics import MetricsCollectionError
+
+T0 = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta")
+HEALTHY = {
+    "count_job_submitted": 100,
+    "count_job_pending": 0,
+    "count_job_error": 0,
+    "queueing_time_p99": 1,
+    "max_running_time": 10,
+}
+BREACH = {**HEALTHY, "count_job_pending": 50}
+
+
+@pytest.fixture
+def config():
+    return {
+        "metadata": {"project_id": "p", "reservation_id": "etl", "location": "US"},
+        "reservation_slot_profiles": {"high": {"min": 1000, "max": 2000, "increment": 100}},
+        "default_slot_profile": "high",
+        "default_adjustment_slots": 100,
+        "sla_thresholds": {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600},
+    }
+
+
+def make_engine(config, slots):
+    manager = MagicMock()
+    manager.get_current_slots.return_value = slots
+
+    def set_slots(value):
+        manager.get_current_slots.return_value = value
+
+    manager.set_slots.side_effect = set_slots
+    return DecisionEngine(config, collector=MagicMock(), reservation_mgr=manager)
+
+
+def test_breaker_backs_off_and_recovers():
+    breaker = CircuitBreaker("etl", failure_threshold=2, backoff_seconds=300, max_backoff_seconds=500)
+
+    breaker.record_failure(0)
+    assert breaker.state == CLOSED
+    breaker.record_failure(60)
+    assert breaker.state == OPEN
+    assert breaker.allow(300) is False
+    assert breaker.allow(360) is True and breaker.state == HALF_OPEN
+
+    # failed trial: open again for twice as long, capped
+    breaker.record_failure(360)
+    assert breaker.allow(800) is False
+    assert breaker.allow(860) is True
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.current_backoff == 300
+
+
+def test_outage_without_degraded_mode_stops_at_profile_max(config):
+    engine = make_engine(config, 1850)
+    engine.collector.collect.side_effect = MetricsCollectionError("permission denied")
+
+    for i in range(4):
+        assert engine.run(T0.add(minutes=5 * i)) is None
+
+    assert [c.args[0] for c in engine.reservation_mgr.set_slots.call_args_list] == [1950, 2000]
+
+
+def test_stale_metrics_then_step_policy_with_open_circuit(config):
+    config["degraded_mode"] = {"failure_threshold": 2, "backoff_minutes": 30, "staleness_budget_minutes": 10}
+    engine = make_engine(config, 1000)
+    engine.collector.collect.side_effect = [HEALTHY, MetricsCollectionError("boom"), MetricsCollectionError("boom")]
+
+    assert engine.run(T0).healthy is True
+    # 09:10 and 09:15 fail but are decided on the 09:05 metrics: healthy, so nothing moves
+    assert engine.run(T0.add(minutes=5)).healthy is True
+    assert engine.run(T0.add(minutes=10)).healthy is True
+    assert engine.last_cycle.error == "boom"
+    # the circuit is open now and the last good metrics are past the budget
+    assert engine.run(T0.add(minutes=15)) is None
+    assert engine.last_cycle.error == "metrics query skipped: circuit breaker open"
+
+    assert engine.collector.collect.call_count == 3
+    engine.reservation_mgr.set_slots.assert_called_once_with(1100)
+
+
+def test_hold_policy_never_writes(config):
+    config["degraded_mode"] = {"policy": "hold", "staleness_budget_minutes": 0}
+    engine = make_engine(config, 1000)
+    engine.collector.collect.side_effect = MetricsCollectionError("boom")
+
+    for i in range(3):
+        engine.run(T0.add(minutes=5 * i))
+
+    engine.reservation_mgr.set_slots.assert_not_called()
+
+
+def test_last_known_good_survives_a_restart(config, tmp_path):
+    config["degraded_mode"] = {"state_path": str(tmp_path / "{reservation_id}.json")}
+    engine = make_engine(config, 1000)
+    engine.collector.collect.return_value = BREACH
+    engine.run(T0)
+
+    restarted = make_engine(config, 1100)
+    restarted.collector.collect.side_effect = MetricsCollectionError("boom")
+
+    assert (tmp_path / "etl.json").exists()
+    assert restarted.run(T0.add(minutes=5)).healthy is False
+    restarted.reservation_mgr.set_slots.assert_called_once_with(1200)
+
+
+def test_validate_degraded_mode(config):
+    config["degraded_mode"] = {"policy": "max", "failure_threshold": 0}
+
+    with pytest.raises(ConfigError) as exc:
+        validate_config(config)
+
+    assert "degraded_mode.policy" in str(exc.value)
+    assert "degraded_mode.failure_threshold" in str(exc.value)
+
+
+def test_omitted_keys_use_the_validated_defaults(config):
+    config["degraded_mode"] = {"state_path": None}
+    validate_config(config)
+
+    degraded = DegradedMode.from_config(config)
+
+    assert degraded.breaker.failure_threshold == DEGRADED_DEFAULTS["failure_threshold"]
+    assert degraded.breaker.backoff_seconds == DEGRADED_DEFAULTS["backoff_minutes"] * 60
+    assert degraded.breaker.max_backoff_seconds == DEGRADED_DEFAULTS["max_backoff_minutes"] * 60
+    assert degraded.staleness_budget_seconds == DEGRADED_DEFAULTS["staleness_budget_minutes"] * 60
+    assert degraded.policy == DEGRADED_DEFAULTS["policy"]
@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+
+import pendulum
+import pytest
+from google.api_core.exceptions import DeadlineExceeded, ResourceExhausted
+from unittest.mock import patch
+
+from core.emulator import (
+    DEFAULT_START,
+    EmulatedBigQueryClient,
+    EmulatedReservationService,
+    LatencyModel,
+    SyntheticWorkload,
+    WorkloadProfile,
+    main,
+    run_stress,
+)
+from core.metrics import BigQueryJobMetricsCollector, ReservationGroupedMetricsCollector, reservation_key
+from core.reservation import BigQuerySlotReservation
+
+KEY = reservation_key("p", "US", "r")
+
+
+def make_workload(max_slots=1500, **profile):
+    service = EmulatedReservationService()
+    service.add_reservation("p", "US", "r", max_slots)
+    workload = SyntheticWorkload(service, DEFAULT_START.timestamp(), seed=1)
+    workload.add_reservation(KEY, WorkloadProfile(**profile))
+    return service, workload
+
+
+def test_reservation_service_round_trip():
+    service, workload = make_workload()
+    reservation = BigQuerySlotReservation(project_id="p", zone="US", reservation_id="r", client=service)
+
+    assert reservation.get()["autoscale_max_slots"] == 1500
+    assert reservation.update(max_autoscaling_slot=2000, ignore_idle_slots=True)["status_code"] == 200
+    assert reservation.get(refresh=True)["autoscale_max_slots"] == 2000
+    assert service.calls == {"get": 2, "update": 1}
+
+
+def test_update_quota_is_enforced():
+    service = EmulatedReservationService(update_quota_per_minute=1)
+    service.add_reservation("p", "US", "r", 1500)
+    reservation = BigQuerySlotReservation(project_id="p", zone="US", reservation_id="r", client=service)
+
+    reservation.update(max_autoscaling_slot=2000, ignore_idle_slots=True)
+    with pytest.raises(ResourceExhausted):
+        reservation.update(max_autoscaling_slot=2500, ignore_idle_slots=True)
+    assert service.calls["update.quota_exceeded"] == 1
+
+
+def test_slow_call_raises_deadline_exceeded():
+    service = EmulatedReservationService(get_latency=LatencyModel(0.05))
+    name = service.add_reservation("p", "US", "r", 1500)
+
+    with pytest.raises(DeadlineExceeded):
+        service.get_reservation(request=SimpleNamespace(name=name), timeout=0.01)
+    assert service.calls["get.deadline_exceeded"] == 1
+
+
+def test_main_keeps_the_configs_own_thresholds(tmp_path):
+    with open("configs/reservation_slot_configs.json") as f:
+        config = json.load(f)
+    config["sla_thresholds"] = {"pending_job_pct": 35, "error_job_pct": 1}
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+
+    with patch("core.emulator.run_stress", return_value={}) as stress:
+        main(["--config", str(path)])
+
+    thresholds = stress.call_args.args[0]["sla_thresholds"]
+    assert thresholds == {"pending_job_pct": 35, "error_job_pct": 1, "queueing_time_p99": 60, "max_running_time": 3600}
+
+
+def test_jobs_queue_when_capacity_is_short():
+    _, workload = make_workload(max_slots=100, jobs_per_minute=20, burst_probability=0)
+    workload.advance_to(DEFAULT_START.timestamp() + 600)
+
+    metrics = workload.metrics(KEY, DEFAULT_START.timestamp() + 300)
+
+    assert metrics["count_job_pending"] > 0
+    assert workload.slots_in_use(KEY) <= max(100, max(j.slots for j in workload.queues[KEY].jobs))
+
+
+def test_emulated_client_serves_collectors():
+    _, workload = make_workload(jobs_per_minute=5, burst_probability=0)
+    workload.advance_to(DEFAULT_START.timestamp() + 600)
+    client = EmulatedBigQueryClient(workload)
+    since = pendulum.from_timestamp(DEFAULT_START.timestamp() + 300)
+
+    single = BigQueryJobMetricsCollector("p", "US", "queries/jobs_sla_metrics.sql", client=client).collect(since)
+    grouped = ReservationGroupedMetricsCollector("p", "US", client=client).collect(since)
+
+    assert single["count_job_submitted"] > 0
+    assert grouped[KEY] == single
+    assert client.calls == {"metrics": 1, "grouped": 1}
+
+
+def test_stress_run_summary():
+    with open("configs/reservation_slot_configs.json") as f:
+        config = json.load(f)
+    config["sla_thresholds"] = {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600}
+
+    summary = run_stress(config, reservations=3, ticks=2, profile=WorkloadProfile(jobs_per_minute=2))
+
+    assert sum(summary["cycles"].values()) == 6
+    assert summary["reservation_calls"]["get"] == 6
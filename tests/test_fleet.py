@@ -0,0 +1,276 @@
+import threading
+import time
+
+import pendulum
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.fleet import CYCLES_OVERRUN, FleetController, reservation_configs
+from core.metrics import reservation_key
+from core.store import MetricsStore
+
+
+def metrics_row(reservation_id, pending=0):
+    return {
+        "reservation_id": reservation_id,
+        "count_job_submitted": 100,
+        "count_job_pending": pending,
+        "count_job_error": 0,
+        "queueing_time_p99": 1,
+        "max_running_time": 10,
+    }
+
+
+@pytest.fixture
+def fleet_config():
+    return {
+        "fleet": {"max_workers": 4, "tick_seconds": 30},
+        "reservation_slot_profiles": {"low": {"min": 100, "max": 200, "increment": 50}},
+        "default_slot_profile": "low",
+        "sla_thresholds": {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420},
+        "reservations": [
+            {"metadata": {"project_id": "admin", "reservation_id": "etl", "location": "US"}},
+            {"metadata": {"project_id": "admin", "reservation_id": "adhoc", "location": "US"}},
+            {
+                "metadata": {"project_id": "admin", "reservation_id": "bi", "location": "asia-southeast2"},
+                "sla_thresholds": {"pending_job_pct": 50.0, "queueing_time_p99": 180, "max_running_time": 420},
+            },
+        ],
+    }
+
+
+def test_reservation_configs_merge_shared_defaults(fleet_config):
+    configs = reservation_configs(fleet_config)
+
+    assert len(configs) == 3
+    assert configs[0]["reservation_slot_profiles"] == fleet_config["reservation_slot_profiles"]
+    assert configs[2]["sla_thresholds"]["pending_job_pct"] == 50.0
+    assert "fleet" not in configs[0]
+
+
+@patch("core.fleet.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_fleet_queries_each_region_once(mock_bq_client, mock_manager_cls, fleet_config):
+    rows_by_location = {
+        "US": [metrics_row("admin:US.etl", pending=40), metrics_row("admin:US.adhoc")],
+        "asia-southeast2": [metrics_row("admin:asia-southeast2.bi", pending=40)],
+    }
+
+    def query(sql, job_config):
+        location = "asia-southeast2" if "region-asia-southeast2" in sql else "US"
+        job = MagicMock()
+        job.result.return_value = rows_by_location[location]
+        return job
+
+    mock_bq_client.return_value.query.side_effect = query
+    managers = {}
+
+    def make_manager(**kwargs):
+        manager = MagicMock()
+        manager.get_current_slots.return_value = 100
+        managers[kwargs["reservation_id"]] = manager
+        return manager
+
+    mock_manager_cls.side_effect = make_manager
+
+    controller = FleetController(fleet_config)
+    results = controller.run(pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta"))
+    controller.close()
+
+    assert mock_bq_client.return_value.query.call_count == 2
+    assert results[reservation_key("admin", "US", "etl")].healthy is False
+    assert results[reservation_key("admin", "US", "adhoc")].healthy is True
+    # 40% pending is within the bi reservation's own 50% threshold
+    assert results[reservation_key("admin", "asia-southeast2", "bi")].healthy is True
+    managers["etl"].set_slots.assert_called_once_with(150)
+    managers["adhoc"].set_slots.assert_not_called()
+
+
+@patch("core.fleet.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_fleet_region_failure_is_isolated(mock_bq_client, mock_manager_cls, fleet_config):
+    def query(sql, job_config):
+        if "region-US" in sql:
+            raise RuntimeError("access denied")
+        job = MagicMock()
+        job.result.return_value = [metrics_row("admin:asia-southeast2.bi")]
+        return job
+
+    mock_bq_client.return_value.query.side_effect = query
+    mock_manager_cls.return_value.get_current_slots.return_value = 100
+
+    controller = FleetController(fleet_config)
+    results = controller.run(pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta"))
+    controller.close()
+
+    assert results[reservation_key("admin", "US", "etl")] is None
+    assert results[reservation_key("admin", "asia-southeast2", "bi")].healthy is True
+
+
+@patch("core.fleet.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_fleet_queries_regions_concurrently(mock_bq_client, mock_manager_cls, fleet_config):
+    # each region's query only returns once the other one is in flight too
+    both_running = threading.Barrier(2, timeout=2)
+
+    def query(sql, job_config):
+        both_running.wait()
+        job = MagicMock()
+        job.result.return_value = [metrics_row("admin:US.etl"), metrics_row("admin:asia-southeast2.bi")]
+        return job
+
+    mock_bq_client.return_value.query.side_effect = query
+    mock_manager_cls.return_value.get_current_slots.return_value = 100
+
+    controller = FleetController(fleet_config)
+    results = controller.run(pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta"))
+    controller.close()
+
+    assert all(result is not None for result in results.values())
+    assert "region-US" in controller.regions[("admin", "US")].collector.query
+
+
+@patch("core.fleet.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_slow_region_only_degrades_its_own_reservations(mock_bq_client, mock_manager_cls, fleet_config):
+    fleet_config["fleet"]["region_timeouts"] = {"US": 0.2}
+    release = threading.Event()
+
+    def query(sql, job_config):
+        if "region-US" in sql:
+            release.wait(5)
+        job = MagicMock()
+        job.result.return_value = [metrics_row("admin:asia-southeast2.bi")]
+        return job
+
+    mock_bq_client.return_value.query.side_effect = query
+    mock_manager_cls.return_value.get_current_slots.return_value = 100
+
+    controller = FleetController(fleet_config)
+    started = time.monotonic()
+    results = controller.run(pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta"))
+    elapsed = time.monotonic() - started
+    release.set()
+    controller.close()
+
+    assert elapsed < 2
+    # the US reservations take the collection-failure path; bi is evaluated
+    assert results[reservation_key("admin", "US", "etl")] is None
+    assert results[reservation_key("admin", "US", "adhoc")] is None
+    assert results[reservation_key("admin", "asia-southeast2", "bi")].healthy is True
+
+
+@patch("core.fleet.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_open_region_circuit_skips_only_that_region(mock_bq_client, mock_manager_cls, fleet_config):
+    fleet_config["degraded_mode"] = {"failure_threshold": 1, "backoff_minutes": 30}
+    queried = []
+
+    def query(sql, job_config):
+        location = "US" if "region-US" in sql else "asia-southeast2"
+        queried.append(location)
+        if location == "US":
+            raise RuntimeError("access denied")
+        job = MagicMock()
+        job.result.return_value = [metrics_row("admin:asia-southeast2.bi")]
+        return job
+
+    mock_bq_client.return_value.query.side_effect = query
+    mock_manager_cls.return_value.get_current_slots.return_value = 100
+
+    controller = FleetController(fleet_config)
+    for minutes in (5, 10):
+        results = controller.run(pendulum.datetime(2026, 1, 12, 9, minutes, tz="Asia/Jakarta"))
+    controller.close()
+
+    assert sorted(queried) == ["US", "asia-southeast2", "asia-southeast2"]
+    assert results[reservation_key("admin", "US", "etl")] is None
+    assert results[reservation_key("admin", "asia-southeast2", "bi")].healthy is True
+
+
+@patch("core.fleet.ReservationManager")
+@patch("core.metrics.bigquery.Client")
+def test_overrunning_cycle_is_not_started_twice(mock_bq_client, mock_manager_cls, fleet_config, tmp_path):
+    fleet_config["fleet"]["tick_seconds"] = 0.2
+    fleet_config["metrics_store"] = {"path": str(tmp_path / "store.db")}
+    job = MagicMock()
+    job.result.return_value = [metrics_row("admin:US.etl"), metrics_row("admin:US.adhoc")]
+    mock_bq_client.return_value.query.return_value = job
+    release = threading.Event()
+
+    def make_manager(**kwargs):
+        manager = MagicMock()
+        manager.get_current_slots.return_value = 100
+        if kwargs["reservation_id"] == "etl":
+            manager.get_current_slots.side_effect = lambda: release.wait(5) and 100
+        return manager
+
+    mock_manager_cls.side_effect = make_manager
+    etl = reservation_key("admin", "US", "etl")
+    before = CYCLES_OVERRUN.get(reservation=etl)
+
+    controller = FleetController(fleet_config)
+    engine = controller.engines[etl]
+    first = controller.run(pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta"))
+    second = controller.run(pendulum.datetime(2026, 1, 12, 9, 10, tz="Asia/Jakarta"))
+    release.set()
+    controller.close()
+
+    assert first[etl] is None and second[etl] is None
+    assert second[reservation_key("admin", "US", "adhoc")].healthy is True
+    assert engine.reservation_mgr.get_current_slots.call_count == 1
+    assert CYCLES_OVERRUN.get(reservation=etl) == before + 1
+    # the late cycle is recorded once it finishes
+    ts = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta").timestamp()
+    rows = MetricsStore.from_config(fleet_config).range(etl, ts, ts + 1)
+    assert len(rows["ts"]) == 1
+
+
+@patch("core.fleet.ReservationManager")
+def test_fleet_utilization_collectors_share_its_bigquery_client(mock_manager_cls, fleet_config):
+    fleet_config["utilization_scale_down"] = {"enabled": True}
+    client = MagicMock()
+
+    fleet = FleetController(fleet_config, bigquery_client=client)
+
+    for engine in fleet.engines.values():
+        assert engine.utilization_collector.client is client
+    key = reservation_key("admin", "US", "etl")
+    assert fleet.engines[key].utilization_collector.reservation_key == key
+    fleet.close()
+
+
+@patch("core.fleet.ReservationManager")
+def test_reload_hands_over_in_flight_engine_state_once_reaped(mock_manager_cls, fleet_config):
+    fleet_config["fleet"]["tick_seconds"] = 0.2
+    client = MagicMock()
+    client.query.return_value.result.return_value = [metrics_row("admin:US.etl"), metrics_row("admin:US.adhoc")]
+    release = threading.Event()
+
+    def make_manager(**kwargs):
+        manager = MagicMock()
+        manager.get_current_slots.return_value = 100
+        if kwargs["reservation_id"] == "etl":
+            manager.get_current_slots.side_effect = lambda: release.wait(5) and 100
+        return manager
+
+    mock_manager_cls.side_effect = make_manager
+    etl = reservation_key("admin", "US", "etl")
+    now = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta")
+
+    controller = FleetController(fleet_config, bigquery_client=client)
+    late = controller.engines[etl]
+    controller.run(now)
+    controller._apply_config({**fleet_config, "check_interval_minutes": 10})
+    replacement = controller.engines[etl]
+    assert replacement.previous_run_time is None
+
+    release.set()
+    late_future = controller._in_flight[etl][0]
+    late_future.result(timeout=5)
+    controller._reap_in_flight()
+    controller.close()
+
+    assert replacement is not late
+    assert replacement.last_cycle is late.last_cycle is not None
+    assert replacement.previous_run_time == now
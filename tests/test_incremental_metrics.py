@@ -0,0 +1,154 @@
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.incremental_metrics import IncrementalJobMetricsCollector
+from core.metrics import MetricsCollectionError
+from core.sketch import QuantileSketch
+
+T0 = datetime(2026, 1, 12, 1, 0, tzinfo=timezone.utc)
+
+
+def job(job_id, state, created, started=None, ended=None, error_reason=None):
+    at = lambda s: None if s is None else T0 + timedelta(seconds=s)
+    return {
+        "job_id": job_id,
+        "state": state,
+        "creation_time": at(created),
+        "start_time": at(started),
+        "end_time": at(ended),
+        "error_reason": error_reason,
+    }
+
+
+def make_collector(tmp_path, batches, **kwargs):
+    with patch("core.metrics.bigquery.Client") as mock_client:
+        jobs = []
+        for rows in batches:
+            query_job = MagicMock()
+            query_job.result.return_value = rows
+            jobs.append(query_job)
+        mock_client.return_value.query.side_effect = jobs
+        return IncrementalJobMetricsCollector(
+            project_id="p",
+            location="US",
+            sql_path="queries/jobs_incremental.sql",
+            **kwargs,
+        )
+
+
+def test_sketch_quantile_within_relative_accuracy():
+    values = [random.Random(3).uniform(1, 1000) for _ in range(5000)]
+    sketch = QuantileSketch(0.01)
+    for v in values:
+        sketch.add(v)
+
+    exact = sorted(values)[math.ceil(0.99 * len(values)) - 1]
+    assert sketch.quantile(0.99) == pytest.approx(exact, rel=0.02)
+
+
+def test_sketches_merge_like_one_sketch():
+    a, b, whole = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for v in range(1, 200):
+        (a if v % 2 else b).add(v)
+        whole.add(v)
+
+    assert QuantileSketch.merged([a, b]).quantile(0.5) == whole.quantile(0.5)
+
+
+def test_collect_applies_only_changed_rows(tmp_path):
+    first = [
+        job("a", "PENDING", 10),
+        job("b", "RUNNING", 20, started=50),
+        job("c", "DONE", 30, started=35, ended=40, error_reason="stopped"),
+    ]
+    second = [
+        job("a", "RUNNING", 10, started=130),  # pending -> running
+        job("d", "PENDING", 140),
+    ]
+    collector = make_collector(tmp_path, [first, second])
+
+    m1 = collector.collect(T0)
+    m2 = collector.collect(T0)
+
+    assert (m1["count_job_submitted"], m1["count_job_pending"], m1["count_job_error"]) == (3, 1, 1)
+    assert m1["max_queueing_time"] == 30
+    assert m2["count_job_submitted"] == 4
+    assert m2["count_job_pending"] == 1
+    assert m2["count_job_running"] == 2
+    assert m2["max_queueing_time"] == 120
+    assert m2["queueing_time_p99"] == pytest.approx(120, rel=0.01)
+
+    second_params = collector.client.query.call_args_list[1].kwargs["job_config"].query_parameters
+    watermark = next(p for p in second_params if p.name == "watermark_ts").value
+    assert watermark == T0 + timedelta(seconds=50 - 60)
+
+
+def test_running_time_is_measured_at_the_window_end(tmp_path):
+    rows = [job("a", "RUNNING", 10, started=50)]
+    collector = make_collector(tmp_path, [rows, rows], lookback_seconds=300)
+
+    assert collector.collect(T0)["max_running_time"] == 250
+    assert collector.collect(T0, now=T0 + timedelta(seconds=120))["max_running_time"] == 70
+
+
+def test_window_evicts_old_buckets(tmp_path):
+    collector = make_collector(tmp_path, [[job("a", "PENDING", 10), job("b", "PENDING", 400)], []])
+
+    collector.collect(T0)
+    metrics = collector.collect(T0 + timedelta(minutes=5))
+
+    assert metrics["count_job_submitted"] == 1
+    assert "a" not in collector.jobs
+
+
+def test_state_persists_across_restarts(tmp_path):
+    state_path = tmp_path / "metrics_state.json"
+    make_collector(tmp_path, [[job("a", "DONE", 10, started=15, ended=20)]], state_path=str(state_path)).collect(T0)
+
+    restarted = make_collector(tmp_path, [[]], state_path=str(state_path))
+    metrics = restarted.collect(T0)
+
+    assert restarted.watermark == (T0 + timedelta(seconds=20)).timestamp()
+    assert metrics["count_job_done"] == 1
+    assert metrics["avg_queueing_time"] == 5
+
+
+def test_state_journal_appends_changed_rows_and_compacts(tmp_path):
+    state_path = tmp_path / "metrics_state.json"
+    batches = [
+        [job("a", "PENDING", 10), job("b", "PENDING", 11)],
+        # b comes back unchanged through the watermark overlap
+        [job("a", "RUNNING", 10, started=30), job("b", "PENDING", 11)],
+        [job("a", "DONE", 10, started=30, ended=40), job("b", "RUNNING", 11, started=35)],
+    ]
+    collector = make_collector(tmp_path, batches, state_path=str(state_path))
+
+    collector.collect(T0)
+    collector.collect(T0)
+    lines = [json.loads(line) for line in state_path.read_text().splitlines()]
+    assert [sorted(line["jobs"]) for line in lines] == [["a", "b"], ["a"]]
+
+    collector.collect(T0)
+    # five journal rows for two jobs: rewritten as one snapshot
+    lines = [json.loads(line) for line in state_path.read_text().splitlines()]
+    assert len(lines) == 1 and sorted(lines[0]["jobs"]) == ["a", "b"]
+
+    restarted = make_collector(tmp_path, [[]], state_path=str(state_path))
+    assert restarted.jobs == collector.jobs
+    assert restarted.watermark == collector.watermark
+
+
+def test_query_failure_keeps_watermark(tmp_path):
+    collector = make_collector(tmp_path, [[job("a", "PENDING", 10)]])
+    collector.collect(T0)
+    collector.client.query.side_effect = RuntimeError("permission denied")
+
+    with pytest.raises(MetricsCollectionError):
+        collector.collect(T0)
+
+    assert collector.watermark == (T0 + timedelta(seconds=10)).timestamp()
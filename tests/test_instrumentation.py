@@ -0,0 +1,84 @@
+import urllib.request
+
+import pytest
+from unittest.mock import MagicMock
+
+from core.controller import SlotController
+from core.instrumentation import (
+    QUERY_BYTES_PROCESSED,
+    QUERY_SLOT_MILLIS,
+    STAGE_ERRORS,
+    STAGE_SECONDS,
+    Registry,
+    record_query_job,
+    span,
+    start_http_server,
+)
+
+
+def test_render_openmetrics_text():
+    registry = Registry()
+    registry.counter("demo_queries", "Queries run.", ("query",)).inc(2, query="jobs")
+    registry.gauge("demo_slots", "Max slots.").set(1500)
+    registry.histogram("demo_seconds", "Latency.", buckets=(0.1, 1.0)).observe(0.5)
+
+    text = registry.render()
+
+    assert 'demo_queries_total{query="jobs"} 2' in text
+    assert "demo_slots 1500" in text
+    assert 'demo_seconds_bucket{le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{le="1"} 1' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in text
+    assert "demo_seconds_count 1" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_span_counts_failures():
+    before = STAGE_SECONDS.count(stage="test_stage"), STAGE_ERRORS.get(stage="test_stage")
+
+    with pytest.raises(RuntimeError):
+        with span("test_stage"):
+            raise RuntimeError("boom")
+
+    assert STAGE_SECONDS.count(stage="test_stage") == before[0] + 1
+    assert STAGE_ERRORS.get(stage="test_stage") == before[1] + 1
+
+
+def test_record_query_job_reads_job_statistics():
+    job = MagicMock(total_bytes_processed=1024, total_bytes_billed=10485760, slot_millis=250)
+    before = QUERY_BYTES_PROCESSED.get(query="probe_test"), QUERY_SLOT_MILLIS.get(query="probe_test")
+
+    record_query_job("probe_test", job)
+    # statistics missing on the job (e.g. a test double) are ignored
+    record_query_job("probe_test", MagicMock())
+
+    assert QUERY_BYTES_PROCESSED.get(query="probe_test") == before[0] + 1024
+    assert QUERY_SLOT_MILLIS.get(query="probe_test") == before[1] + 250
+
+
+def test_http_endpoint_serves_registry():
+    registry = Registry()
+    registry.counter("demo_cycles", "Cycles.").inc()
+    server = start_http_server(0, "127.0.0.1", registry=registry)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+
+    assert "demo_cycles_total 1" in body
+    assert content_type.startswith("application/openmetrics-text")
+
+
+def test_controller_writes_textfile_after_cycle(tmp_path):
+    path = tmp_path / "slot_controller.prom"
+    config = {
+        "metadata": {"project_id": "p", "reservation_id": "r", "location": "US"},
+        "instrumentation": {"textfile": str(path)},
+    }
+    controller = SlotController(config, engine=MagicMock(last_cycle=None))
+
+    controller.run()
+
+    assert path.read_text().endswith("# EOF\n")
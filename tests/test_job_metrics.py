@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from core.config import ConfigError, validate_config
+from core.job_metrics import DONE, PENDING, RUNNING, JobAggregate, JobLevelMetricsCollector
+
+NOW_MS = 1_768_200_000_000
+
+
+class FakeColumn:
+    def __init__(self, values):
+        self.values = values
+
+    def to_numpy(self, zero_copy_only=True):
+        return self.values
+
+
+class FakeRecordBatch:
+    """The slice of pyarrow.RecordBatch the collector uses."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def column(self, name):
+        return FakeColumn(self.columns[name])
+
+
+def job_columns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    creation = NOW_MS - rng.integers(120_000, 420_000, n)
+    queueing_ms = rng.integers(0, 120_000, n)
+    state = rng.choice([PENDING, RUNNING, DONE], n, p=[0.1, 0.3, 0.6])
+    start = np.where(state == PENDING, -1, creation + queueing_ms)
+    return {
+        "state_code": state,
+        "has_error": (rng.random(n) < 0.05).astype(np.int64),
+        "is_stopped": (rng.random(n) < 0.01).astype(np.int64),
+        "creation_ms": creation,
+        "start_ms": start,
+        "end_ms": np.where(state == DONE, start + 1000, -1),
+        "total_slot_ms": rng.integers(0, 10_000, n),
+    }
+
+
+def split(columns, at):
+    return [{k: v[:at] for k, v in columns.items()}, {k: v[at:] for k, v in columns.items()}]
+
+
+def test_aggregate_matches_exact_reference_across_batches():
+    columns = job_columns(5000)
+    aggregate = JobAggregate(max_queue_seconds=3600)
+    for batch in split(columns, 1234):
+        aggregate.add(batch, NOW_MS)
+    metrics = aggregate.metrics()
+
+    started = columns["start_ms"] >= 0
+    queueing = (columns["start_ms"][started] - columns["creation_ms"][started]) // 1000
+    running = columns["state_code"] == RUNNING
+    running_time = (NOW_MS - columns["start_ms"][running]) // 1000
+
+    assert metrics["count_job_submitted"] == 5000
+    assert metrics["count_job_pending"] == int((columns["state_code"] == PENDING).sum())
+    assert metrics["count_job_done"] == int(((columns["state_code"] == DONE) & (columns["has_error"] == 0)).sum())
+    assert metrics["queueing_time_p99"] == np.percentile(queueing, 99, method="inverted_cdf")
+    assert metrics["queueing_time_p50"] == np.percentile(queueing, 50, method="inverted_cdf")
+    assert metrics["stddev_queueing_time"] == pytest.approx(np.std(queueing, ddof=1))
+    assert metrics["max_running_time"] == running_time.max()
+    assert metrics["avg_running_time"] == pytest.approx(running_time.mean())
+    assert metrics["total_slot_ms"] == int(columns["total_slot_ms"].sum())
+
+
+def test_waits_past_the_histogram_cap_report_as_the_cap():
+    aggregate = JobAggregate(max_queue_seconds=60)
+    columns = {
+        "state_code": np.array([DONE, DONE]),
+        "has_error": np.zeros(2, dtype=np.int64),
+        "is_stopped": np.zeros(2, dtype=np.int64),
+        "creation_ms": np.array([0, 0]),
+        "start_ms": np.array([5_000, 600_000]),
+        "end_ms": np.array([6_000, 601_000]),
+        "total_slot_ms": np.zeros(2, dtype=np.int64),
+    }
+    aggregate.add(columns, NOW_MS)
+
+    metrics = aggregate.metrics()
+    assert metrics["queueing_time_p99"] == 60
+    assert metrics["max_queueing_time"] == 600
+    assert metrics["min_running_time"] is None
+
+
+def test_collector_streams_arrow_batches_into_metrics_dict():
+    columns = job_columns(200, seed=1)
+    job = MagicMock()
+    job.started = datetime.fromtimestamp(NOW_MS / 1000, tz=timezone.utc)
+    job.result.return_value.to_arrow_iterable.return_value = iter(
+        FakeRecordBatch(batch) for batch in split(columns, 50)
+    )
+    client = MagicMock()
+    client.query.return_value = job
+
+    collector = JobLevelMetricsCollector("p", "US", use_storage_api=False, client=client)
+    metrics = collector.collect(datetime(2026, 1, 12, tzinfo=timezone.utc))
+
+    assert "region-US" in client.query.call_args.args[0]
+    assert "labels" not in client.query.call_args.args[0]
+    job.result.return_value.to_arrow_iterable.assert_called_once_with(bqstorage_client=None)
+    reference = JobAggregate()
+    reference.add(columns, NOW_MS)
+    assert metrics == reference.metrics()
+    assert collector.queue_histogram.sum() == int((columns["start_ms"] >= 0).sum())
+
+
+def test_iter_batches_reads_reservation_and_labels_with_its_own_query():
+    client = MagicMock()
+    client.query.return_value.result.return_value.to_arrow_iterable.return_value = iter(["batch"])
+    collector = JobLevelMetricsCollector("p", "EU", use_storage_api=False, client=client)
+
+    assert list(collector.iter_batches(datetime(2026, 1, 12, tzinfo=timezone.utc))) == ["batch"]
+    query = client.query.call_args.args[0]
+    assert "region-EU" in query and "reservation_id" in query and "labels" in query
+
+
+def test_validate_metrics_mode():
+    config = {
+        "metadata": {"project_id": "p", "reservation_id": "r"},
+        "sla_thresholds": {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600},
+        "metrics_mode": "jobs",
+        "job_metrics": {"max_queue_seconds": 0},
+        "segmentation": {"by": "user"},
+    }
+
+    with pytest.raises(ConfigError) as exc:
+        validate_config(config)
+
+    assert "job_metrics.max_queue_seconds" in str(exc.value)
+    assert "segmentation is not supported with metrics_mode jobs" in str(exc.value)
+
+    config = {k: v for k, v in config.items() if k not in ("job_metrics", "segmentation")}
+    with pytest.raises(ConfigError, match="Unknown metrics_mode 'rows'"):
+        validate_config({**config, "metrics_mode": "rows"})
@@ -1,9 +1,18 @@
+import asyncio
+
 import pytest, pendulum
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 from concurrent.futures import TimeoutError
 
-from core.metrics import BigQueryJobMetricsCollector, MetricsCollectionError
+from core.metrics import (
+    AsyncBigQueryJobMetricsCollector,
+    BigQueryJobMetricsCollector,
+    MetricsCollectionError,
+    PendingJobsProbe,
+    SlotUtilizationCollector,
+    segment_expression,
+)
 
 
 @pytest.fixture
@@ -121,3 +130,112 @@ def test_collect_missing_required_fields_raises(collector):
     ):
         collector.collect(datetime(2026, 1, 11))
 
+
+def test_async_collect_polls_until_done():
+    mock_job = MagicMock()
+    mock_job.done.side_effect = [False, False, True]
+    mock_job.result.return_value = FakeRowIterator([make_mock_row()])
+    client = MagicMock()
+    client.query.return_value = mock_job
+
+    collector = AsyncBigQueryJobMetricsCollector(
+        project_id="test-project",
+        location="US",
+        sql_path="queries/jobs_sla_metrics.sql",
+        poll_interval_seconds=0.01,
+        client=client,
+    )
+
+    result = asyncio.run(collector.collect(pendulum.now()))
+
+    assert result["count_job_submitted"] == 100
+    assert mock_job.done.call_count == 3
+
+
+def test_async_collect_deadline_cancels_job():
+    mock_job = MagicMock()
+    mock_job.done.return_value = False
+    client = MagicMock()
+    client.query.return_value = mock_job
+
+    collector = AsyncBigQueryJobMetricsCollector(
+        project_id="test-project",
+        location="US",
+        sql_path="queries/jobs_sla_metrics.sql",
+        poll_interval_seconds=0.01,
+        client=client,
+    )
+
+    with pytest.raises(MetricsCollectionError, match="timed out"):
+        asyncio.run(collector.collect(pendulum.now(), timeout_seconds=0.05))
+    mock_job.cancel.assert_called_once()
+
+
+def test_utilization_collect_filters_by_reservation():
+    mock_job = MagicMock()
+    mock_job.result.return_value = [{"total_slot_ms": 300000, "avg_slots_used": 1.0, "peak_slots_used": 5.0}]
+    client = MagicMock()
+    client.query.return_value = mock_job
+
+    collector = SlotUtilizationCollector(
+        project_id="admin",
+        location="US",
+        reservation_id="etl",
+        client=client,
+    )
+    usage = collector.collect(pendulum.now())
+
+    assert usage["peak_slots_used"] == 5.0
+    params = client.query.call_args.kwargs["job_config"].query_parameters
+    assert any(p.name == "reservation_id" and p.value == "admin:us.etl" for p in params)
+
+
+def test_probe_treats_no_pending_jobs_as_zero():
+    mock_job = MagicMock()
+    mock_job.result.return_value = [{"count_job_pending": 0, "max_pending_time": None}]
+    client = MagicMock()
+    client.query.return_value = mock_job
+
+    probe = PendingJobsProbe(project_id="test-project", location="US", client=client)
+
+    assert probe.collect(pendulum.now()) == {"count_job_pending": 0, "max_pending_time": 0}
+
+
+def test_segment_expression_rejects_unsafe_label_keys():
+    assert segment_expression("user") == "user_email"
+    assert "key = 'team'" in segment_expression("label:team")
+
+    with pytest.raises(ValueError):
+        segment_expression("label:x' OR TRUE --")
+    with pytest.raises(ValueError):
+        segment_expression("reservation")
+
+
+def test_segmented_collect_streams_rows_per_segment():
+    rows = FakeRowIterator([
+        {"segment": "etl", **make_mock_row(count_job_pending=1, queueing_time_p99=5, max_running_time=None)},
+        {"segment": "adhoc", **make_mock_row(count_job_pending=30, queueing_time_p99=400, max_running_time=50)},
+    ])
+    mock_job = MagicMock()
+    mock_job.result.return_value = rows
+    client = MagicMock()
+    client.query.return_value = mock_job
+
+    collector = BigQueryJobMetricsCollector(
+        project_id="p",
+        location="US",
+        sql_path="queries/jobs_sla_metrics_by_segment.sql",
+        segment_by="label:workload",
+        client=client,
+    )
+    metrics = collector.collect(datetime(2026, 1, 11))
+
+    query = client.query.call_args.args[0]
+    assert "WHERE key = 'workload'" in query and "{{ segment }}" not in query
+    assert set(metrics["segments"]) == {"etl", "adhoc"}
+    assert metrics["segments"]["adhoc"]["count_job_pending"] == 30
+    # combined view: counts summed, latencies from the worst segment
+    assert metrics["count_job_submitted"] == 200
+    assert metrics["count_job_pending"] == 31
+    assert metrics["queueing_time_p99"] == 400
+    assert metrics["max_running_time"] == 50
@@ -0,0 +1,103 @@
+import pendulum
+from unittest.mock import MagicMock
+
+from core.decision_engine import DecisionEngine
+from core.metrics import MetricsCollectionError
+from core.polling import AdaptivePoller
+
+
+def make_poller(**kwargs):
+    probe = MagicMock()
+    probe.collect.return_value = {"count_job_pending": 0, "max_pending_time": 0}
+    options = {"check_interval_seconds": 300, "min_interval_seconds": 30, "max_pending_seconds": 60}
+    options.update(kwargs)
+    return AdaptivePoller(probe, **options)
+
+
+def test_first_poll_is_a_full_cycle():
+    poller = make_poller()
+
+    assert poller.full_cycle_due(0.0)
+    assert poller.next_delay(0.0) == 0.0
+
+
+def test_healthy_polls_back_off_until_the_check_interval():
+    poller = make_poller()
+    poller.record_cycle(0.0, breached=False)
+    assert poller.next_delay(0.0) == 60
+
+    now = poller.next_delay(0.0)
+    polls = []
+    while not poller.full_cycle_due(now):
+        polls.append(now)
+        poller.probe(pendulum.now())
+        now += poller.next_delay(now)
+
+    assert polls == [60, 180]
+    assert now == 300
+
+
+def test_breach_tightens_interval():
+    poller = make_poller()
+    poller.record_cycle(0.0, breached=False)
+    poller.record_cycle(60.0, breached=True)
+
+    assert poller.next_delay(60.0) == 30
+    assert not poller.full_cycle_due(90.0)
+
+
+def test_probe_pressure_triggers_full_cycle_immediately():
+    poller = make_poller(pending_jobs=20)
+    poller.record_cycle(0.0, breached=False)
+    poller.probe_collector.collect.return_value = {"count_job_pending": 25, "max_pending_time": 5}
+
+    assert poller.probe(pendulum.now())
+    assert poller.full_cycle_due(60.0)
+    assert poller.next_delay(60.0) == 0.0
+
+
+def test_long_pending_job_is_pressure():
+    poller = make_poller()
+    poller.record_cycle(0.0, breached=False)
+    poller.probe_collector.collect.return_value = {"count_job_pending": 1, "max_pending_time": 90}
+
+    assert poller.probe(pendulum.now())
+
+
+def test_failed_probe_keeps_interval():
+    poller = make_poller()
+    poller.record_cycle(0.0, breached=True)
+    poller.probe_collector.collect.side_effect = MetricsCollectionError("boom")
+
+    assert not poller.probe(pendulum.now())
+    assert poller.next_delay(30.0) == 30
+
+
+def test_from_config_is_off_without_section():
+    assert AdaptivePoller.from_config({"metadata": {"project_id": "p"}}) is None
+
+
+def test_adaptive_cycles_off_the_boundary_still_reset_windows():
+    config = {
+        "metadata": {"project_id": "p", "reservation_id": "etl"},
+        "reservation_slot_profiles": {"low": {"min": 500, "max": 2000, "increment": 100}},
+        "default_slot_profile": "low",
+    }
+    manager = MagicMock()
+    manager.get_current_slots.return_value = 1000
+    engine = DecisionEngine(config, collector=MagicMock(), reservation_mgr=manager)
+    engine.collector.collect.return_value = {}
+    poller = make_poller()
+    start = pendulum.datetime(2026, 1, 12, 8, 1, 10, tz="Asia/Jakarta")
+
+    now = 0.0
+    while now <= 3600:
+        if poller.full_cycle_due(now):
+            engine.run(start.add(seconds=now))
+            poller.record_cycle(now, breached=False)
+        else:
+            poller.probe(start.add(seconds=now))
+        now += poller.next_delay(now)
+
+    # no full cycle lands on :00 or :30; the first ones of 08:30 and 09:00 reset
+    assert [c.args[0] for c in manager.set_slots.call_args_list] == [500, 500]
@@ -0,0 +1,130 @@
+import pendulum
+import pytest
+from unittest.mock import MagicMock
+
+from core.config import ConfigError, validate_config
+from core.decision_engine import CycleRecord, DecisionEngine
+from core.prewarm import LookAheadPlanner
+from core.schedule import CompiledSchedule
+from core.sla_policy import SLAEvaluationResult
+from core.store import MetricsStore
+
+# Mondays, Asia/Jakarta
+MONDAY = pendulum.datetime(2026, 1, 12, tz="Asia/Jakarta")
+
+
+@pytest.fixture
+def config():
+    return {
+        "metadata": {"project_id": "p", "reservation_id": "etl", "location": "US"},
+        "reservation_slot_profiles": {
+            "low": {"min": 1500, "max": 2000, "increment": 100},
+            "medium": {"min": 2500, "max": 3000, "increment": 100},
+            "high": {"min": 3500, "max": 4000, "increment": 100},
+        },
+        "default_slot_profile": "low",
+        "reservation_time_mapping": {
+            "0": {
+                **{str(h): {"0": "high", "30": "high"} for h in range(8, 12)},
+                "12": {"0": "medium", "30": "medium"},
+            },
+        },
+        "sla_thresholds": {"pending_job_pct": 20, "queueing_time_p99": 60, "max_running_time": 3600},
+        "prewarm": {"lead_minutes": 10, "release_minutes": 5},
+    }
+
+
+@pytest.fixture
+def planner(config):
+    return LookAheadPlanner.from_config(config, CompiledSchedule.from_config(config))
+
+
+def at(hour, minute, days=0):
+    return MONDAY.add(days=days, hours=hour, minutes=minute)
+
+
+def test_raises_to_next_window_min_within_lead_time(planner):
+    assert planner.target(at(7, 45), 1500, healthy=True) is None
+    assert planner.target(at(7, 52), 1500, healthy=True) == 3500
+    # already warm: hold, so nothing lowers it before the window starts
+    assert planner.target(at(7, 55), 3500, healthy=True) == 3500
+
+
+def test_releases_early_before_a_lower_window_only_when_healthy(planner):
+    assert planner.target(at(11, 50), 3800, healthy=True) is None
+    assert planner.target(at(11, 56), 3800, healthy=True) == 2500
+    assert planner.target(at(11, 56), 3800, healthy=False) is None
+
+
+def test_learns_window_ramp_from_store_history(planner, tmp_path):
+    store = MetricsStore(str(tmp_path / "cycles.db"), compact_every_seconds=float("inf"))
+    result = SLAEvaluationResult(healthy=True, violations=[])
+    # the last three Mondays autoscaled to 3800 within minutes of 08:00
+    for week in (1, 2, 3):
+        for minute, slots in ((0, 3500), (5, 3700), (10, 3800), (20, 3600)):
+            record = CycleRecord(at(8, minute, days=-7 * week), {}, result, 4000, None)
+            store.append("etl", record, used_slots=slots)
+
+    planner.refresh(store, "etl", at(7, 50))
+    store.close()
+
+    # the 08:20 rows sit outside the 15-minute ramp and are ignored
+    assert planner.warm_level(at(8, 0)) == 3800
+    assert planner.target(at(7, 52), 1500, healthy=True) == 3800
+    # other windows keep the profile min
+    assert planner.warm_level(at(8, 30)) == 3500
+
+
+def test_learned_ramp_decays_when_demand_drops(planner, tmp_path):
+    store = MetricsStore(str(tmp_path / "cycles.db"), compact_every_seconds=float("inf"))
+    healthy = SLAEvaluationResult(healthy=True, violations=[])
+    breach = SLAEvaluationResult(healthy=False, violations=[])
+    # three weeks ago the window breached and needed 3900
+    store.append("etl", CycleRecord(at(8, 5, days=-21), {}, breach, 3500, 3900), used_slots=3500)
+    planner.refresh(store, "etl", at(7, 50, days=-14))
+    assert planner.warm_level(at(8, 0)) == 3900
+
+    # since then the window was pre-warmed to 3900 but autoscaling only used 2000
+    for week in (1, 2):
+        for minute in (0, 5, 10):
+            store.append("etl", CycleRecord(at(8, minute, days=-7 * week), {}, healthy, 3900, None), used_slots=2000)
+    planner.refresh(store, "etl", at(7, 50))
+    store.close()
+
+    assert planner.warm_level(at(8, 0)) == 3500
+
+
+def test_learned_ramp_is_capped_at_profile_max(planner):
+    planner.ramps[(0, 16)] = 5000
+
+    assert planner.warm_level(at(8, 0)) == 4000
+
+
+def test_engine_window_reset_keeps_learned_level(config):
+    engine = DecisionEngine(config, collector=MagicMock(), reservation_mgr=MagicMock())
+    engine.prewarm.ramps[(0, 16)] = 3800
+    healthy = SLAEvaluationResult(healthy=True, violations=[])
+
+    assert engine.decide(at(7, 52), healthy, 1500) == 3800
+    # warm already: no write, and no utilization scale-down before the window
+    assert engine.decide(at(7, 56), healthy, 3800) is None
+    # the reset at the window start holds the learned level instead of the min
+    assert engine.decide(at(8, 0), healthy, 3800) is None
+    assert engine.decide(at(8, 30), healthy, 3800) == 3500
+
+
+def test_breach_never_goes_below_warm_level(config):
+    engine = DecisionEngine(config, collector=MagicMock(), reservation_mgr=MagicMock())
+    breach = SLAEvaluationResult(healthy=False, violations=[])
+
+    assert engine.decide(at(7, 55), breach, 1500) == 3500
+
+
+def test_validate_prewarm_bounds(config):
+    config["prewarm"] = {"release_minutes": 45, "ramp_quantile": 2}
+
+    with pytest.raises(ConfigError) as exc:
+        validate_config(config)
+
+    assert "prewarm.release_minutes" in str(exc.value)
+    assert "prewarm.ramp_quantile" in str(exc.value)
@@ -0,0 +1,150 @@
+import numpy as np
+import pendulum
+import pytest
+from unittest.mock import patch
+
+from core.replay import (
+    NOT_YET,
+    InMemoryReservationManager,
+    ReplaySimulator,
+    aggregate_windows,
+    load_jobs_export,
+    window_metrics,
+)
+
+T0 = int(pendulum.datetime(2026, 1, 12, 8, 0, tz="Asia/Jakarta").timestamp())
+
+
+def make_jobs(rows):
+    """rows: (creation, start, end, reason) offsets in seconds from T0; None = never."""
+    def col(i):
+        return np.array([T0 + r[i] if r[i] is not None else NOT_YET for r in rows], dtype=np.int64)
+
+    reasons = [r[3] for r in rows]
+    return {
+        "creation_time": col(0),
+        "start_time": col(1),
+        "end_time": col(2),
+        "has_error": np.array([r is not None for r in reasons]),
+        "stopped": np.array([r == "stopped" for r in reasons]),
+    }
+
+
+@pytest.fixture
+def config():
+    return {
+        "metadata": {"project_id": "p", "reservation_id": "r", "location": "asia-southeast2"},
+        "reservation_slot_profiles": {
+            "low": {"min": 1500, "max": 2000, "increment": 100},
+            "high": {"min": 3500, "max": 4000, "increment": 100},
+        },
+        "reservation_time_mapping": {"0": {"8": {"0": "high", "30": "high"}}},
+        "default_slot_profile": "low",
+        "sla_thresholds": {
+            "pending_job_pct": 15.0,
+            "queueing_time_p99": 180,
+            "max_running_time": 420,
+        },
+        "default_adjustment_slots": 50,
+    }
+
+
+def test_aggregate_windows_matches_sql_semantics():
+    jobs = make_jobs([
+        (-200, -190, -100, None),       # done before t
+        (-100, -40, None, None),        # running at t for 40s, queued 60s
+        (-50, None, None, None),        # pending
+        (-20, -10, -5, "stopped"),      # errored
+        (-400, -390, None, None),       # outside the 5 minute lookback
+    ])
+
+    metrics = window_metrics(aggregate_windows(jobs, np.array([T0])), 0)
+
+    assert metrics["count_job_submitted"] == 4
+    assert metrics["count_job_pending"] == 1
+    assert metrics["count_job_running"] == 1
+    assert metrics["count_job_done"] == 1
+    assert metrics["count_job_error"] == 1
+    assert metrics["max_queueing_time"] == 60
+    assert metrics["queueing_time_p99"] == 60
+    assert metrics["max_running_time"] == 40
+    assert metrics["stddev_running_time"] is None
+
+
+def test_aggregate_windows_empty_window():
+    metrics = window_metrics(aggregate_windows(make_jobs([]), np.array([T0])), 0)
+
+    assert metrics["count_job_submitted"] == 0
+    assert metrics["queueing_time_p99"] is None
+
+
+def test_aggregate_windows_vectorized_equals_per_window():
+    rng = np.random.default_rng(7)
+    creation = rng.integers(0, 3600, size=2000)
+    queued = rng.integers(0, 300, size=2000)
+    runtime = rng.integers(1, 900, size=2000)
+    rows = [(int(c), int(c + q), int(c + q + r), None) for c, q, r in zip(creation, queued, runtime)]
+    jobs = make_jobs(rows)
+    eval_times = T0 + np.arange(300, 3600, 300)
+
+    batch = aggregate_windows(jobs, eval_times)
+
+    for i, t in enumerate(eval_times):
+        single = aggregate_windows(jobs, np.array([t]))
+        for name in batch:
+            np.testing.assert_allclose(batch[name][i], single[name][0])
+
+
+def test_in_memory_reservation_counts_only_real_writes():
+    manager = InMemoryReservationManager(1000)
+
+    manager.set_slots(1000)
+    manager.add_slots(50)
+
+    assert manager.slots == 1050
+    assert manager.writes == 1
+
+
+def test_replay_scales_up_on_breach_and_reports_cost(config):
+    # heavy queueing between 08:05 and 08:20 on Monday
+    rows = [(300 + i * 10, 300 + i * 10 + 400, 300 + i * 10 + 500, None) for i in range(90)]
+    start = pendulum.datetime(2026, 1, 12, 8, 0, tz="Asia/Jakarta")
+
+    report = ReplaySimulator(config, make_jobs(rows), slot_hour_price=0.04).run(start, start.add(hours=1))
+
+    assert report.windows == 12
+    assert report.sla_violation_minutes > 0
+    assert max(report.slots) > 3500
+    assert report.slots[report.times.index(start.add(minutes=30).isoformat())] == 3500
+    assert report.estimated_cost == pytest.approx(report.slot_hours * 0.04)
+
+
+@patch("core.metrics.bigquery.Client")
+def test_replay_never_queries_slot_utilization(mock_client, config):
+    config["utilization_scale_down"] = {"enabled": True, "consecutive_cycles": 1}
+    start = pendulum.datetime(2026, 1, 12, 8, 0, tz="Asia/Jakarta")
+
+    report = ReplaySimulator(config, make_jobs([(300, 310, 400, None)])).run(start, start.add(minutes=30))
+
+    assert report.windows == 6
+    mock_client.assert_not_called()
+
+
+def test_load_jobs_export_from_csv(tmp_path):
+    pd = pytest.importorskip("pandas")
+
+    path = tmp_path / "jobs.csv"
+    pd.DataFrame({
+        "creation_time": ["2026-01-12 01:00:00+00:00", "2026-01-12 01:00:05+00:00", "2026-01-12 01:00:06+00:00"],
+        "start_time": ["2026-01-12 01:00:10+00:00", None, "2026-01-12 01:00:07+00:00"],
+        "end_time": [None, None, None],
+        "statement_type": ["SELECT", "SELECT", "SCRIPT"],
+        "error_result": [None, '{"reason": "stopped"}', None],
+    }).to_csv(path, index=False)
+
+    jobs = load_jobs_export(str(path))
+
+    assert len(jobs["creation_time"]) == 2
+    assert jobs["start_time"][0] - jobs["creation_time"][0] == 10
+    assert jobs["start_time"][1] == NOT_YET
+    assert jobs["stopped"].tolist() == [False, True]
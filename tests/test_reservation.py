@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
+
+from google.api_core.exceptions import NotFound
+
+from core.reservation import AsyncBigQuerySlotReservation, BigQuerySlotReservation, assert_max_slot_value
+
+
+def make_reservation(max_slots=1000, ignore_idle_slots=True):
+    response = MagicMock()
+    response.name = "projects/p/locations/l/reservations/r"
+    response.ignore_idle_slots = ignore_idle_slots
+    response.slot_capacity = 0
+    response.concurrency = 0
+    response.autoscale.current_slots = 200
+    response.autoscale.max_slots = max_slots
+    response.update_time = datetime(2026, 1, 11, tzinfo=timezone.utc)
+    return response
+
+
+@pytest.fixture
+def reservation():
+    with patch("core.reservation.reservation_service.ReservationServiceClient") as mock_client_cls:
+        client = mock_client_cls.return_value
+        client.reservation_path.return_value = "projects/p/locations/l/reservations/r"
+        client.get_reservation.return_value = make_reservation(1000)
+        client.update_reservation.side_effect = lambda request: make_reservation(
+            request.reservation.autoscale.max_slots
+        )
+        yield BigQuerySlotReservation(project_id="p", reservation_id="r", zone="l")
+
+
+def test_get_reuses_cached_response(reservation):
+    assert reservation.get()["autoscale_max_slots"] == 1000
+    assert reservation.get()["autoscale_max_slots"] == 1000
+
+    assert reservation.client.get_reservation.call_count == 1
+
+
+def test_invalidate_forces_fresh_read(reservation):
+    reservation.get()
+    reservation.invalidate()
+    reservation.get()
+
+    assert reservation.client.get_reservation.call_count == 2
+
+
+def test_update_skips_existence_check_and_caches_response(reservation):
+    response = reservation.update(max_autoscaling_slot=1500, ignore_idle_slots=True)
+
+    assert response["status_code"] == 200
+    reservation.client.get_reservation.assert_not_called()
+    assert reservation.get()["autoscale_max_slots"] == 1500
+    reservation.client.get_reservation.assert_not_called()
+
+
+def test_update_skipped_when_target_matches_cache(reservation):
+    reservation.get()
+
+    response = reservation.update(max_autoscaling_slot=1000, ignore_idle_slots=True)
+
+    assert response["status_code"] == 304
+    reservation.client.update_reservation.assert_not_called()
+
+
+def test_update_not_found_reported_from_update_call(reservation):
+    reservation.client.update_reservation.side_effect = NotFound("missing")
+
+    response = reservation.update(max_autoscaling_slot=1500, ignore_idle_slots=True)
+
+    assert response["status_code"] == 404
+    reservation.client.get_reservation.assert_not_called()
+
+
+@pytest.mark.parametrize("value", [0, 25, 120])
+def test_assert_max_slot_value_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        assert_max_slot_value(value)
+
+
+@pytest.fixture
+def async_reservation():
+    client = MagicMock()
+    client.reservation_path.return_value = "projects/p/locations/l/reservations/r"
+    client.get_reservation = AsyncMock(return_value=make_reservation(1000))
+    client.update_reservation = AsyncMock(
+        side_effect=lambda request, timeout=None: make_reservation(request.reservation.autoscale.max_slots)
+    )
+    return AsyncBigQuerySlotReservation(project_id="p", reservation_id="r", zone="l", client=client)
+
+
+def test_async_get_and_update_share_cache(async_reservation):
+    async def scenario():
+        await async_reservation.get(timeout=5)
+        unchanged = await async_reservation.update(max_autoscaling_slot=1000, ignore_idle_slots=True)
+        updated = await async_reservation.update(max_autoscaling_slot=1500, ignore_idle_slots=True, timeout=5)
+        return unchanged, updated, await async_reservation.get()
+
+    unchanged, updated, state = asyncio.run(scenario())
+
+    assert unchanged["status_code"] == 304
+    assert updated["status_code"] == 200
+    assert state["autoscale_max_slots"] == 1500
+    assert async_reservation.client.get_reservation.await_count == 1
+    assert async_reservation.client.update_reservation.await_args.kwargs["timeout"] == 5
@@ -0,0 +1,68 @@
+import pytest
+
+from core.scaling import FlatScalingStrategy, PIDScalingStrategy, build_scaling_strategy
+from core.sla_policy import SLAEvaluationResult, SLAViolation
+
+HIGH = {"min": 3500, "max": 4000, "increment": 100}
+
+
+def breach(value, threshold=180.0, metric="queueing_time_p99"):
+    return SLAEvaluationResult(
+        healthy=False,
+        violations=[SLAViolation(metric, value, threshold, "breach")],
+    )
+
+
+def test_flat_strategy_adds_fixed_adjustment_capped_at_max():
+    strategy = FlatScalingStrategy(50)
+
+    assert strategy.breach_target(3500, HIGH, breach(200)) == 3550
+    assert strategy.breach_target(3990, HIGH, breach(200)) == 4000
+
+
+def test_pid_step_scales_with_breach_magnitude():
+    small = PIDScalingStrategy(kp=1.0, ki=0.0).breach_target(3500, HIGH, breach(200))
+    large = PIDScalingStrategy(kp=1.0, ki=0.0).breach_target(3500, HIGH, breach(540))  # 3x threshold
+
+    assert small == 3600  # one increment minimum
+    assert large == 3700  # error 2.0 -> two increments
+
+
+def test_pid_reaches_profile_max_within_two_cycles():
+    strategy = PIDScalingStrategy()
+    slots = 3500
+    for _ in range(2):
+        slots = strategy.breach_target(slots, HIGH, breach(540))
+
+    assert slots == 4000
+
+
+def test_pid_uses_largest_violation_and_respects_multiple_of_50():
+    result = SLAEvaluationResult(
+        healthy=False,
+        violations=[
+            SLAViolation("pending_job_pct", 16.0, 15.0, "x"),
+            SLAViolation("max_running_time", 840.0, 420.0, "x"),
+        ],
+    )
+    profile = {"min": 1000, "max": 2000, "increment": 30}
+
+    target = PIDScalingStrategy(kp=1.0, ki=0.0).breach_target(1000, profile, result)
+
+    assert target == 1050  # 1 increment of 30 rounded up to the 50 grid
+    assert target % 50 == 0
+
+
+def test_pid_reset_clears_integral():
+    strategy = PIDScalingStrategy(kp=0.0, ki=1.0)
+    strategy.breach_target(3500, HIGH, breach(540))
+    strategy.reset()
+
+    assert strategy.breach_target(3500, HIGH, breach(540)) == 3700
+
+
+def test_build_scaling_strategy():
+    assert isinstance(build_scaling_strategy({}), FlatScalingStrategy)
+    assert isinstance(build_scaling_strategy({"scaling": {"strategy": "pid"}}), PIDScalingStrategy)
+    with pytest.raises(ValueError):
+        build_scaling_strategy({"scaling": {"strategy": "ml"}})
@@ -0,0 +1,95 @@
+import logging
+
+import numpy as np
+import pendulum
+import pytest
+
+from core.schedule import CompiledSchedule, ScheduleCompileError, DEFAULT_SLOT_CONFIG
+
+PROFILES = {
+    "low": {"min": 1500, "max": 2000, "increment": 100},
+    "high": {"min": 3500, "max": 4000, "increment": 100},
+}
+
+MAPPING = {
+    "0": {
+        "8": {"0": "high", "30": "high"},
+        "18": {"0": "low", "30": "low"},
+    },
+    1: {9: {"30": {"min": 500, "max": 1000, "increment": 50}}},
+}
+
+
+def test_resolves_weekday_hour_and_half_hour():
+    schedule = CompiledSchedule(PROFILES, MAPPING)
+
+    assert schedule.resolve(pendulum.datetime(2026, 1, 12, 8, 45)) == PROFILES["high"]  # Monday
+    assert schedule.resolve(pendulum.datetime(2026, 1, 12, 18, 0)) == PROFILES["low"]
+    assert schedule.resolve(pendulum.datetime(2026, 1, 13, 9, 30))["max"] == 1000  # inline, int keys
+
+
+def test_gaps_fall_back_to_default_and_are_reported(caplog):
+    with caplog.at_level(logging.WARNING):
+        schedule = CompiledSchedule(PROFILES, MAPPING)
+
+    assert schedule.resolve(pendulum.datetime(2026, 1, 12, 3, 0)) == DEFAULT_SLOT_CONFIG
+    assert (0, 3, 0) in schedule.gaps
+    assert "unmapped" in caplog.text
+
+
+def test_default_profile_fills_gaps():
+    schedule = CompiledSchedule(PROFILES, MAPPING, default_profile="low")
+
+    assert schedule.resolve(pendulum.datetime(2026, 1, 14, 3, 0)) == PROFILES["low"]
+
+
+def test_unknown_profile_fails_at_compile_time():
+    with pytest.raises(ScheduleCompileError, match="Unknown slot profile 'medium'"):
+        CompiledSchedule(PROFILES, {"0": {"8": {"0": "medium"}}})
+
+
+def test_invalid_minute_key_fails_at_compile_time():
+    with pytest.raises(ScheduleCompileError):
+        CompiledSchedule(PROFILES, {"0": {"8": {"15": "low"}}})
+
+
+def test_overrides_and_holidays_take_precedence():
+    schedule = CompiledSchedule(
+        PROFILES,
+        MAPPING,
+        overrides=[{"start": "2026-01-12T08:00:00", "end": "2026-01-12T08:30:00", "profile": "low"}],
+        holidays={"2026-01-19": "low"},
+    )
+    tz = "Asia/Jakarta"
+
+    assert schedule.resolve(pendulum.datetime(2026, 1, 12, 8, 15, tz=tz)) == PROFILES["low"]
+    assert schedule.resolve(pendulum.datetime(2026, 1, 12, 8, 30, tz=tz)) == PROFILES["high"]
+    assert schedule.resolve(pendulum.datetime(2026, 1, 19, 8, 30, tz=tz)) == PROFILES["low"]
+
+
+def test_overlapping_overrides_rejected():
+    with pytest.raises(ScheduleCompileError, match="overlap"):
+        CompiledSchedule(
+            PROFILES,
+            MAPPING,
+            overrides=[
+                {"start": "2026-01-12T08:00:00", "end": "2026-01-12T10:00:00", "profile": "low"},
+                {"start": "2026-01-12T09:00:00", "end": "2026-01-12T11:00:00", "profile": "high"},
+            ],
+        )
+
+
+def test_resolve_many_matches_scalar_resolve():
+    schedule = CompiledSchedule(
+        PROFILES,
+        MAPPING,
+        holidays={"2026-01-19": "low"},
+    )
+    start = pendulum.datetime(2026, 1, 12, tz="Asia/Jakarta")
+    times = [start.add(minutes=30 * i) for i in range(2 * 48 * 7)]
+
+    table = schedule.resolve_many(times)
+
+    expected = np.array([[schedule.resolve(t)[f] for f in ("min", "max", "increment")] for t in times])
+    assert np.array_equal(table, expected)
+    assert schedule.week_table().shape == (7, 48, 3)
@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from core.sla_policy import SLAPolicy, SLAEvaluationResult
+from core.sla_policy import RULE_BITS, SLAPolicy, SLAEvaluationResult, SLAViolation
 
 
 @pytest.fixture
@@ -130,3 +131,134 @@ def test_missing_required_metric_marks_unhealthy(default_policy, caplog):
     result = default_policy.evaluate(metrics)
 
     assert result.healthy is False
+
+
+def test_violation_message_is_built_on_access(default_policy):
+    result = default_policy.evaluate({
+        "count_job_submitted": 100,
+        "count_job_pending": 20,
+        "count_job_error": 0,
+        "queueing_time_p99": 10,
+        "max_running_time": 50,
+    })
+
+    violation = result.violations[0]
+    assert violation._message is None
+    assert violation.message == "Pending job percentage 20.00% exceeds threshold"
+    assert SLAViolation("pending_job_pct", 20.0, 15.0, message="too many").message == "too many"
+
+
+def test_batch_matches_scalar_evaluation(default_policy):
+    rng = np.random.default_rng(7)
+    shape = (20, 50)  # reservations x windows
+    submitted = rng.integers(0, 40, shape)
+    columns = {
+        "count_job_submitted": submitted,
+        "count_job_pending": rng.integers(0, 10, shape).clip(max=submitted),
+        "count_job_error": rng.integers(0, 2, shape).clip(max=submitted),
+        "queueing_time_p99": np.where(rng.random(shape) < 0.1, np.nan, rng.uniform(0, 300, shape)),
+        "max_running_time": rng.uniform(0, 600, shape),
+    }
+
+    batch = default_policy.evaluate_batch(columns)
+
+    for index in np.ndindex(shape):
+        row = {name: values[index].item() for name, values in columns.items()}
+        row["queueing_time_p99"] = None if np.isnan(row["queueing_time_p99"]) else row["queueing_time_p99"]
+        scalar = default_policy.evaluate(row)
+        assert bool(batch.healthy[index]) == scalar.healthy
+        assert int(batch.codes[index]) == scalar.code
+        assert batch.result(index).violations == scalar.violations
+
+
+def test_batch_codes_and_counts(default_policy):
+    batch = default_policy.evaluate_batch({
+        "count_job_submitted": np.array([100, 100, 0]),
+        "count_job_pending": np.array([20, 1, 50]),
+        "count_job_error": np.array([0, 0, 0]),
+        "queueing_time_p99": np.array([240.0, 10.0, 900.0]),
+        "max_running_time": np.array([50.0, 50.0, 900.0]),
+    })
+
+    assert batch.healthy.tolist() == [False, True, True]
+    assert batch.codes[0] == RULE_BITS["pending_job_pct"] | RULE_BITS["queueing_time_p99"]
+    assert batch.counts() == {
+        "pending_job_pct": 1,
+        "queueing_time_p99": 1,
+        "max_running_time": 0,
+        "error_job_pct": 0,
+    }
+
+
+def test_batch_missing_threshold_marks_non_empty_rows_unhealthy():
+    policy = SLAPolicy({"queueing_time_p99": 60})
+
+    batch = policy.evaluate_batch({
+        "count_job_submitted": np.array([10, 0]),
+        "count_job_pending": np.array([0, 0]),
+        "queueing_time_p99": np.array([1.0, 1.0]),
+    })
+
+    assert batch.healthy.tolist() == [False, True]
+
+
+def segment_row(pending=0, p99=10):
+    return {
+        "count_job_submitted": 100,
+        "count_job_pending": pending,
+        "count_job_error": 0,
+        "queueing_time_p99": p99,
+        "max_running_time": 60,
+    }
+
+
+@pytest.fixture
+def segmented_policy():
+    return SLAPolicy.from_config({
+        "sla_thresholds": {"pending_job_pct": 15.0, "queueing_time_p99": 180, "max_running_time": 420},
+        "segmentation": {
+            "by": "label:workload",
+            "segments": {
+                "etl": {"weight": 1.0, "sla_thresholds": {"queueing_time_p99": 60}},
+                "adhoc": {"weight": 0.0},
+                "bi": {"weight": 0.5},
+            },
+            "default_weight": 0.5,
+        },
+    })
+
+
+def test_segment_thresholds_override_shared_ones(segmented_policy):
+    # 90s p99 is fine for the shared threshold but breaches etl's 60s
+    result = segmented_policy.evaluate({"segments": {"etl": segment_row(p99=90)}})
+
+    assert result.healthy is False
+    assert [(v.segment, v.metric) for v in result.violations] == [("etl", "queueing_time_p99")]
+    assert result.violations[0].message.startswith("[etl] ")
+
+
+def test_zero_weight_segment_never_breaches(segmented_policy):
+    result = segmented_policy.evaluate({
+        "segments": {"etl": segment_row(), "adhoc": segment_row(pending=90, p99=900)},
+    })
+
+    assert result.healthy is True
+    assert result.violations == []
+    assert result.segments["adhoc"].healthy is False
+
+
+def test_partial_weights_add_up_to_a_breach(segmented_policy):
+    one = segmented_policy.evaluate({"segments": {"bi": segment_row(pending=40)}})
+    two = segmented_policy.evaluate({
+        "segments": {"bi": segment_row(pending=40), "unlisted": segment_row(p99=300)},
+    })
+
+    assert one.healthy is True
+    assert two.healthy is False
+    assert {v.segment for v in two.violations} == {"bi", "unlisted"}
+
+
+def test_unsegmented_metrics_use_shared_thresholds(segmented_policy):
+    result = segmented_policy.evaluate(segment_row(p99=90))
+
+    assert result.healthy is True
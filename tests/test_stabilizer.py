@@ -0,0 +1,114 @@
+import pendulum
+import pytest
+from unittest.mock import MagicMock
+
+from core.decision_engine import DecisionEngine
+from core.instrumentation import RESERVATION_WRITES_DEFERRED
+from core.sla_policy import SLAEvaluationResult
+from core.stabilizer import Stabilizer
+
+T0 = pendulum.datetime(2026, 1, 12, 9, 5, tz="Asia/Jakarta")
+HEALTHY = SLAEvaluationResult(healthy=True, violations=[])
+BREACH = SLAEvaluationResult(healthy=False, violations=[])
+
+
+@pytest.fixture
+def config():
+    return {
+        "metadata": {"project_id": "p", "reservation_id": "etl", "location": "US"},
+        "reservation_slot_profiles": {"high": {"min": 1000, "max": 2000, "increment": 100}},
+        "default_slot_profile": "high",
+        "default_adjustment_slots": 100,
+    }
+
+
+def test_breach_needs_n_of_m_confirmation():
+    stabilizer = Stabilizer(confirm_breaches=2, confirm_window=3)
+
+    assert stabilizer.record(True) is False
+    assert stabilizer.record(False) is False
+    assert stabilizer.record(True) is True
+    # the first breach has left the window
+    assert stabilizer.record(False) is False
+    assert stabilizer.record(True) is True
+
+
+def test_writes_inside_cooldown_are_coalesced():
+    stabilizer = Stabilizer(scale_up_cooldown_seconds=300, scale_down_cooldown_seconds=900)
+    deferred = RESERVATION_WRITES_DEFERRED.get()
+
+    assert stabilizer.filter(0, 1000, 1100) == 1100
+    # two more scale-ups inside the cooldown collapse into the latest target
+    assert stabilizer.filter(60, 1100, 1200) is None
+    assert stabilizer.filter(120, 1100, 1300) is None
+    assert stabilizer.filter(180, 1100, None) is None
+    assert stabilizer.filter(300, 1100, None) == 1300
+    assert RESERVATION_WRITES_DEFERRED.get() == deferred + 2
+
+    # scale-down waits for its own, longer cooldown
+    assert stabilizer.filter(600, 1300, 1000) is None
+    assert stabilizer.filter(1200, 1300, None) == 1000
+
+
+def test_wait_is_the_longer_of_dwell_and_cooldown():
+    stabilizer = Stabilizer(scale_up_cooldown_seconds=300, scale_down_cooldown_seconds=1800, min_dwell_seconds=600)
+
+    assert stabilizer.filter(0, 1000, 1100) == 1100
+    # scale-up: the 600s dwell outlasts its 300s cooldown, and they are not added
+    assert stabilizer.wait_seconds(0, 1100, 1200) == 600
+    assert stabilizer.filter(599, 1100, 1200) is None
+    assert stabilizer.filter(600, 1100, None) == 1200
+    # scale-down: its 1800s cooldown outlasts the dwell
+    assert stabilizer.wait_seconds(600, 1200, 1000) == 1800
+
+
+def test_pending_write_cancelled_when_target_returns_to_current():
+    stabilizer = Stabilizer(min_dwell_seconds=600)
+
+    assert stabilizer.filter(0, 1000, 1100) == 1100
+    assert stabilizer.filter(60, 1100, 1000) is None
+    assert stabilizer.filter(120, 1100, 1100) is None
+    assert stabilizer.pending is None
+    assert stabilizer.filter(900, 1100, None) is None
+
+
+def run_cycles(engine, outcomes, start_slots=1000):
+    """Feed SLA outcomes 5 minutes apart; return the reservation writes."""
+    slots, writes = start_slots, []
+    for i, healthy in enumerate(outcomes):
+        target = engine.decide(T0.add(minutes=5 * i), HEALTHY if healthy else BREACH, slots)
+        if target is not None:
+            writes.append(target)
+            slots = target
+    return writes
+
+
+def test_flapping_sla_writes_less_with_stabilization(config):
+    # one breach in every three cycles, with window resets at 09:30 and 10:00
+    outcomes = [False, True, True] * 4
+
+    plain = DecisionEngine(config, collector=MagicMock(), reservation_mgr=MagicMock())
+    config["stabilization"] = {
+        "confirm_breaches": 2,
+        "confirm_window": 3,
+        "scale_up_cooldown_minutes": 5,
+        "scale_down_cooldown_minutes": 30,
+    }
+    stable = DecisionEngine(config, collector=MagicMock(), reservation_mgr=MagicMock())
+
+    assert run_cycles(plain, outcomes) == [1100, 1200, 1000, 1100, 1200, 1000]
+    # isolated breaches are never confirmed, so there is nothing to undo
+    assert run_cycles(stable, outcomes) == []
+
+
+def test_confirmed_breach_scales_up_and_reset_waits_for_cooldown(config):
+    config["stabilization"] = {"confirm_breaches": 2, "confirm_window": 2, "scale_down_cooldown_minutes": 30}
+    engine = DecisionEngine(config, collector=MagicMock(), reservation_mgr=MagicMock())
+
+    # 09:05 and 09:10 breach, then healthy through the 09:30 reset
+    writes = run_cycles(engine, [False, False, True, True, True, True, True, True, True, True])
+
+    # the reset at 09:30 falls inside the 30-minute scale-down cooldown and
+    # is written once, at 09:40
+    assert writes == [1100, 1000]
+    assert engine.stabilizer.pending is None
@@ -0,0 +1,92 @@
+import sqlite3
+
+import numpy as np
+import pendulum
+import pytest
+
+from core.decision_engine import CycleRecord
+from core.sla_policy import SLAEvaluationResult, SLAViolation
+from core.store import MetricsStore
+
+T0 = pendulum.datetime(2026, 1, 12, 8, 0, tz="Asia/Jakarta")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricsStore(str(tmp_path / "cycles.db"), compact_every_seconds=float("inf"))
+    yield store
+    store.close()
+
+
+def record(minutes, healthy=True, current=1000, target=None, pending=0):
+    violations = [] if healthy else [SLAViolation("pending_job_pct", 20.0, 15.0, "too many")]
+    return CycleRecord(
+        execution_time=T0.add(minutes=minutes),
+        metrics={"count_job_submitted": 100, "count_job_pending": pending, "queueing_time_p99": 5.0},
+        result=SLAEvaluationResult(healthy=healthy, violations=violations),
+        current_slots=current,
+        target_slots=target,
+    )
+
+
+def test_range_reads_columns_for_one_reservation(store):
+    store.append("etl", record(0))
+    store.append("etl", record(5, healthy=False, target=1050, pending=20))
+    store.append("bi", record(5))
+    store.append("etl", record(10))
+
+    cols = store.range("etl", T0.timestamp(), T0.add(minutes=10).timestamp())
+
+    assert cols["ts"].tolist() == [int(T0.timestamp()), int(T0.add(minutes=5).timestamp())]
+    assert cols["healthy"].tolist() == [1.0, 0.0]
+    assert cols["violations"].tolist() == [None, "pending_job_pct"]
+    assert np.isnan(cols["target_slots"][0]) and cols["target_slots"][1] == 1050
+
+
+def test_failed_collection_cycle_is_recorded(store):
+    store.append("etl", CycleRecord(T0, None, None, 1000, 1050, error="timeout"))
+
+    cols = store.range("etl", T0.timestamp(), T0.add(minutes=1).timestamp())
+
+    assert np.isnan(cols["healthy"][0])
+    assert cols["target_slots"][0] == 1050
+
+
+def test_compact_downsamples_and_applies_retention(tmp_path):
+    store = MetricsStore(
+        str(tmp_path / "cycles.db"),
+        retention_days=2,
+        downsample_after_hours=1,
+        compact_every_seconds=float("inf"),
+    )
+    for minutes in range(0, 60, 5):
+        store.append("etl", record(minutes, healthy=minutes != 20, pending=minutes))
+    store.append("etl", record(-3 * 24 * 60))  # past retention
+
+    store.compact(now=T0.add(hours=3).timestamp())
+    cols = store.range("etl", T0.subtract(days=5).timestamp(), T0.add(days=1).timestamp())
+    store.close()
+
+    assert cols["resolution"].tolist() == [3600]
+    assert cols["healthy"].tolist() == [0.0]
+    assert cols["count_job_pending"].tolist() == [sum(range(0, 60, 5))]
+    assert cols["current_slots"].tolist() == [1000]
+
+
+def test_older_store_gains_new_columns(tmp_path):
+    path = str(tmp_path / "cycles.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE cycles (reservation_id TEXT NOT NULL, ts INTEGER NOT NULL, resolution INTEGER NOT NULL, "
+        "current_slots INTEGER, PRIMARY KEY (reservation_id, ts, resolution)) WITHOUT ROWID"
+    )
+    conn.commit()
+    conn.close()
+
+    store = MetricsStore(path, compact_every_seconds=float("inf"))
+    store.append("etl", record(0), used_slots=700)
+    cols = store.range("etl", T0.timestamp(), T0.add(minutes=1).timestamp())
+    store.close()
+
+    assert cols["used_slots"].tolist() == [700]
+    assert cols["current_slots"].tolist() == [1000]